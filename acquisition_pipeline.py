@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: acquisition_pipeline.py
+@Author: 杜塞米
+@CreateDate: 2026/2/21
+@LastEditTime:
+@Description: 采集线程里的帧处理流水线：按顺序执行各处理环节，再交给下游（记录、显示）
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   解析出来的温度帧在送去记录和显示之前，需要经过校准、滤波等处理。
+#   AcquisitionPipeline 连接在 DataParser.temperature_batch_ready 上（Qt.DirectConnection，
+#   在采集线程里执行）。一批帧先依次交给分流环节 route(frames)，它可以拿走、合并帧，
+#   返回继续往下走的帧列表（例如 Stokes/Anti-Stokes 配对算温度）；
+#   然后对每一帧依次调用各处理环节的 process(frame)（原地修改温度），
+#   处理完的一批帧再依次交给下游的 consumer(frames)，下游看到的都是处理后的数据。
+#   环节列表整体替换，采集线程每批只读一次，增删环节不需要加锁。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+
+
+class AcquisitionPipeline:
+    def __init__(self):
+        self._routers = ()      # 分流环节：带 route(frames) -> frames 方法的对象
+        self._stages = ()       # 处理环节：带 process(frame) 方法的对象
+        self._consumers = ()    # 下游：consumer(frames)
+
+    @property
+    def stages(self) -> tuple:
+        return self._stages
+
+    def add_router(self, router):
+        self._routers = self._routers + (router,)
+
+    def add_stage(self, stage):
+        self._stages = self._stages + (stage,)
+
+    def remove_stage(self, stage):
+        self._stages = tuple(s for s in self._stages if s is not stage)
+
+    def add_consumer(self, consumer):
+        self._consumers = self._consumers + (consumer,)
+
+    def process_batch(self, frames: list):
+        for router in self._routers:
+            frames = router.route(frames)
+        if not frames:
+            return
+        stages = self._stages
+        for frame in frames:
+            for stage in stages:
+                stage.process(frame)
+        for consumer in self._consumers:
+            consumer(frames)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: alarm_log_model.py
+@Author: 杜塞米
+@CreateDate: 2026/2/14
+@LastEditTime:
+@Description: 报警/事件日志的表格模型：按列存储的有界环形缓冲区 + 批量插入
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   以前日志表是 QTableWidget，每条记录 insertRow 一次、每个单元格一个 QTableWidgetItem，
+#   事故时几千条报警涌进来，插入越来越慢，内存随单元格对象一直增长。
+#   AlarmLogModel 是一个 QAbstractTableModel：
+#     - 数据按列存在预分配的 numpy 数组里（时间、通道、区域、类型、阈值、温度），
+#       环形覆盖，最多保留 capacity 条；
+#     - append() 只把记录放进待插入列表，定时器每 flush_interval_ms 毫秒统一写入一次，
+#       每次只调用一对 beginInsertRows/endInsertRows（超出容量时再加一对 beginRemoveRows）；
+#     - 单元格的文字在 data() 里按需格式化，视图只会请求屏幕上可见的那几十行。
+# -----------------------------------------------------------------------------
+import time
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, pyqtSlot
+
+# 记录类型（“内容”列）
+ALARM_WARNING = 0       # 预警
+ALARM_FIXED = 1         # 定温报警
+ALARM_DIFF = 2          # 差温报警
+ALARM_BREAK = 3         # 断纤报警
+ALARM_KIND_TEXT = ("报警: 预警", "报警: 定温", "报警: 差温", "报警: 断纤")
+
+LOG_HEADERS = ("时间", "通道", "区域", "内容", "设定阈值", "实际温度")
+
+# 一条记录的各列（channel/zone 为 -1 表示未知）
+LOG_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("channel", "i2"),
+    ("zone", "i2"),
+    ("kind", "u1"),
+    ("threshold", "f4"),
+    ("actual", "f4"),
+])
+
+
+class AlarmLogModel(QAbstractTableModel):
+    """
+    - capacity: 最多保留的记录条数，超出后最旧的记录被覆盖
+    - flush_interval_ms: 待插入记录合并写入的间隔
+    """
+
+    def __init__(self, capacity: int = 200000, flush_interval_ms: int = 200, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self._columns = {name: np.empty(capacity, dtype=LOG_DTYPE[name]) for name in LOG_DTYPE.names}
+        self._start = 0         # 第0行（最旧的记录）在环形数组里的位置
+        self._count = 0         # 当前保存的记录数
+        self._pending = []      # 等待写入的记录 (timestamp, channel, zone, kind, threshold, actual)
+        self.total_logged = 0   # 累计记录数（包括已经被覆盖的）
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+
+    # --- 写入 ---
+
+    def append(self, kind: int, channel: int = -1, zone: int = -1,
+               threshold: float = np.nan, actual: float = np.nan, timestamp: float = None):
+        """添加一条记录（只放进待插入列表，下一次 flush 时才出现在表格里）"""
+        if timestamp is None:
+            timestamp = time.time()
+        self._pending.append((timestamp, channel, zone, kind, threshold, actual))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    @pyqtSlot()
+    def flush(self):
+        """把待插入的记录一次性写进环形数组，并通知视图"""
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = []
+        # 一批就超过容量时只需要最新的 capacity 条
+        if len(pending) > self.capacity:
+            pending = pending[-self.capacity:]
+        n = len(pending)
+        self.total_logged += n
+
+        # 先删掉会被覆盖的最旧记录
+        overflow = self._count + n - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._start = (self._start + overflow) % self.capacity
+            self._count -= overflow
+            self.endRemoveRows()
+
+        batch = np.array(pending, dtype=LOG_DTYPE)
+        positions = (self._start + self._count + np.arange(n)) % self.capacity
+        self.beginInsertRows(QModelIndex(), self._count, self._count + n - 1)
+        for name in LOG_DTYPE.names:
+            self._columns[name][positions] = batch[name]
+        self._count += n
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._start = 0
+        self._count = 0
+        self._pending = []
+        self.endResetModel()
+
+    # --- 读取 ---
+
+    def record(self, row: int) -> dict:
+        """第 row 行记录的原始值"""
+        i = (self._start + row) % self.capacity
+        return {name: self._columns[name][i].item() for name in LOG_DTYPE.names}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(LOG_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return LOG_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        i = (self._start + index.row()) % self.capacity
+        column = index.column()
+        if column == 0:
+            return time.strftime("%m-%d %H:%M:%S", time.localtime(self._columns["timestamp"][i]))
+        if column == 1:
+            channel = self._columns["channel"][i]
+            return f"通道{channel}" if channel >= 0 else "-"
+        if column == 2:
+            zone = self._columns["zone"][i]
+            return f"区域{zone}" if zone >= 0 else "-"
+        if column == 3:
+            kind = self._columns["kind"][i]
+            return ALARM_KIND_TEXT[kind] if kind < len(ALARM_KIND_TEXT) else f"未知({kind})"
+        if column == 4:
+            threshold = self._columns["threshold"][i]
+            return "-" if np.isnan(threshold) else f"设定阈值: {threshold:.1f}°C"
+        actual = self._columns["actual"][i]
+        return "实际温度: ?" if np.isnan(actual) else f"实际温度: {actual:.1f}°C"
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: archive.py
+@Author: 杜塞米
+@CreateDate: 2026/2/18
+@LastEditTime:
+@Description: 温度历史的二进制归档格式（定长记录 + 时间索引，按小时/按天滚动）
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   文本文件存几个月的 8000 点曲线既占空间又要逐行解析。归档文件 (*.dta) 的格式：
+#     - 64 字节文件头 ARCHIVE_HEADER_DTYPE：魔数、版本、每条记录的点数、记录长度、温度比例；
+#     - 之后是一条接一条的定长记录 record_dtype(num_points)：
+#         timestamp(f8) channel_id device_id data_type data_start_point data_end_point
+#         + temps: num_points 个 int16（温度 × 100，和设备上传的原始值一致）；
+#     - 同名的 *.idx 是所有记录的 timestamp（f8 连续存放），按时间查找时二分即可，O(log n)。
+#   第 i 条记录的偏移 = 文件头长度 + i × 记录长度，读取时直接 np.memmap，不需要任何解析。
+#   一个文件里所有记录的点数相同：按小时（或按天）滚动，每种点数各写各的文件。
+#   每批帧先填进一个复用的结构化数组，再一次 write 写进数据文件，一次 write 写进索引文件。
+#   写到一半断电时数据文件可能比索引多出几条或半条记录，读取时以两者中较短的为准，
+#   重新打开续写时两个文件都先截到这个长度。
+# -----------------------------------------------------------------------------
+import os
+import time
+import numpy as np
+from protocol import TEMP_SCALE
+from recorder import CsvFrameWriter, FILE_BUFFER_SIZE
+
+ARCHIVE_MAGIC = b"DTSARCH1"
+ARCHIVE_VERSION = 1
+ARCHIVE_SUFFIX = ".dta"
+INDEX_SUFFIX = ".idx"
+
+ROLL_HOURLY = "hour"
+ROLL_DAILY = "day"
+
+ARCHIVE_HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("header_size", "<u2"),
+    ("num_points", "<u4"),
+    ("record_size", "<u4"),
+    ("scale", "<f4"),
+    ("created", "<f8"),
+    ("reserved", "u1", (32,)),
+])
+ARCHIVE_HEADER_SIZE = ARCHIVE_HEADER_DTYPE.itemsize   # 64
+
+INDEX_DTYPE = np.dtype("<f8")
+
+
+def record_dtype(num_points: int) -> np.dtype:
+    """每条记录的结构（num_points 个点）"""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("channel_id", "u1"),
+        ("device_id", "u1"),
+        ("data_type", "u1"),
+        ("reserved", "u1"),
+        ("data_start_point", "<u2"),
+        ("data_end_point", "<u2"),
+        ("temps", "<i2", (num_points,)),
+    ])
+
+
+def read_archive_header(path: str) -> np.void:
+    """读取并检查归档文件头，格式不对时抛出 ValueError"""
+    header = np.fromfile(path, dtype=ARCHIVE_HEADER_DTYPE, count=1)
+    if len(header) != 1 or header[0]["magic"] != ARCHIVE_MAGIC:
+        raise ValueError(f"不是温度归档文件: {path}")
+    if header[0]["version"] != ARCHIVE_VERSION:
+        raise ValueError(f"不支持的归档版本 {header[0]['version']}: {path}")
+    return header[0]
+
+
+def archive_name(timestamp: float, num_points: int, roll: str = ROLL_HOURLY) -> str:
+    """某个时刻、某个点数的记录所在的归档文件名（不含扩展名）"""
+    fmt = "%Y%m%d_%H" if roll == ROLL_HOURLY else "%Y%m%d"
+    return f"temperature_{time.strftime(fmt, time.localtime(timestamp))}_{num_points}p"
+
+
+class _OpenArchive:
+    """ArchiveWriter 里一个正在写的归档文件"""
+    __slots__ = ("name", "data_file", "index_file", "batch")
+
+    def __init__(self, name, data_file, index_file, batch):
+        self.name = name                # 文件名（不含扩展名）
+        self.data_file = data_file
+        self.index_file = index_file
+        self.batch = batch              # 复用的记录缓冲区
+
+    def close(self):
+        self.data_file.close()
+        self.index_file.close()
+
+
+class ArchiveWriter:
+    """
+    FrameRecorder 用的写文件对象：温度帧写进二进制归档，报警/运行事件仍然写文本文件。
+    - directory: 保存目录
+    - roll: ROLL_HOURLY 或 ROLL_DAILY
+    不同通道的光纤长度（点数）不同时，每种点数各开一个文件、各自滚动，交替到来的帧不会反复开关文件。
+    """
+
+    def __init__(self, directory: str, roll: str = ROLL_HOURLY):
+        self.directory = directory
+        self.roll = roll
+        self._archives = {}         # 点数 -> 当前打开的 _OpenArchive
+        self._events = CsvFrameWriter(directory)
+
+    def _open(self, name: str, num_points: int) -> _OpenArchive:
+        current = self._archives.pop(num_points, None)
+        if current is not None:
+            current.close()
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, name)
+        path = base + ARCHIVE_SUFFIX
+        dtype = record_dtype(num_points)
+        if os.path.exists(path) and os.path.getsize(path) >= ARCHIVE_HEADER_SIZE:
+            # 同一时段重新开始记录：接着原文件往后写。断电时数据文件可能比索引多出几条（先刷数据再刷索引），
+            # 也可能留下半条记录，两个文件都截到两者共同完整的记录数，之后追加的记录和索引才能一一对应
+            index_path = base + INDEX_SUFFIX
+            data_records = (os.path.getsize(path) - ARCHIVE_HEADER_SIZE) // dtype.itemsize
+            index_entries = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+            records = min(data_records, index_entries)
+            with open(path, "r+b") as f:
+                f.truncate(ARCHIVE_HEADER_SIZE + records * dtype.itemsize)
+            with open(index_path, "a+b") as f:
+                f.truncate(records * INDEX_DTYPE.itemsize)
+        else:
+            header = np.zeros(1, dtype=ARCHIVE_HEADER_DTYPE)
+            header["magic"] = ARCHIVE_MAGIC
+            header["version"] = ARCHIVE_VERSION
+            header["header_size"] = ARCHIVE_HEADER_SIZE
+            header["num_points"] = num_points
+            header["record_size"] = dtype.itemsize
+            header["scale"] = TEMP_SCALE
+            header["created"] = time.time()
+            with open(path, "wb") as f:
+                f.write(header.tobytes())
+            open(base + INDEX_SUFFIX, "wb").close()
+        archive = _OpenArchive(name, open(path, "ab", buffering=FILE_BUFFER_SIZE),
+                               open(base + INDEX_SUFFIX, "ab", buffering=FILE_BUFFER_SIZE),
+                               np.empty(16, dtype=dtype))
+        self._archives[num_points] = archive
+        return archive
+
+    def write_frames(self, frames: list):
+        # 按所属文件把帧分组（组内保持原来的顺序），每组一次写入
+        groups = {}
+        for frame in frames:
+            num_points = len(frame.temperatures)
+            key = (num_points, archive_name(frame.timestamp, num_points, self.roll))
+            groups.setdefault(key, []).append(frame)
+        for (num_points, name), group in groups.items():
+            archive = self._archives.get(num_points)
+            if archive is None or archive.name != name:
+                archive = self._open(name, num_points)
+            self._write_batch(archive, group)
+
+    @staticmethod
+    def _write_batch(archive: _OpenArchive, frames: list):
+        n = len(frames)
+        if len(archive.batch) < n:
+            archive.batch = np.empty(max(n, 2 * len(archive.batch)), dtype=archive.batch.dtype)
+        batch = archive.batch[:n]
+        batch["timestamp"] = [frame.timestamp for frame in frames]
+        batch["channel_id"] = [frame.channel_id for frame in frames]
+        batch["device_id"] = [frame.device_id for frame in frames]
+        batch["data_type"] = [frame.data_type for frame in frames]
+        batch["reserved"] = 0
+        batch["data_start_point"] = [frame.data_start_point for frame in frames]
+        batch["data_end_point"] = [frame.data_end_point for frame in frames]
+        temps = batch["temps"]
+        for i, frame in enumerate(frames):
+            # 还原成设备上传的原始值（温度 × 100）
+            np.rint(frame.temperatures * TEMP_SCALE, out=temps[i], casting="unsafe")
+        archive.data_file.write(memoryview(batch))
+        archive.index_file.write(memoryview(np.ascontiguousarray(batch["timestamp"])))
+
+    def write_events(self, events: list):
+        self._events.write_events(events)
+
+    def flush(self):
+        # 先刷数据文件再刷索引
+        for archive in self._archives.values():
+            archive.data_file.flush()
+            archive.index_file.flush()
+        self._events.flush()
+
+    def close(self):
+        for archive in self._archives.values():
+            archive.close()
+        self._archives.clear()
+        self._events.close()
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: archive_reader.py
+@Author: 杜塞米
+@CreateDate: 2026/2/19
+@LastEditTime:
+@Description: 用 np.memmap 读取温度归档（archive.py 的格式），按时间/通道返回零拷贝视图
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   ArchiveReader 打开一个目录下的所有 *.dta 归档文件：
+#     - 每个文件的记录和 *.idx 时间索引都只做 np.memmap，打开 10GB 的归档也几乎不占内存、瞬间完成，
+#       真正读到的页面才会从磁盘加载；
+#     - 按时间查找时先按各文件的起止时间挑出文件，再对索引 searchsorted，O(log n)；
+#     - 返回的是 memmap 记录数组的切片（视图），按通道筛选时只复制命中的行号。
+#   录制中途打开/关闭压缩时同一个目录里两种格式都有，CombinedArchiveReader 把几个读取器
+#   （ArchiveReader、chunk_codec.CompressedArchiveReader）合成一个，回放时按时间合并。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import glob
+import os
+import numpy as np
+from archive import (ARCHIVE_SUFFIX, INDEX_SUFFIX, INDEX_DTYPE, record_dtype, read_archive_header)
+
+
+class ArchiveFile:
+    """一个归档文件：records 为 memmap 的记录数组，index 为对应的时间戳"""
+    __slots__ = ("path", "num_points", "scale", "records", "index")
+
+    def __init__(self, path: str):
+        header = read_archive_header(path)
+        self.path = path
+        self.num_points = int(header["num_points"])
+        self.scale = float(header["scale"])
+        dtype = record_dtype(self.num_points)
+        header_size = int(header["header_size"])
+        data_count = (os.path.getsize(path) - header_size) // dtype.itemsize
+        index_path = path[:-len(ARCHIVE_SUFFIX)] + INDEX_SUFFIX
+        index_count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        # 写到一半断电时两者可能不一样长，以较短的为准
+        count = min(data_count, index_count)
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=header_size, shape=(count,))
+            self.index = np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=dtype)
+            self.index = np.empty(0, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def start_time(self) -> float:
+        return float(self.index[0])
+
+    @property
+    def end_time(self) -> float:
+        return float(self.index[-1])
+
+    def slice(self, t0: float, t1: float, side: str = "left") -> slice:
+        """时间在 [t0, t1) 内（side="right" 时为 (t0, t1]）的记录下标范围"""
+        i0, i1 = np.searchsorted(self.index, (t0, t1), side=side)
+        return slice(int(i0), int(i1))
+
+
+class ArchiveReader:
+    """
+    - directory: 归档目录（FrameRecorder 的保存目录）
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.files = []
+        self.refresh()
+
+    def refresh(self):
+        """重新扫描目录（正在录制的文件变长后调用一次即可看到新数据）"""
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "*" + ARCHIVE_SUFFIX)):
+            try:
+                archive = ArchiveFile(path)
+            except (OSError, ValueError) as e:
+                print(f"跳过无法读取的归档文件 {path}: {e}")
+                continue
+            if len(archive):
+                files.append(archive)
+        files.sort(key=lambda f: f.start_time)
+        self.files = files
+
+    @property
+    def start_time(self) -> float:
+        return self.files[0].start_time if self.files else 0.0
+
+    @property
+    def end_time(self) -> float:
+        return max(f.end_time for f in self.files) if self.files else 0.0
+
+    def __len__(self):
+        return sum(len(f) for f in self.files)
+
+    def query(self, t0: float, t1: float, channel_id: int = None, side: str = "left"):
+        """
+        返回时间在 [t0, t1) 内（side="right" 时为 (t0, t1]）的记录，按文件分段：[(ArchiveFile, records), ...]。
+        不指定通道时 records 是 memmap 的切片（零拷贝）；指定通道时是命中行组成的数组。
+        """
+        result = []
+        for archive in self.files:
+            if archive.end_time < t0 or archive.start_time > t1:
+                continue
+            records = archive.records[archive.slice(t0, t1, side)]
+            if channel_id is not None:
+                records = records[records["channel_id"] == channel_id]
+            if len(records):
+                result.append((archive, records))
+        return result
+
+    def latest_before(self, t: float, channel_id: int, window: int = 256, max_lookback: int = 65536):
+        """
+        某个通道在时刻 t（含）之前的最后一条记录，返回 (ArchiveFile, record)，没有则返回 None。
+        从 t 往前每次只看 window 条记录，最多往回找 max_lookback 条，不会把整个归档的通道列都读一遍。
+        """
+        remaining = max_lookback
+        for archive in reversed(self.files):
+            if archive.start_time > t:
+                continue
+            end = int(np.searchsorted(archive.index, t, side="right"))
+            while end > 0 and remaining > 0:
+                remaining -= min(window, end)
+                start = max(0, end - window)
+                hits = np.flatnonzero(archive.records["channel_id"][start:end] == channel_id)
+                if len(hits):
+                    return archive, archive.records[start + hits[-1]]
+                end = start
+        return None
+
+    @staticmethod
+    def to_frame(record, frame, scale: float):
+        """把一条记录解码进 TemperatureFrame（温度数组复用 frame 原有的缓冲区）"""
+        frame.timestamp = float(record["timestamp"])
+        frame.channel_id = int(record["channel_id"])
+        frame.device_id = int(record["device_id"])
+        frame.data_type = int(record["data_type"])
+        frame.data_start_point = int(record["data_start_point"])
+        frame.data_end_point = int(record["data_end_point"])
+        temps = record["temps"]
+        if frame.temperatures is None or len(frame.temperatures) != len(temps):
+            frame.temperatures = np.empty(len(temps), dtype=np.float32)
+        np.divide(temps, scale, out=frame.temperatures)
+        return frame
+
+
+class CombinedArchiveReader:
+    """
+    把同一目录的几个读取器合成一个，接口和 ArchiveReader 相同。
+    - readers: ArchiveReader / CompressedArchiveReader 等接口相同的读取器
+    """
+
+    def __init__(self, readers):
+        self.readers = list(readers)
+        self.directory = self.readers[0].directory if self.readers else ""
+
+    def refresh(self):
+        for reader in self.readers:
+            reader.refresh()
+
+    @property
+    def files(self) -> list:
+        return sorted((f for reader in self.readers for f in reader.files), key=lambda f: f.start_time)
+
+    @property
+    def start_time(self) -> float:
+        times = [reader.start_time for reader in self.readers if len(reader)]
+        return min(times) if times else 0.0
+
+    @property
+    def end_time(self) -> float:
+        times = [reader.end_time for reader in self.readers if len(reader)]
+        return max(times) if times else 0.0
+
+    def __len__(self):
+        return sum(len(reader) for reader in self.readers)
+
+    def query(self, t0: float, t1: float, channel_id: int = None, side: str = "left"):
+        """各读取器的结果合在一起，按每段最后一条记录的时间排序（回放取每个通道最后一条时，晚的在后面）"""
+        result = [hit for reader in self.readers for hit in reader.query(t0, t1, channel_id, side)]
+        result.sort(key=lambda hit: float(hit[1]["timestamp"][-1]))
+        return result
+
+    def latest_before(self, t: float, channel_id: int):
+        """各读取器在时刻 t（含）之前的最后一条记录里最晚的一条"""
+        found = [hit for hit in (reader.latest_before(t, channel_id) for reader in self.readers) if hit is not None]
+        return max(found, key=lambda hit: float(hit[1]["timestamp"]), default=None)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: calibration.py
+@Author: 杜塞米
+@CreateDate: 2026/2/21
+@LastEditTime:
+@Description: 分段温度校准：把校准表编译成逐点系数数组，每帧只做一次向量化计算
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   设备按标称参数（敏感系数 633K、差分衰减 0.08dB/km、折射率 1.4640）算出温度 T0，
+#   光纤各段的实际参数不同时需要修正。拉曼测温的关系式：
+#       γ / T = ln(R) + C − ∫Δα dz
+#   用设备的标称结果消去 ln(R) + C，得到（T、T0 为开尔文温度）：
+#       1/T = (γ0/γ) / T0 − (L(z) − Δα0·z) / γ
+#   其中 L(z) 是按各段实际衰减累计到位置 z 的差分损耗。再加上各段的温度补偿值。
+#   折射率决定光在光纤里的速度：设备按标称折射率换算距离，某段折射率为 n 时，
+#   这段光纤的实际长度 = 标称距离 × n0 / n，校准表里的“分段终点”是实际长度。
+#
+#   ChannelCalibration 在第一次遇到某种帧几何（点数、起始点）时把分段表编译成三个逐点数组：
+#       a = γ0/γ，b = −(L(z) − Δα0·z)/γ，c = 补偿值 − 273.15
+#   之后每帧只做 T = 1 / (a / (T0 + 273.15) + b) + c，全部在帧自己的温度数组上原地计算，
+#   不分配内存，计算量和分段数无关。
+#   修改校准表时新建一个 ChannelCalibration 整体替换旧的（一次引用赋值），
+#   采集线程要么用旧表、要么用新表，不会用到编译了一半的系数。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import math
+import numpy as np
+
+NOMINAL_SENSITIVITY = 633.0         # 标称温度敏感系数 γ0（K）
+NOMINAL_ATTENUATION = 0.08          # 标称差分衰减 Δα0（dB/km）
+NOMINAL_REFRACTIVE_INDEX = 1.4640   # 标称折射率 n0
+KELVIN = 273.15
+
+DB_PER_KM_TO_NEPER_PER_M = math.log(10) / 10 / 1000
+
+
+class CalibrationSegment:
+    """校准表的一行：从上一段终点到 end（实际长度，m）这一段光纤的参数"""
+    __slots__ = ("end", "refractive_index", "attenuation", "sensitivity", "offset")
+
+    def __init__(self, end: float, refractive_index: float = NOMINAL_REFRACTIVE_INDEX,
+                 attenuation: float = NOMINAL_ATTENUATION, sensitivity: float = NOMINAL_SENSITIVITY,
+                 offset: float = 0.0):
+        if refractive_index <= 0 or sensitivity <= 0:
+            raise ValueError("折射率和敏感系数必须大于0")
+        self.end = float(end)
+        self.refractive_index = float(refractive_index)
+        self.attenuation = float(attenuation)
+        self.sensitivity = float(sensitivity)
+        self.offset = float(offset)
+
+    def __repr__(self):
+        return (f"CalibrationSegment(end={self.end}, n={self.refractive_index}, att={self.attenuation}, "
+                f"γ={self.sensitivity}, offset={self.offset})")
+
+
+def compile_segments(segments, nominal_distance: np.ndarray):
+    """
+    把分段表编译成逐点系数 (a, b, c)，长度和 nominal_distance 相同。
+    - segments: 按终点从小到大排列的 CalibrationSegment
+    - nominal_distance: 每个点按标称折射率换算的距离（m）
+    超出最后一段终点的点不做修正（只保留 a=1、b=0、c=−273.15）。
+    """
+    n = len(nominal_distance)
+    a = np.ones(n, dtype=np.float32)
+    b = np.zeros(n, dtype=np.float32)
+    c = np.full(n, -KELVIN, dtype=np.float32)
+    if not segments:
+        return a, b, c
+
+    ends = np.array([s.end for s in segments])                       # 实际长度下的分段终点 e_k
+    starts = np.concatenate(([0.0], ends[:-1]))                        # e_{k-1}
+    index = np.array([s.refractive_index for s in segments])
+    gamma = np.array([s.sensitivity for s in segments])
+    alpha = np.array([s.attenuation for s in segments]) * DB_PER_KM_TO_NEPER_PER_M
+    offset = np.array([s.offset for s in segments])
+
+    # 各段在标称距离下的起点 E_{k-1}
+    nominal_lengths = (ends - starts) * index / NOMINAL_REFRACTIVE_INDEX
+    nominal_starts = np.concatenate(([0.0], np.cumsum(nominal_lengths)[:-1]))
+    nominal_ends = nominal_starts + nominal_lengths
+    # 各段起点处累计的差分损耗 L(e_{k-1})
+    loss_starts = np.concatenate(([0.0], np.cumsum(alpha * (ends - starts))[:-1]))
+
+    # 每个点属于哪一段（向量化查找），以及它的实际位置 z
+    k = np.searchsorted(nominal_ends, nominal_distance, side="left")
+    inside = (k < len(segments)) & (nominal_distance >= 0)
+    k = np.minimum(k, len(segments) - 1)
+    z = starts[k] + (nominal_distance - nominal_starts[k]) * NOMINAL_REFRACTIVE_INDEX / index[k]
+    loss = loss_starts[k] + alpha[k] * (z - starts[k])
+    nominal_loss = NOMINAL_ATTENUATION * DB_PER_KM_TO_NEPER_PER_M * z
+
+    a[inside] = (NOMINAL_SENSITIVITY / gamma[k])[inside]
+    b[inside] = (-(loss - nominal_loss) / gamma[k])[inside]
+    c[inside] = (offset[k] - KELVIN)[inside]
+    return a, b, c
+
+
+class ChannelCalibration:
+    """
+    一个通道编译好的校准（创建后不再修改分段表，修改时整体替换）。
+    - segments: CalibrationSegment 列表
+    - resolution / start_offset: 点间距和光纤起始长度（m），用来算每个点的标称距离
+    """
+
+    def __init__(self, segments, resolution: float = 0.5, start_offset: float = 0.0):
+        self.segments = tuple(sorted(segments, key=lambda s: s.end))
+        self.resolution = float(resolution)
+        self.start_offset = float(start_offset)
+        self._compiled = {}     # (num_points, data_start_point) -> (a, b, c)
+
+    def coefficients(self, num_points: int, data_start_point: int = 0):
+        key = (num_points, data_start_point)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            distance = self.start_offset + (data_start_point + np.arange(num_points)) * self.resolution
+            compiled = self._compiled[key] = compile_segments(self.segments, distance)
+        return compiled
+
+    @property
+    def geometries(self) -> tuple:
+        """已经编译过的帧几何 (点数, 起始点)"""
+        return tuple(self._compiled)
+
+    def apply(self, temperatures: np.ndarray, data_start_point: int = 0):
+        """原地校准一帧温度（°C）"""
+        a, b, c = self.coefficients(len(temperatures), data_start_point)
+        t = temperatures
+        np.add(t, KELVIN, out=t)
+        np.divide(a, t, out=t)
+        np.add(t, b, out=t)
+        np.reciprocal(t, out=t)
+        np.add(t, c, out=t)
+
+
+class CalibrationEngine:
+    """
+    所有通道的校准，作为采集流水线的一个处理环节（process(frame) 原地修改温度）。
+    - channels: 通道数；channel_base: 第一个通道的 channel_id
+    """
+
+    def __init__(self, channels: int = 8, channel_base: int = 1):
+        self.channel_base = channel_base
+        self._channels = [None] * channels      # 每个通道的 ChannelCalibration，None 表示不校准
+        self._geometry = [(0.5, 0.0)] * channels
+
+    def configure(self, index: int, segments, resolution: float, start_offset: float):
+        """同时设置某个通道（下标从0开始）的分段表和几何，只编译、替换一次；空表表示不校准"""
+        self._geometry[index] = (float(resolution), float(start_offset))
+        self._replace(index, ChannelCalibration(segments, resolution, start_offset) if segments else None)
+
+    def set_segments(self, index: int, segments):
+        """只修改分段表，几何不变"""
+        self.configure(index, segments, *self._geometry[index])
+
+    def set_geometry(self, index: int, resolution: float, start_offset: float):
+        """只修改测量参数（点间距、起始长度），分段表不变"""
+        self.configure(index, self.segments(index), resolution, start_offset)
+
+    def _replace(self, index: int, calibration):
+        # 在调用线程里按旧校准用过的帧几何先把系数编译好，再一次性替换，
+        # 采集线程换到新校准后的第一帧不用等编译
+        current = self._channels[index]
+        if calibration is not None and current is not None:
+            for num_points, data_start_point in current.geometries:
+                calibration.coefficients(num_points, data_start_point)
+        self._channels[index] = calibration
+
+    def segments(self, index: int):
+        current = self._channels[index]
+        return list(current.segments) if current is not None else []
+
+    def process(self, frame):
+        index = frame.channel_id - self.channel_base
+        if not 0 <= index < len(self._channels):
+            return
+        calibration = self._channels[index]     # 只读一次引用，之后即使被替换也用这一份
+        if calibration is not None:
+            calibration.apply(frame.temperatures, frame.data_start_point)
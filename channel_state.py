@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: channel_state.py
+@Author: 杜塞米
+@CreateDate: 2026/2/12
+@LastEditTime:
+@Description: 多通道最新温度状态：预分配的 (通道数, 点数) float32 数组
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   每个通道的最新一帧温度按 channel_id 原地写进同一个预分配的二维数组，
+#   写完帧就可以立刻归还对象池，曲线直接引用数组里对应通道的那一行。
+#   稳定运行时每帧只有一次 copyto，没有任何内存分配。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import numpy as np
+
+CHANNEL_COUNT = 8       # DTS主机的测量通道数
+CHANNEL_BASE = 1        # 帧里的 channel_id 从1开始编号（测量通道1 ~ 测量通道8）
+
+
+class ChannelState:
+    """
+    - data: (channels, capacity) float32，每行是一个通道最新的温度数据
+    - num_points: 每个通道当前有效的点数
+    - version: 每个通道被写入的次数，用来判断“上次绘制之后有没有变化”
+    """
+
+    def __init__(self, channels: int = CHANNEL_COUNT, points: int = 8000):
+        self.channels = channels
+        self.data = np.full((channels, points), np.nan, dtype=np.float32)
+        self.num_points = np.zeros(channels, dtype=np.int64)
+        self.version = np.zeros(channels, dtype=np.int64)
+        self.timestamp = np.zeros(channels, dtype=np.float64)
+        self.headers = [None] * channels    # 每个通道最新一帧的 (device_id, data_start_point, data_end_point)
+
+    @staticmethod
+    def index_of(channel_id: int) -> int:
+        return channel_id - CHANNEL_BASE
+
+    def write(self, frame) -> int:
+        """
+        把一帧温度写进对应通道的那一行，返回通道下标；通道号超出范围返回 -1。
+        写完后帧就不再被引用，调用方可以立即归还对象池。
+        """
+        index = self.index_of(frame.channel_id)
+        if not 0 <= index < self.channels:
+            return -1
+        n = len(frame.temperatures)
+        if n > self.data.shape[1]:
+            self._grow(n)
+        np.copyto(self.data[index, :n], frame.temperatures)
+        self.num_points[index] = n
+        self.version[index] += 1
+        self.timestamp[index] = frame.timestamp
+        self.headers[index] = (frame.device_id, frame.data_start_point, frame.data_end_point)
+        return index
+
+    def _grow(self, points: int):
+        """光纤变长时扩大数组（只在点数超过已有容量时发生一次）"""
+        data = np.full((self.channels, points), np.nan, dtype=np.float32)
+        data[:, :self.data.shape[1]] = self.data
+        self.data = data
+
+    def row(self, index: int) -> np.ndarray:
+        """某个通道当前有效数据的视图（不复制）"""
+        return self.data[index, :self.num_points[index]]
+
+    def has_data(self, index: int) -> bool:
+        return self.num_points[index] > 0
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: chunk_codec.py
+@Author: 杜塞米
+@CreateDate: 2026/2/20
+@LastEditTime:
+@Description: 温度归档的分块压缩（时间/空间差分 + 字节重排 + zlib/lzma），压缩在线程池里做，解压按块懒加载
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   温度在相邻两帧之间、沿光纤相邻两点之间都变化很慢，原始 int16 存储大部分字节都是冗余的。
+#   压缩归档 (*.dtz) 把同一个通道连续的 chunk_frames 帧合成一块：
+#     1. 温度原始值排成 (帧数, 点数) 的 int16 数组，先沿光纤做差分，再沿时间做差分（都是 numpy 向量化，
+#        int16 溢出回绕，cumsum 还原时同样回绕，完全无损）；
+#     2. 把 int16 的高字节和低字节分开存放（字节重排），差分后高字节几乎全是 0x00/0xFF；
+#     3. 和每帧的记录头一起交给 zlib（或 lzma）压缩。
+#   压缩放在 ThreadPoolExecutor 里做（zlib/lzma 压缩时会释放 GIL），写盘线程按提交顺序写出已完成的块。
+#   每个块在索引文件 (*.zdx) 里有一条定长记录：起止时间、通道、文件偏移、长度、帧数。
+#   读取时只解析索引，某个块第一次被用到时才解压，解压结果放进 LRU 缓存。
+#   CompressedArchiveReader 提供和 ArchiveReader 相同的 query()/latest_before() 接口，回放可以直接使用。
+# -----------------------------------------------------------------------------
+import glob
+import lzma
+import os
+import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from protocol import TEMP_SCALE
+from recorder import CsvFrameWriter, FILE_BUFFER_SIZE
+from archive import (ARCHIVE_HEADER_DTYPE, ARCHIVE_HEADER_SIZE, ARCHIVE_VERSION, ROLL_HOURLY,
+                     record_dtype, archive_name)
+
+COMPRESSED_MAGIC = b"DTSZIP01"
+COMPRESSED_SUFFIX = ".dtz"
+CHUNK_INDEX_SUFFIX = ".zdx"
+
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+
+DELTA_SPATIAL = 0x01        # 沿光纤差分
+DELTA_TEMPORAL = 0x02       # 沿时间差分
+
+CHUNK_INDEX_DTYPE = np.dtype([
+    ("t_first", "<f8"),
+    ("t_last", "<f8"),
+    ("offset", "<u8"),
+    ("size", "<u4"),
+    ("n_frames", "<u4"),
+    ("num_points", "<u4"),
+    ("channel_id", "u1"),
+    ("codec", "u1"),
+    ("flags", "u1"),
+    ("reserved", "u1"),
+])
+
+
+def _frame_header_dtype(num_points: int) -> np.dtype:
+    """记录里除温度以外的字段（和 archive.record_dtype 一致）"""
+    dtype = record_dtype(num_points)
+    return np.dtype([(name, dtype.fields[name][0]) for name in dtype.names if name != "temps"])
+
+
+# --- 编码 / 解码（纯函数，可以在任意线程里调用） ---
+
+def encode_chunk(records: np.ndarray, codec: int = CODEC_ZLIB,
+                 flags: int = DELTA_SPATIAL | DELTA_TEMPORAL, level: int = 6) -> bytes:
+    """把同一通道的一组记录（archive.record_dtype 的结构化数组）编码成压缩后的字节串"""
+    temps = np.ascontiguousarray(records["temps"])      # (帧数, 点数) int16
+    if flags & DELTA_SPATIAL:
+        temps = np.diff(temps, axis=1, prepend=np.int16(0))
+    if flags & DELTA_TEMPORAL:
+        temps = np.diff(temps, axis=0, prepend=np.zeros((1, temps.shape[1]), dtype=np.int16))
+    # 字节重排：所有低字节在前，所有高字节在后
+    shuffled = temps.astype("<i2", copy=False).view(np.uint8).reshape(-1, 2).T.tobytes()
+
+    headers = np.empty(len(records), dtype=_frame_header_dtype(temps.shape[1]))
+    for name in headers.dtype.names:
+        headers[name] = records[name]
+    raw = headers.tobytes() + shuffled
+    if codec == CODEC_LZMA:
+        return lzma.compress(raw, preset=min(level, 9))
+    return zlib.compress(raw, level)
+
+
+def decode_chunk(payload: bytes, n_frames: int, num_points: int, codec: int, flags: int) -> np.ndarray:
+    """encode_chunk 的逆过程，返回 archive.record_dtype(num_points) 的结构化数组"""
+    raw = lzma.decompress(payload) if codec == CODEC_LZMA else zlib.decompress(payload)
+    header_dtype = _frame_header_dtype(num_points)
+    header_size = n_frames * header_dtype.itemsize
+    headers = np.frombuffer(raw, dtype=header_dtype, count=n_frames)
+
+    planes = np.frombuffer(raw, dtype=np.uint8, offset=header_size).reshape(2, -1)
+    temps = np.empty((n_frames * num_points, 2), dtype=np.uint8)
+    temps[:, 0] = planes[0]
+    temps[:, 1] = planes[1]
+    temps = temps.view("<i2").reshape(n_frames, num_points)
+    if flags & DELTA_TEMPORAL:
+        temps = np.cumsum(temps, axis=0, dtype=np.int16)
+    if flags & DELTA_SPATIAL:
+        temps = np.cumsum(temps, axis=1, dtype=np.int16)
+
+    records = np.empty(n_frames, dtype=record_dtype(num_points))
+    for name in header_dtype.names:
+        records[name] = headers[name]
+    records["temps"] = temps
+    return records
+
+
+# --- 写入 ---
+
+class _OpenChunkFile:
+    """CompressedArchiveWriter 里一个正在写的压缩归档文件"""
+    __slots__ = ("name", "data_file", "index_file")
+
+    def __init__(self, name, data_file, index_file):
+        self.name = name                # 文件名（不含扩展名）
+        self.data_file = data_file
+        self.index_file = index_file
+
+    def close(self):
+        self.data_file.close()
+        self.index_file.close()
+
+
+class CompressedArchiveWriter:
+    """
+    FrameRecorder 用的写文件对象（压缩版的 archive.ArchiveWriter）。
+    - chunk_frames: 每个通道攒够多少帧压缩成一块
+    - max_chunk_age: 没攒够的块最多等待多少秒（按帧时间）也要写出，限制断电时丢失的数据量
+    - codec / level: CODEC_ZLIB 或 CODEC_LZMA，以及压缩级别（差分之后 zlib 1 级和 6 级的压缩率相差不大，CPU 却省很多）
+    - workers: 压缩线程数
+    和 ArchiveWriter 一样每种点数各开一个文件、各自滚动；某个文件滚动时只写出属于它的未满块。
+    """
+
+    def __init__(self, directory: str, roll: str = ROLL_HOURLY, chunk_frames: int = 32,
+                 max_chunk_age: float = 600.0, codec: int = CODEC_ZLIB, level: int = 1, workers: int = 2):
+        self.directory = directory
+        self.roll = roll
+        self.chunk_frames = chunk_frames
+        self.max_chunk_age = max_chunk_age
+        self.codec = codec
+        self.level = level
+        self.flags = DELTA_SPATIAL | DELTA_TEMPORAL
+        self.raw_bytes = 0          # 压缩前的记录字节数
+        self.compressed_bytes = 0   # 压缩后写入的字节数
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ChunkCodec")
+        self._archives = {}         # 点数 -> 当前打开的 _OpenChunkFile
+        self._pending = {}          # (点数, channel_id) -> [记录, ...]，还没攒够一块
+        self._futures = deque()     # 已提交压缩、按提交顺序等待写出的块
+        self._events = CsvFrameWriter(directory)
+
+    def _open(self, name: str, num_points: int) -> _OpenChunkFile:
+        current = self._archives.pop(num_points, None)
+        if current is not None:
+            current.close()
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, name)
+        path = base + COMPRESSED_SUFFIX
+        if os.path.exists(path) and os.path.getsize(path) >= ARCHIVE_HEADER_SIZE:
+            self._recover(path, base + CHUNK_INDEX_SUFFIX)
+        else:
+            header = np.zeros(1, dtype=ARCHIVE_HEADER_DTYPE)
+            header["magic"] = COMPRESSED_MAGIC
+            header["version"] = ARCHIVE_VERSION
+            header["header_size"] = ARCHIVE_HEADER_SIZE
+            header["num_points"] = num_points
+            header["record_size"] = record_dtype(num_points).itemsize
+            header["scale"] = TEMP_SCALE
+            header["created"] = time.time()
+            with open(path, "wb") as f:
+                f.write(header.tobytes())
+            open(base + CHUNK_INDEX_SUFFIX, "wb").close()
+        archive = _OpenChunkFile(name, open(path, "ab", buffering=FILE_BUFFER_SIZE),
+                                 open(base + CHUNK_INDEX_SUFFIX, "ab"))
+        self._archives[num_points] = archive
+        return archive
+
+    @staticmethod
+    def _recover(path: str, index_path: str):
+        """
+        同一时段重新开始记录前修复断电留下的文件：索引里指向文件末尾之外的块（数据没写完）丢掉，
+        数据文件截到最后一个完整块的末尾（去掉没有索引的半块），之后追加的块和索引才能对上
+        """
+        entry_size = CHUNK_INDEX_DTYPE.itemsize
+        count = os.path.getsize(index_path) // entry_size if os.path.exists(index_path) else 0
+        index = np.fromfile(index_path, dtype=CHUNK_INDEX_DTYPE, count=count) if count else \
+            np.empty(0, dtype=CHUNK_INDEX_DTYPE)
+        ends = index["offset"].astype(np.int64) + index["size"]
+        bad = np.flatnonzero(ends > os.path.getsize(path))
+        good = int(bad[0]) if len(bad) else len(index)
+        with open(path, "r+b") as f:
+            f.truncate(int(ends[good - 1]) if good else ARCHIVE_HEADER_SIZE)
+        with open(index_path, "a+b") as f:
+            f.truncate(good * entry_size)
+
+    def write_frames(self, frames: list):
+        for frame in frames:
+            num_points = len(frame.temperatures)
+            name = archive_name(frame.timestamp, num_points, self.roll)
+            archive = self._archives.get(num_points)
+            if archive is None or archive.name != name:
+                # 这种点数的文件要滚动：先把属于旧文件的块全部写完
+                if archive is not None:
+                    self._submit_all(num_points=num_points)
+                    self._drain(wait=True)
+                self._open(name, num_points)
+
+            record = np.empty((), dtype=record_dtype(num_points))
+            record["timestamp"] = frame.timestamp
+            record["channel_id"] = frame.channel_id
+            record["device_id"] = frame.device_id
+            record["data_type"] = frame.data_type
+            record["reserved"] = 0
+            record["data_start_point"] = frame.data_start_point
+            record["data_end_point"] = frame.data_end_point
+            np.rint(frame.temperatures * TEMP_SCALE, out=record["temps"], casting="unsafe")
+
+            key = (num_points, frame.channel_id)
+            pending = self._pending.setdefault(key, [])
+            pending.append(record)
+            if len(pending) >= self.chunk_frames:
+                self._submit(key)
+        self._drain(wait=False)
+
+    def _submit(self, key: tuple):
+        records = np.array(self._pending.pop(key))
+        self.raw_bytes += records.nbytes
+        future = self._pool.submit(encode_chunk, records, self.codec, self.flags, self.level)
+        num_points, channel_id = key
+        self._futures.append((records["timestamp"][0], records["timestamp"][-1], num_points, channel_id,
+                              len(records), future))
+
+    def _submit_all(self, older_than: float = None, num_points: int = None):
+        for key in list(self._pending):
+            first = float(self._pending[key][0]["timestamp"])
+            if (older_than is None or first <= older_than) and (num_points is None or key[0] == num_points):
+                self._submit(key)
+
+    def _drain(self, wait: bool):
+        """按提交顺序写出已经压缩完成的块；wait=True 时等所有块都压缩完"""
+        while self._futures and (wait or self._futures[0][-1].done()):
+            t_first, t_last, num_points, channel_id, n_frames, future = self._futures.popleft()
+            payload = future.result()
+            archive = self._archives[num_points]
+            entry = np.zeros(1, dtype=CHUNK_INDEX_DTYPE)
+            entry["t_first"] = t_first
+            entry["t_last"] = t_last
+            entry["offset"] = archive.data_file.tell()
+            entry["size"] = len(payload)
+            entry["n_frames"] = n_frames
+            entry["num_points"] = num_points
+            entry["channel_id"] = channel_id
+            entry["codec"] = self.codec
+            entry["flags"] = self.flags
+            archive.data_file.write(payload)
+            archive.index_file.write(entry.tobytes())
+            self.compressed_bytes += len(payload)
+
+    def write_events(self, events: list):
+        self._events.write_events(events)
+
+    def flush(self):
+        # 攒得太久的块也写出去，断电时每个通道最多丢 max_chunk_age 秒的数据
+        if self._pending:
+            newest = max(float(p[-1]["timestamp"]) for p in self._pending.values())
+            self._submit_all(older_than=newest - self.max_chunk_age)
+        self._drain(wait=True)
+        for archive in self._archives.values():
+            archive.data_file.flush()
+            archive.index_file.flush()
+        self._events.flush()
+
+    def close(self):
+        self._submit_all()
+        self._drain(wait=True)
+        for archive in self._archives.values():
+            archive.close()
+        self._archives.clear()
+        self._pool.shutdown()
+        self._events.close()
+
+
+# --- 读取 ---
+
+class CompressedArchiveFile:
+    """一个压缩归档文件：只读入块索引，块在第一次用到时才解压"""
+
+    def __init__(self, path: str, cache):
+        header = np.fromfile(path, dtype=ARCHIVE_HEADER_DTYPE, count=1)
+        if len(header) != 1 or header[0]["magic"] != COMPRESSED_MAGIC:
+            raise ValueError(f"不是压缩温度归档文件: {path}")
+        self.path = path
+        self.num_points = int(header[0]["num_points"])
+        self.scale = float(header[0]["scale"])
+        index = np.fromfile(path[:-len(COMPRESSED_SUFFIX)] + CHUNK_INDEX_SUFFIX, dtype=CHUNK_INDEX_DTYPE)
+        # 只保留数据完整写进文件的块
+        size = os.path.getsize(path)
+        self.chunks = index[index["offset"] + index["size"] <= size]
+        self._cache = cache
+
+    def __len__(self):
+        return int(self.chunks["n_frames"].sum())
+
+    @property
+    def start_time(self) -> float:
+        return float(self.chunks["t_first"].min())
+
+    @property
+    def end_time(self) -> float:
+        return float(self.chunks["t_last"].max())
+
+    def chunk(self, i: int) -> np.ndarray:
+        """第 i 块解压后的记录（带 LRU 缓存）；块损坏时返回空数组，回放跳过这一块"""
+        key = (self.path, i)
+        records = self._cache.get(key)
+        if records is None:
+            entry = self.chunks[i]
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(int(entry["offset"]))
+                    payload = f.read(int(entry["size"]))
+                records = decode_chunk(payload, int(entry["n_frames"]), int(entry["num_points"]),
+                                       int(entry["codec"]), int(entry["flags"]))
+            except (OSError, ValueError, zlib.error, lzma.LZMAError) as e:
+                print(f"跳过损坏的压缩块 {self.path} #{i}: {e}")
+                records = np.empty(0, dtype=record_dtype(int(entry["num_points"])))
+            self._cache.put(key, records)
+        return records
+
+
+class _LruCache:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+
+class CompressedArchiveReader:
+    """
+    读取一个目录下的所有 *.dtz 压缩归档，接口和 archive_reader.ArchiveReader 相同。
+    - cache_chunks: 最多缓存多少个解压后的块
+    """
+
+    def __init__(self, directory: str, cache_chunks: int = 64):
+        self.directory = directory
+        self._cache = _LruCache(cache_chunks)
+        self.files = []
+        self.refresh()
+
+    def refresh(self):
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "*" + COMPRESSED_SUFFIX)):
+            try:
+                archive = CompressedArchiveFile(path, self._cache)
+            except (OSError, ValueError) as e:
+                print(f"跳过无法读取的压缩归档文件 {path}: {e}")
+                continue
+            if len(archive.chunks):
+                files.append(archive)
+        files.sort(key=lambda f: f.start_time)
+        self.files = files
+
+    @property
+    def start_time(self) -> float:
+        return self.files[0].start_time if self.files else 0.0
+
+    @property
+    def end_time(self) -> float:
+        return max(f.end_time for f in self.files) if self.files else 0.0
+
+    def __len__(self):
+        return sum(len(f) for f in self.files)
+
+    def query(self, t0: float, t1: float, channel_id: int = None, side: str = "left"):
+        """
+        返回时间在 [t0, t1) 内（side="right" 时为 (t0, t1]）的记录：[(CompressedArchiveFile, records), ...]，
+        每个时间上有重叠的块一段。只解压用到的块。
+        """
+        result = []
+        for archive in self.files:
+            chunks = archive.chunks
+            hit = (chunks["t_last"] >= t0) & (chunks["t_first"] <= t1)
+            if channel_id is not None:
+                hit &= chunks["channel_id"] == channel_id
+            for i in np.flatnonzero(hit):
+                records = archive.chunk(int(i))
+                i0, i1 = np.searchsorted(records["timestamp"], (t0, t1), side=side)
+                if i1 > i0:
+                    result.append((archive, records[i0:i1]))
+        return result
+
+    def latest_before(self, t: float, channel_id: int):
+        """某个通道在时刻 t（含）之前的最后一条记录，返回 (CompressedArchiveFile, record)，没有则返回 None"""
+        for archive in reversed(self.files):
+            chunks = archive.chunks
+            hits = np.flatnonzero((chunks["channel_id"] == channel_id) & (chunks["t_first"] <= t))
+            # 从最晚开始的块往前找，损坏的块（解压出空数组）跳过
+            for i in hits[np.argsort(chunks["t_first"][hits])[::-1]]:
+                records = archive.chunk(int(i))
+                last = int(np.searchsorted(records["timestamp"], t, side="right")) - 1
+                if last >= 0:
+                    return archive, records[last]
+        return None
@@ -11,14 +11,17 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QGroupBox, QListWidget,
                              QListWidgetItem, QGridLayout, QTableWidget,
-                             QTableWidgetItem, QHeaderView, QWidget, QAbstractItemView)
+                             QTableWidgetItem, QHeaderView, QWidget, QAbstractItemView, QMessageBox)
 from PyQt5.QtCore import Qt, pyqtSlot
+from calibration import CalibrationSegment
 
 
 class FiberCoeffCalibrationDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("光纤校准系数")
+        self._segments = {}         # 通道下标 -> 该通道的分段表 [CalibrationSegment, ...]
+        self._table_channel = 0     # 表格当前显示的是哪个通道
         self.resize(850, 550)  # 根据图片适当调整窗口大小
 
         self.init_ui()
@@ -144,6 +147,7 @@ class FiberCoeffCalibrationDialog(QDialog):
         self.btn_save.clicked.connect(self.on_save)
         self.btn_add.clicked.connect(self.on_add_row)
         self.btn_delete.clicked.connect(self.on_delete_row)
+        self.channel_list.currentRowChanged.connect(self.on_channel_changed)
 
     @pyqtSlot()
     def on_add_row(self):
@@ -178,21 +182,65 @@ class FiberCoeffCalibrationDialog(QDialog):
         else:
             print("请先选择要删除的行")
 
-    @pyqtSlot()
-    def on_save(self):
-        """遍历表格获取所有数据并保存"""
-        data = []
-        rows = self.table.rowCount()
-        cols = self.table.columnCount()
-
-        for r in range(rows):
-            row_data = []
-            for c in range(cols):
+    def _read_table(self) -> list:
+        """把表格读成分段列表；有空格子或不是数字时抛出 ValueError"""
+        segments = []
+        for r in range(self.table.rowCount()):
+            values = []
+            for c in range(self.table.columnCount()):
                 item = self.table.item(r, c)
-                row_data.append(item.text() if item else "")
-            data.append(row_data)
+                values.append(float(item.text() if item else ""))
+            segments.append(CalibrationSegment(*values))
+        ends = [segment.end for segment in segments]
+        if any(end <= 0 for end in ends) or ends != sorted(set(ends)):
+            raise ValueError("分段终点必须大于0且从小到大排列")
+        return segments
+
+    def _load_table(self, index: int):
+        self.table.setRowCount(0)
+        for segment in self._segments.get(index, []):
+            row_idx = self.table.rowCount()
+            self.table.insertRow(row_idx)
+            values = (segment.end, segment.refractive_index, segment.attenuation, segment.sensitivity, segment.offset)
+            for col, value in enumerate(values):
+                self.table.setItem(row_idx, col, QTableWidgetItem(f"{value:g}"))
+        self._table_channel = index
+
+    def set_calibration(self, calibration: dict):
+        """填入已有的校准表：{通道下标: [CalibrationSegment, ...]}"""
+        self._segments = {index: list(segments) for index, segments in calibration.items()}
+        self._load_table(max(self.channel_list.currentRow(), 0))
+
+    def get_calibration(self) -> dict:
+        """返回所有通道的校准表 {通道下标: [CalibrationSegment, ...]}；当前表格有错误时抛出 ValueError"""
+        self._segments[self._table_channel] = self._read_table()
+        return dict(self._segments)
+
+    @pyqtSlot(int)
+    def on_channel_changed(self, index: int):
+        """切换通道：先保存当前表格，再显示新通道的分段表"""
+        if index < 0 or index == self._table_channel:
+            return
+        try:
+            self._segments[self._table_channel] = self._read_table()
+        except ValueError as e:
+            QMessageBox.warning(self, "参数错误", f"测温通道{self._table_channel + 1}的校准表有误: {e}")
+            self.channel_list.blockSignals(True)
+            self.channel_list.setCurrentRow(self._table_channel)
+            self.channel_list.blockSignals(False)
+            return
+        self._load_table(index)
 
-        current_channel = self.channel_list.currentItem().text()
-        print(f"保存 [{current_channel}] 的数据: {data}")
+    @pyqtSlot()
+    def on_save(self):
+        """检查并保存所有通道的分段表，主界面通过 get_calibration() 取回"""
+        try:
+            calibration = self.get_calibration()
+        except ValueError as e:
+            QMessageBox.warning(self, "参数错误", f"校准表有误: {e}")
+            return
+
+        for index, segments in sorted(calibration.items()):
+            print(f"保存 [测温通道{index + 1}] 的校准表: {segments}")
 
         self.accept()
\ No newline at end of file
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: distance_axis.py
+@Author: 杜塞米
+@CreateDate: 2026/2/16
+@LastEditTime:
+@Description: 按测量参数计算并缓存每个通道的距离轴（X轴）
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   以前每帧都 np.arange(0, num_points * 0.5, 0.5) 新建一个距离数组，而且 0.5m 的点间距是写死的，
+#   测量参数里的分辨率和光纤起始长度都没有用上。
+#   DistanceAxisCache 给每个通道缓存一个距离数组：
+#     x[i] = start_offset + (data_start_point + i) * resolution
+#   缓存键为 (num_points, resolution, start_offset, data_start_point, data_end_point)，
+#   键不变就直接返回上次的数组；测量参数修改后对应通道的缓存失效。
+#   返回的数组是只读的，可以放心地直接交给曲线和统计模块共用。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import numpy as np
+
+# 测量参数对话框里“探测分辨率”下拉框的选项及对应的点间距（m）
+RESOLUTION_OPTIONS = (
+    ("2米 (20ns)", 2.0),
+    ("1米 (10ns)", 1.0),
+    ("0.5米 (5ns)", 0.5),
+)
+DEFAULT_RESOLUTION = 0.5    # 没有设置过测量参数时的点间距（m）
+
+
+class DistanceAxisCache:
+    """
+    - channels: 通道数
+    - resolution / start_offset: 所有通道的初始点间距和光纤起始长度（m）
+    """
+
+    def __init__(self, channels: int, resolution: float = DEFAULT_RESOLUTION, start_offset: float = 0.0):
+        self.resolution = [float(resolution)] * channels
+        self.start_offset = [float(start_offset)] * channels
+        self._entries = [None] * channels   # 每个通道的 (key, 距离数组)
+
+    def set_params(self, index: int, resolution: float = None, start_offset: float = None):
+        """修改某个通道的测量参数，并让它的距离轴缓存失效"""
+        if resolution is not None:
+            self.resolution[index] = float(resolution)
+        if start_offset is not None:
+            self.start_offset[index] = float(start_offset)
+        self._entries[index] = None
+
+    def invalidate(self, index: int = None):
+        """让某个通道（默认所有通道）的距离轴缓存失效"""
+        if index is None:
+            self._entries = [None] * len(self._entries)
+        else:
+            self._entries[index] = None
+
+    def get(self, index: int, num_points: int, data_start_point: int = 0, data_end_point: int = None) -> np.ndarray:
+        """返回第 index 个通道当前帧的距离数组（只读，参数不变时每次返回同一个数组）"""
+        resolution = self.resolution[index]
+        start_offset = self.start_offset[index]
+        key = (num_points, resolution, start_offset, data_start_point, data_end_point)
+        entry = self._entries[index]
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        x = np.arange(data_start_point, data_start_point + num_points, dtype=np.float64)
+        x *= resolution
+        x += start_offset
+        x.flags.writeable = False
+        self._entries[index] = (key, x)
+        return x
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: frame_mailbox.py
+@Author: 杜塞米
+@CreateDate: 2026/2/9
+@LastEditTime:
+@Description: 采集线程与界面线程之间按通道分开的有界帧信箱（背压/丢帧策略）
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   以前每个温度帧都通过排队信号送到界面线程，界面跟不上时事件队列和内存
+#   会无限增长，显示也会越来越落后于实际。
+#   FrameMailbox 给每个通道一个有界队列，采集线程往里放，界面线程一次取走：
+#     - "latest": 每个通道只保留最新一帧（默认）
+#     - "last_n": 每个通道保留最近 N 帧，更早的丢弃
+#     - "block" : 队列满时阻塞采集线程，直到界面取走（最多等 block_timeout 秒，超时丢最旧帧）
+#   被丢弃的帧会计数，并归还给帧对象池。
+#   只有信箱从“空”变成“有数据”时才发一次 frames_available 信号，
+#   所以不管界面卡多久，事件队列里最多只有一个待处理的通知。
+# -----------------------------------------------------------------------------
+import threading
+from collections import deque
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+
+class FrameMailbox(QObject):
+    POLICY_LATEST = "latest"
+    POLICY_LAST_N = "last_n"
+    POLICY_BLOCK = "block"
+
+    # 信箱从空变为非空时发射（在采集线程发射，界面线程排队接收）
+    frames_available = pyqtSignal()
+
+    def __init__(self, policy: str = POLICY_LATEST, depth: int = 1, frame_pool=None,
+                 block_timeout: float = 1.0, parent=None):
+        """
+        - policy: 丢帧策略，见模块说明
+        - depth: 每个通道最多缓存的帧数（"latest" 策略下固定为1）
+        - frame_pool: 被丢弃的帧归还到这个对象池（可以为 None）
+        - block_timeout: "block" 策略下采集线程最多等待的秒数，防止界面卡死时采集线程也跟着卡死
+        """
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        self._queues = {}           # channel_id -> deque[TemperatureFrame]
+        self._pending = 0           # 所有通道里待取的帧总数
+        self._notified = False      # 已发出 frames_available 且还没被取走
+        self.frame_pool = frame_pool
+        self.block_timeout = block_timeout
+        self.dropped = {}           # channel_id -> 丢弃的帧数
+        self.set_policy(policy, depth)
+
+    def set_policy(self, policy: str, depth: int = 1):
+        if policy not in (self.POLICY_LATEST, self.POLICY_LAST_N, self.POLICY_BLOCK):
+            raise ValueError(f"未知的丢帧策略: {policy}")
+        with self._cond:
+            self.policy = policy
+            self.depth = 1 if policy == self.POLICY_LATEST else max(1, int(depth))
+            self._cond.notify_all()
+
+    @property
+    def total_dropped(self) -> int:
+        return sum(self.dropped.values())
+
+    # --- 生产者（采集线程） ---
+
+    @pyqtSlot(list)
+    def put_batch(self, frames: list):
+        """
+        放入一批帧。连接 DataParser.temperature_batch_ready 时要用 Qt.DirectConnection，
+        让它直接在采集线程里执行。
+        """
+        # 逐帧加锁放入："block" 策略下等待前必须已经把通知发出去，否则界面线程不会来取
+        for frame in frames:
+            self.put(frame)
+
+    def put(self, frame):
+        """放入一帧"""
+        with self._cond:
+            notify = self._put_locked(frame)
+        if notify:
+            self.frames_available.emit()
+
+    def _put_locked(self, frame) -> bool:
+        """持有锁时调用；返回是否需要发 frames_available 通知"""
+        queue = self._queues.get(frame.channel_id)
+        if queue is None:
+            queue = self._queues[frame.channel_id] = deque()
+
+        if len(queue) >= self.depth and self.policy == self.POLICY_BLOCK:
+            # 等界面线程取走；超时后按丢帧处理，避免采集线程永久阻塞
+            self._cond.wait_for(lambda: len(queue) < self.depth, timeout=self.block_timeout)
+        while len(queue) >= self.depth:
+            self._drop(queue.popleft())
+
+        queue.append(frame)
+        self._pending += 1
+        if self._notified:
+            return False
+        self._notified = True
+        return True
+
+    def _drop(self, frame):
+        self._pending -= 1
+        self.dropped[frame.channel_id] = self.dropped.get(frame.channel_id, 0) + 1
+        if self.frame_pool is not None:
+            self.frame_pool.release(frame)
+
+    # --- 消费者（界面线程） ---
+
+    def take_all(self) -> list:
+        """取走所有通道里的全部帧（各通道内按到达顺序），并唤醒被阻塞的采集线程"""
+        with self._cond:
+            frames = []
+            for queue in self._queues.values():
+                frames.extend(queue)
+                queue.clear()
+            self._pending = 0
+            self._notified = False
+            self._cond.notify_all()
+        return frames
+
+    def clear(self):
+        """丢弃所有待取的帧（不计入丢帧数）"""
+        frames = self.take_all()
+        if self.frame_pool is not None:
+            self.frame_pool.release_all(frames)
+
+    def __len__(self):
+        return self._pending
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: frame_stats.py
+@Author: 杜塞米
+@CreateDate: 2026/2/15
+@LastEditTime:
+@Description: 每帧温度的统计摘要（最高/最低/平均温度、最高温度位置、前K个热点）
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   FrameStatsCalculator 把一帧温度按 block 个点一组看成 (组数, block) 的二维视图（不复制），
+#   用 numpy 一次性求出每组的最大值、最小值和总和，写进复用的临时数组：
+#     - 全帧最高/最低温度和平均值直接由这几个小数组得到；
+#     - 热点 = 组最大值里用 argpartition 选出的前K组，再在这K组内各找一次最大点，
+#       相邻的热点至少相隔一组，同一个高温区域不会占满前K名。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+class FrameStats:
+    """一帧温度的统计结果"""
+    __slots__ = ("max_temp", "min_temp", "mean_temp", "max_index", "max_position", "hotspots")
+
+    def __init__(self):
+        self.max_temp = np.nan
+        self.min_temp = np.nan
+        self.mean_temp = np.nan
+        self.max_index = -1
+        self.max_position = np.nan      # 最高温度所在位置（m）
+        self.hotspots = []              # [(位置m, 温度), ...]，按温度从高到低
+
+    def __repr__(self):
+        return (f"FrameStats(max={self.max_temp:.2f}@{self.max_position:.1f}m, "
+                f"min={self.min_temp:.2f}, mean={self.mean_temp:.2f}, hotspots={len(self.hotspots)})")
+
+
+class FrameStatsCalculator:
+    """
+    - top_k: 热点个数
+    - block: 分组的点数，也是两个热点之间的最小间隔（点）
+    """
+
+    def __init__(self, top_k: int = 5, block: int = 32):
+        self.top_k = top_k
+        self.block = block
+        self._size = -1
+        self._block_max = None
+        self._block_min = None
+        self._block_sum = None
+
+    def _allocate(self, n: int):
+        blocks = max(1, -(-n // self.block))
+        self._block_max = np.empty(blocks, dtype=np.float32)
+        self._block_min = np.empty(blocks, dtype=np.float32)
+        self._block_sum = np.empty(blocks, dtype=np.float64)
+        self._size = n
+
+    def compute(self, temperatures: np.ndarray, x_start: float = 0.0, x_step: float = 0.5,
+                stats: FrameStats = None) -> FrameStats:
+        """
+        计算一帧温度的统计结果。
+        - x_start / x_step: 第一个点的位置和点间距（m），用来把下标换算成距离
+        - stats: 传入已有的 FrameStats 则原地更新（不再新建对象）
+        """
+        if stats is None:
+            stats = FrameStats()
+        n = len(temperatures)
+        if n == 0:
+            stats.__init__()
+            return stats
+        if n != self._size:
+            self._allocate(n)
+
+        # 完整的组看成二维视图一次归约，不足一组的尾巴单独算
+        block = self.block
+        full = n // block
+        if full:
+            grid = temperatures[:full * block].reshape(full, block)
+            np.max(grid, axis=1, out=self._block_max[:full])
+            np.min(grid, axis=1, out=self._block_min[:full])
+            np.sum(grid, axis=1, dtype=np.float64, out=self._block_sum[:full])
+        if full * block < n:
+            tail = temperatures[full * block:]
+            self._block_max[full] = tail.max()
+            self._block_min[full] = tail.min()
+            self._block_sum[full] = tail.sum(dtype=np.float64)
+
+        block_max = self._block_max
+        stats.max_temp = float(block_max.max())
+        stats.min_temp = float(self._block_min.min())
+        stats.mean_temp = float(self._block_sum.sum() / n)
+
+        # 前K个热点：先在组最大值里选出前K组（按温度从高到低），再在组内找最大点
+        k = min(self.top_k, len(block_max))
+        top_blocks = np.argpartition(block_max, len(block_max) - k)[-k:]
+        top_blocks = top_blocks[np.argsort(block_max[top_blocks])[::-1]]
+        indices = []
+        for b in top_blocks:
+            start = int(b) * block
+            indices.append(start + int(temperatures[start:start + block].argmax()))
+        stats.hotspots = [(x_start + i * x_step, float(temperatures[i])) for i in indices]
+        stats.max_index = indices[0]
+        stats.max_position = x_start + indices[0] * x_step
+        return stats
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: frames.py
+@Author: 杜塞米
+@CreateDate: 2026/2/4
+@LastEditTime:
+@Description: 温度帧类型（__slots__）和可复用的帧对象池
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   以前每个温度包都会生成一个10个键的 dict，跨线程发信号时还要整体封送。
+#   TemperatureFrame 用 __slots__ 固定字段，内存紧凑、访问快；
+#   FramePool 保存用完的帧对象，下次解析直接复用（连同它的温度数组），
+#   高帧率下不再持续产生垃圾对象，减少GC停顿。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+from collections import deque
+import numpy as np
+
+
+class TemperatureFrame:
+    """
+    一帧温度数据：温度包头部字段 + 温度数组 + 接收时间戳 + 序号。
+    字段名与 protocol.PACKET_SPECS 中温度包的字段名一致。
+    """
+    __slots__ = ('device_id', 'total_len', 'data_type', 'channel_id', 'data_start_point',
+                 'data_end_point', 'total_channels', 'current_channel',
+                 'temperatures', 'timestamp', 'sequence')
+
+    def __init__(self):
+        self.device_id = 0
+        self.total_len = 0
+        self.data_type = 0
+        self.channel_id = 0
+        self.data_start_point = 0
+        self.data_end_point = 0
+        self.total_channels = 0
+        self.current_channel = 0
+        self.temperatures = None    # np.float32 数组，解析时原地写入
+        self.timestamp = 0.0        # 接收时间（time.time()，秒）
+        self.sequence = 0           # 解析器分配的递增序号
+
+    @property
+    def num_points(self) -> int:
+        return 0 if self.temperatures is None else len(self.temperatures)
+
+    def copy_header_from(self, other: "TemperatureFrame"):
+        """复制除温度数组以外的所有字段"""
+        self.device_id = other.device_id
+        self.total_len = other.total_len
+        self.data_type = other.data_type
+        self.channel_id = other.channel_id
+        self.data_start_point = other.data_start_point
+        self.data_end_point = other.data_end_point
+        self.total_channels = other.total_channels
+        self.current_channel = other.current_channel
+        self.timestamp = other.timestamp
+        self.sequence = other.sequence
+
+    def __repr__(self):
+        return (f"TemperatureFrame(seq={self.sequence}, channel={self.channel_id}, "
+                f"points={self.num_points}, t={self.timestamp:.3f})")
+
+
+class FramePool:
+    """
+    TemperatureFrame 对象池（空闲链表）。
+    - acquire(): 取一个空闲帧，没有就新建
+    - release(frame): 用完后归还，温度数组会留给下一次复用
+    deque 的 append/pop 是原子操作，采集线程取帧、界面线程归还不需要加锁。
+    没有归还的帧只是不能复用，会被GC正常回收，不会出错。
+    """
+
+    def __init__(self, max_free: int = 64):
+        self._free = deque(maxlen=max_free)
+        self.allocated = 0  # 累计新建的帧数，用于观察池子是否够用
+
+    def acquire(self) -> TemperatureFrame:
+        try:
+            return self._free.pop()
+        except IndexError:
+            self.allocated += 1
+            return TemperatureFrame()
+
+    def acquire_like(self, num_points: int) -> TemperatureFrame:
+        """取一个温度数组长度为 num_points 的帧（数组内容未初始化）"""
+        frame = self.acquire()
+        if frame.temperatures is None or len(frame.temperatures) != num_points:
+            frame.temperatures = np.empty(num_points, dtype=np.float32)
+        return frame
+
+    def release(self, frame: TemperatureFrame):
+        if frame is not None:
+            self._free.append(frame)
+
+    def release_all(self, frames):
+        self._free.extend(frames)
+
+    def __len__(self):
+        return len(self._free)
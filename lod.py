@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: lod.py
+@Author: 杜塞米
+@CreateDate: 2026/2/11
+@LastEditTime:
+@Description: 保留峰值的 min/max 抽稀（多级金字塔），按可见范围给曲线喂点
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   长光纤（10km 以上）一帧的点数远多于屏幕像素，把所有点都交给曲线既慢又没用。
+#   MinMaxPyramid 每帧用 numpy 向量化地构建多级 min/max 金字塔：
+#     第k级的每个元素是原始数据里连续 2^k 个点的最小值/最大值。
+#   显示时按可见X范围和视图像素宽度选一级，每个区间输出 (min, max) 两个点，
+#   总点数约为 2×像素宽度。窄的高温点一定会出现在所在区间的 max 里，不会被平滑掉。
+#   DecimatedCurve 把金字塔和 pyqtgraph 曲线/ViewBox 连接起来，缩放平移时自动重新抽稀。
+# -----------------------------------------------------------------------------
+import numpy as np
+
+
+class MinMaxPyramid:
+    """
+    多级 min/max 金字塔。各级缓冲区在数据长度不变时反复复用。
+    - min_level_size: 某一级长度小于它时不再往上构建
+    """
+
+    def __init__(self, min_level_size: int = 64):
+        self.min_level_size = min_level_size
+        self._mins = []     # 第k级最小值（第0级就是原始数据本身）
+        self._maxs = []     # 第k级最大值
+        self._size = -1
+
+    @property
+    def levels(self) -> int:
+        return len(self._mins)
+
+    def _allocate(self, n: int):
+        self._mins = [None]
+        self._maxs = [None]
+        size = n
+        while size > self.min_level_size:
+            size = (size + 1) // 2
+            self._mins.append(np.empty(size, dtype=np.float32))
+            self._maxs.append(np.empty(size, dtype=np.float32))
+        self._size = n
+
+    def build(self, y: np.ndarray):
+        """为新的一帧构建金字塔，总计算量约为 2n 次比较"""
+        n = len(y)
+        if n != self._size:
+            self._allocate(n)
+        self._mins[0] = y
+        self._maxs[0] = y
+        for k in range(1, len(self._mins)):
+            prev_min, prev_max = self._mins[k - 1], self._maxs[k - 1]
+            cur_min, cur_max = self._mins[k], self._maxs[k]
+            half = len(prev_min) // 2
+            np.minimum(prev_min[0:2 * half:2], prev_min[1:2 * half:2], out=cur_min[:half])
+            np.maximum(prev_max[0:2 * half:2], prev_max[1:2 * half:2], out=cur_max[:half])
+            if len(prev_min) % 2:
+                # 奇数长度：最后一个点单独成一个区间
+                cur_min[half] = prev_min[-1]
+                cur_max[half] = prev_max[-1]
+
+    def decimate(self, x: np.ndarray, i0: int, i1: int, max_points: int):
+        """
+        返回下标区间 [i0, i1) 抽稀后的 (x, y)，点数不超过约 max_points。
+        区间内点数本来就不多时直接返回原始数据的切片（不复制）。
+        """
+        n = i1 - i0
+        if n <= max_points or len(self._mins) <= 1:
+            return x[i0:i1], self._mins[0][i0:i1]
+
+        # 每个区间输出2个点，选一级使区间数 <= max_points/2
+        bins_wanted = max(1, max_points // 2)
+        level = 1
+        while level < len(self._mins) - 1 and (n >> level) > bins_wanted:
+            level += 1
+        step = 1 << level
+        b0 = i0 >> level
+        b1 = min((i1 + step - 1) >> level, len(self._mins[level]))
+
+        count = b1 - b0
+        y_out = np.empty(2 * count, dtype=np.float32)
+        y_out[0::2] = self._mins[level][b0:b1]
+        y_out[1::2] = self._maxs[level][b0:b1]
+        x_out = np.repeat(x[b0 * step:b1 * step:step], 2)
+        return x_out, y_out
+
+
+class DecimatedCurve:
+    """
+    给一条 pyqtgraph 曲线加上按视图抽稀的功能。
+    - curve: PlotDataItem
+    - view_box: 曲线所在的 ViewBox
+    - oversample: 每个像素最多给几个点（min/max 各一个，默认2）
+    """
+
+    def __init__(self, curve, view_box, oversample: int = 2):
+        self.curve = curve
+        self.view_box = view_box
+        self.oversample = oversample
+        self.pyramid = MinMaxPyramid()
+        self.x = None
+        self.y = None
+        self._shown = None      # 上次交给曲线的 (i0, i1, max_points)，没变化就不重设数据
+        self._updating = False
+        view_box.sigXRangeChanged.connect(self._on_range_changed)
+        view_box.sigResized.connect(self._on_range_changed)
+
+    def set_data(self, x: np.ndarray, y: np.ndarray):
+        """设置新的一帧数据（x 需单调递增），重建金字塔并按当前视图刷新曲线"""
+        self.x = x
+        self.y = y
+        self.pyramid.build(y)
+        self._shown = None
+        self.refresh()
+
+    def clear(self):
+        self.x = self.y = None
+        self._shown = None
+        self.curve.setData([], [])
+
+    def _on_range_changed(self, *args):
+        self.refresh()
+
+    def refresh(self):
+        if self.x is None or self._updating:
+            return
+        n = len(self.y)
+        max_points = self.oversample * max(int(self.view_box.width()), 100)
+
+        if self.view_box.autoRangeEnabled()[0]:
+            # X轴自动范围时整条曲线都可见（按可见范围裁剪会把自动范围越缩越小）
+            i0, i1 = 0, n
+        else:
+            x_min, x_max = self.view_box.viewRange()[0]
+            i0, i1 = np.searchsorted(self.x, (x_min, x_max))
+            # 两侧各多带一个点，曲线能连到视图边缘
+            i0 = max(int(i0) - 1, 0)
+            i1 = min(int(i1) + 1, n)
+
+        key = (i0, i1, max_points)
+        if key == self._shown:
+            return
+        self._shown = key
+        x_out, y_out = self.pyramid.decimate(self.x, i0, i1, max_points)
+        self._updating = True
+        try:
+            self.curve.setData(x_out, y_out)
+        finally:
+            self._updating = False
@@ -8,26 +8,89 @@
 @Description: 
 @Version: 1.0
 """
+import os
 import sys
+import time
 import numpy as np
 import pyqtgraph as pg
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QGroupBox, QListWidget, QPushButton, QLabel, QTableWidget,
-    QTableWidgetItem, QAbstractItemView, QHeaderView, QMenuBar, QAction, QStatusBar, QRadioButton, QMessageBox, QDialog
+    QGroupBox, QListWidget, QPushButton, QLabel, QTableView, QAbstractItemView, QHeaderView, QMenuBar, QAction, QStatusBar, QRadioButton, QMessageBox, QDialog,
+    QListWidgetItem, QButtonGroup, QStackedWidget, QSlider, QComboBox, QFileDialog
 )
 from PyQt5.QtGui import QFont, QIcon
-from PyQt5.QtCore import Qt, pyqtSlot
+from PyQt5.QtCore import Qt, QTimer, pyqtSlot
 from measurement_param_dialog import FiberMeasurementParamsDialog
 from coeff_calibration_dialog import FiberCoeffCalibrationDialog
 from run_record_dialog import RunRecordSettingsDialog
 from network_manager import NetworkManager
 from dataParser import DataParser
+from frames import TemperatureFrame
+from frame_mailbox import FrameMailbox
+from render_scheduler import RenderScheduler
+from lod import DecimatedCurve
+from channel_state import ChannelState, CHANNEL_COUNT
+from waterfall import WaterfallBuffer, WaterfallView
+from distance_axis import DistanceAxisCache
+from frame_stats import FrameStats, FrameStatsCalculator
+from recorder import FrameRecorder
+from calibration import CalibrationEngine
+from raman import RamanRouter
+from temporal_filter import TemporalFilterStage
+from spatial_filter import SpatialFilterStage
+from acquisition_pipeline import AcquisitionPipeline
+from profile_store import ProfileStore
+from archive import ArchiveWriter
+from archive_reader import ArchiveReader, CombinedArchiveReader
+from playback import PlaybackController
+from chunk_codec import CompressedArchiveWriter, CompressedArchiveReader
+from alarm_log_model import AlarmLogModel, ALARM_WARNING, ALARM_FIXED, ALARM_DIFF, ALARM_BREAK
 
 # 配置网络参数
 MCU_IP = "192.168.100.10"  # MCU的IP地址
 MCU_PORT = 5001             # MCU的通信端口
 
+# 温度曲线最大刷新帧率（显示器看不到更快的刷新，多画只是浪费界面线程CPU）
+RENDER_MAX_FPS = 25
+
+# 各通道曲线的颜色（测量通道1 ~ 测量通道8）
+CHANNEL_COLORS = ['#1f77b4', '#d62728', '#2ca02c', '#ff7f0e', '#9467bd', '#8c564b', '#e377c2', '#17becf']
+
+# 曲线显示模式
+DISPLAY_OVERLAY = 0     # 所有通道叠加在一张图里
+DISPLAY_TILED = 1       # 每个通道一张小图
+DISPLAY_WATERFALL = 2   # 当前选中通道的距离-时间瀑布图
+
+# 温度统计（最高温度、热点）刷新到状态栏和通道列表的间隔
+STATS_PUBLISH_INTERVAL_MS = 500
+
+# 检查运行记录状态（写盘出错、等上一个写盘线程退出后重新启动）的间隔
+RECORD_CHECK_INTERVAL_MS = 1000
+
+# 运行记录和通道配置放在用户自己的数据目录里，不写进程序目录（Windows 下是 %LOCALAPPDATA%，其它系统是 ~/.local/share）
+DATA_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+                        "DTSMonitor")
+
+# 运行记录的默认设置（运行记录设置对话框保存后覆盖）
+DEFAULT_RECORD_CONFIG = {
+    "save_data": True,
+    "interval": 50.0,
+    "path": os.path.join(DATA_DIR, "records"),
+    "compress": False,
+    "save_alarm": True,
+    "save_run_info": True,
+}
+
+# 每个通道的校准表和测量参数保存在这个文件里，启动时读取
+PROFILE_PATH = os.path.join(DATA_DIR, "profiles.json")
+
+# 历史回放的倍速选项
+PLAYBACK_SPEEDS = (1, 2, 5, 10, 60, 600)
+PLAYBACK_SLIDER_STEPS = 10000   # 回放进度条的刻度数
+
+# 瀑布图保留的历史帧数（1Hz 下约1小时）
+WATERFALL_HISTORY_ROWS = 3600
+
 # 主界面窗口
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -42,6 +105,27 @@ class MainWindow(QMainWindow):
         self.showMaximized()
 
         # --- 2. 创建UI组件 ---
+        # 所有通道的最新温度：预分配的 (通道数, 点数) 数组，帧按 channel_id 原地写入
+        self.channel_state = ChannelState(CHANNEL_COUNT)
+        self._channel_visible = [True] * CHANNEL_COUNT
+        self.display_mode = DISPLAY_OVERLAY
+        # 每种显示模式下各通道上次绘制时的数据版本，版本没变的曲线不用重画
+        self._drawn_version = {mode: np.zeros(CHANNEL_COUNT, dtype=np.int64)
+                               for mode in (DISPLAY_OVERLAY, DISPLAY_TILED, DISPLAY_WATERFALL)}
+        # 每个通道的距离轴（按测量参数计算并缓存，测量参数修改后失效）
+        self.distance_axes = DistanceAxisCache(CHANNEL_COUNT)
+        self.measurement_params = {}    # 上次保存的测量参数，下次打开对话框时回填
+        # 每个通道的瀑布图历史（第一次收到该通道数据时才分配）
+        self.waterfalls = [None] * CHANNEL_COUNT
+        # 每个通道最新一帧的统计摘要；每帧都计算，但只按固定间隔刷新到界面上
+        self.stats_calculator = FrameStatsCalculator()
+        self.channel_stats = [FrameStats() for _ in range(CHANNEL_COUNT)]
+        self._stats_dirty = [False] * CHANNEL_COUNT
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setSingleShot(True)
+        self._stats_timer.setInterval(STATS_PUBLISH_INTERVAL_MS)
+        self._stats_timer.timeout.connect(self.publish_stats)
+
         # 创建菜单栏和状态栏
         self._create_menu_bar()
         self._create_status_bar()
@@ -61,22 +145,67 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(right_panel, 7)  # 让右侧面板占据更多空间 (比例为7:1)
 
         # --- 3. 【核心】集成后台逻辑 ---
-        # a.创建数据解析器和网络线程
-        self.parser = DataParser()
+        # a.创建数据解析器和网络线程（批量模式：每次readyRead把缓冲区里的完整包一次取完）
+        self.parser = DataParser(batch_mode=True)
+        self.frame_pool = self.parser.frame_pool
 
-        # b. 创建新的 NetworkManager 实例 (代替 NetworkThread)
-        #    传入 self 作为父对象，当主窗口关闭时，它会自动被清理
-        self.network_manager = NetworkManager(self.parser, self)
+        # b. 创建新的 NetworkManager 实例 (代替 NetworkThread)，
+        #    并把套接字和解析器搬到采集线程，界面卡顿不会影响收包
+        #    （要搬线程就不能有父对象，关闭窗口时在 closeEvent 里停止线程）
+        self.network_manager = NetworkManager(self.parser)
+        self.network_manager.start_acquisition_thread()
 
         # c.连接信号和槽（前后台能沟通的关键） ---
         # self.network_manager.connection_status.connect(self.update_status)
 
-        self.parser.temperature_data_ready.connect(self.update_temperature_display)
+        # 采集流水线：解析出的帧在采集线程里先把 Stokes/Anti-Stokes 曲线配对算成温度，
+        # 再校准、沿光纤方向滤波（先去掉单点尖峰）、按通道做时间平均，最后交给记录和显示
+        self.raman = RamanRouter(self.frame_pool, CHANNEL_COUNT)
+        self.calibration = CalibrationEngine(CHANNEL_COUNT)
+        self.spatial_filter = SpatialFilterStage(CHANNEL_COUNT)
+        self.temporal_filter = TemporalFilterStage(CHANNEL_COUNT)
+        # 上次保存的各通道配置（校准表、测量参数），修改后下一帧生效，不用重启
+        self.profiles = ProfileStore(PROFILE_PATH, CHANNEL_COUNT)
+        try:
+            self.profiles.load()
+        except (OSError, ValueError) as e:
+            print(f"读取通道配置失败，使用默认配置: {e}")
+        self.apply_profiles(range(CHANNEL_COUNT))
+        self.pipeline = AcquisitionPipeline()
+        self.pipeline.add_router(self.raman)
+        self.pipeline.add_stage(self.calibration)
+        self.pipeline.add_stage(self.spatial_filter)
+        self.pipeline.add_stage(self.temporal_filter)
+        self.parser.temperature_batch_ready.connect(self.pipeline.process_batch, Qt.DirectConnection)
+
+        # 运行记录：在采集线程里按保存间隔挑出要记录的帧复制后交给写盘线程，
+        # 所以记录的是全部8个通道处理后的数据，不受界面丢帧的影响；温度写成按小时滚动的二进制归档
+        self.record_config = dict(DEFAULT_RECORD_CONFIG)
+        self.recorder = FrameRecorder(self.record_config["path"], writer_factory=ArchiveWriter)
+        self.apply_record_config(self.record_config)
+        self.pipeline.add_consumer(self.recorder.submit_batch)
+        self._record_timer = QTimer(self)
+        self._record_timer.setInterval(RECORD_CHECK_INTERVAL_MS)
+        self._record_timer.timeout.connect(self.check_recorder)
+        self._record_timer.start()
+        self.network_manager.connection_status.connect(self.on_connection_status)
+
+        # 解析出的帧先放进按通道分开的有界信箱（直接在采集线程里执行），
+        # 界面线程收到通知后一次取走；界面卡顿时旧帧被丢弃，内存和延迟都不会增长
+        self.frame_mailbox = FrameMailbox(FrameMailbox.POLICY_LATEST, frame_pool=self.frame_pool)
+        self.pipeline.add_consumer(self.frame_mailbox.put_batch)
+        # 绘图调度器：限制最大刷新帧率，同一通道只画最新一帧
+        self.render_scheduler = RenderScheduler(self.frame_mailbox, self.update_temperature_display,
+                                                max_fps=RENDER_MAX_FPS, frame_pool=self.frame_pool, parent=self)
+        # 报警数据包（跨线程信号，自动排队到界面线程）写入日志表
+        self.parser.fixed_alarm_ready.connect(self.on_fixed_alarm)
+        self.parser.diff_alarm_ready.connect(self.on_diff_alarm)
+        self.parser.break_alarm_ready.connect(self.on_break_alarm)
         # self.parser.packet_saved.connect(self.on_packet_saved)
 
         # d.启动初始连接 (代替 network_thread.start())
-        #   这是一个非阻塞调用
-        self.network_manager.connect_to_host(MCU_IP, MCU_PORT)
+        #   通过信号排队到采集线程执行，不阻塞界面
+        self.network_manager.request_connect.emit(MCU_IP, MCU_PORT)
 
     def _create_menu_bar(self):
         menu_bar = self.menuBar()
@@ -119,6 +248,9 @@ class MainWindow(QMainWindow):
         action_record_settings = QAction("保存数据", self)
         action_record_settings.triggered.connect(self.open_record_dialog)
         record_menu.addAction(action_record_settings)
+        action_playback = QAction("历史回放", self)
+        action_playback.triggered.connect(self.open_playback)
+        record_menu.addAction(action_playback)
 
         # --- 4. 创建其他顶层菜单 ---
         menus = ["显示设置", "权限管理", "运行记录", "报警分区及转发", "技术支持"]
@@ -128,25 +260,200 @@ class MainWindow(QMainWindow):
     def open_record_dialog(self):
         """弹出运行记录设置窗口"""
         dialog = RunRecordSettingsDialog(self)
+        dialog.set_config(self.record_config)
         if dialog.exec_() == QDialog.Accepted:
-            # 这里可以添加更新全局配置的逻辑
-            pass
+            self.apply_record_config(dialog.get_config())
+
+    @pyqtSlot()
+    def open_playback(self):
+        """选择归档目录进入历史回放：回放的帧和实时数据走同一条显示流程"""
+        directory = QFileDialog.getExistingDirectory(self, "选择历史数据目录", self.record_config["path"])
+        if not directory:
+            return
+        # 录制中途切换过压缩选项时目录里两种格式都有，合在一起按时间回放
+        readers = [reader for reader in (ArchiveReader(directory), CompressedArchiveReader(directory)) if len(reader)]
+        if not readers:
+            QMessageBox.information(self, "历史回放", "该目录下没有历史数据")
+            return
+        self.start_playback(readers[0] if len(readers) == 1 else CombinedArchiveReader(readers))
+
+    def start_playback(self, reader):
+        if self.playback is not None:
+            self.exit_playback()
+        self.playback = PlaybackController(reader, self.frame_pool, parent=self)
+        self.playback.set_speed(PLAYBACK_SPEEDS[self.cb_playback_speed.currentIndex()])
+        self.playback.position_changed.connect(self.on_playback_position_changed)
+        self.playback.playing_changed.connect(self.on_playback_playing_changed)
+        # 绘图调度器改从回放信箱取帧；实时信箱里每个通道最多积压一帧，不会增长
+        self.render_scheduler.set_mailbox(self.playback.mailbox)
+        self._reset_display_history()
+        self.playback_bar.show()
+        self.playback.seek(reader.start_time)
+        print(f"进入历史回放: {reader.directory}，共 {len(reader)} 帧")
+
+    @pyqtSlot()
+    def exit_playback(self):
+        """退出历史回放，恢复显示实时数据"""
+        if self.playback is None:
+            return
+        self.playback.pause()
+        self.render_scheduler.set_mailbox(self.frame_mailbox)
+        self.playback.mailbox.clear()
+        self.playback.deleteLater()
+        self.playback = None
+        self._reset_display_history()
+        self.playback_bar.hide()
+        print("已返回实时数据")
+
+    def _reset_display_history(self):
+        """实时和回放切换时清空瀑布图历史，两边的数据不混在一起"""
+        self.waterfalls = [None] * CHANNEL_COUNT
+        if self.display_mode == DISPLAY_WATERFALL:
+            self._redraw_waterfall()
+
+    @pyqtSlot()
+    def on_play_clicked(self):
+        if self.playback.playing:
+            self.playback.pause()
+        else:
+            self.playback.play()
+
+    @pyqtSlot(bool)
+    def on_playback_playing_changed(self, playing: bool):
+        self.btn_play.setText("暂停" if playing else "播放")
+
+    @pyqtSlot(int)
+    def on_playback_speed_changed(self, index: int):
+        if self.playback is not None:
+            self.playback.set_speed(PLAYBACK_SPEEDS[index])
+
+    @pyqtSlot()
+    def on_playback_slider_released(self):
+        reader = self.playback.reader
+        ratio = self.playback_slider.value() / PLAYBACK_SLIDER_STEPS
+        self.playback.seek(reader.start_time + ratio * (reader.end_time - reader.start_time))
+
+    @pyqtSlot(float)
+    def on_playback_position_changed(self, position: float):
+        reader = self.playback.reader
+        self.playback_time_label.setText(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(position)))
+        if not self.playback_slider.isSliderDown():
+            span = reader.end_time - reader.start_time
+            ratio = (position - reader.start_time) / span if span > 0 else 0.0
+            self.playback_slider.setValue(int(ratio * PLAYBACK_SLIDER_STEPS))
+
+    def apply_record_config(self, config: dict):
+        """按运行记录设置重新启动记录（写盘线程先把已排队的数据写完再退出）"""
+        self.record_config = config
+        self.recorder.stop()
+        self.recorder.directory = config["path"]
+        self.recorder.interval = config["interval"]
+        self.recorder.save_data = config["save_data"]
+        self.recorder.save_alarm = config["save_alarm"]
+        self.recorder.save_run_info = config["save_run_info"]
+        self.recorder.writer_factory = CompressedArchiveWriter if config.get("compress") else ArchiveWriter
+        if self._record_enabled():
+            self.recorder.start()   # 上一个写盘线程还没退出时不启动，由 check_recorder 稍后重试
+
+    def _record_enabled(self) -> bool:
+        config = self.record_config
+        return config["save_data"] or config["save_alarm"] or config["save_run_info"]
+
+    @pyqtSlot()
+    def check_recorder(self):
+        """定时检查运行记录：该记录却没在记录时重新启动，写盘出错时在状态栏提示"""
+        if self._record_enabled() and not self.recorder.running:
+            self.recorder.start()
+        if self.recorder.error is not None:
+            self.record_label.setText(f"运行记录写盘失败: {self.recorder.error}（正在重试）")
+        elif self._record_enabled() and not self.recorder.running:
+            self.record_label.setText("运行记录未启动（等待上一次记录结束）")
+        else:
+            self.record_label.clear()
+
+    @pyqtSlot(str)
+    def on_connection_status(self, message: str):
+        """连接状态变化记入设备运行信息"""
+        self.recorder.record_event("run", message)
 
     def open_dialog_fiber_measurement_params(self):
         """打开光纤测量参数窗口"""
         # 实例化对话框，传入 self 作为父对象，这样弹窗会居中在主窗口
         dialog = FiberMeasurementParamsDialog(self)
+        channels = self.measurement_params.get("channels", [0])
+        first = channels[0] if channels else 0
+        dialog.set_params(dict(self.profiles.active[first].measurement, channels=channels))
 
         # 显示窗口
         # 方法 A: dialog.exec_() -> 模态窗口 (推荐)
         # 用户必须关闭这个窗口才能操作主界面，防止参数没配完就去点别的
         if dialog.exec_() == QDialog.Accepted:
             print("用户点击了保存/确定")
+            self.apply_measurement_params(dialog.get_params())
+
+    def apply_measurement_params(self, params: dict):
+        """把测量参数写进勾选通道的配置并生效"""
+        self.measurement_params = params
+        measurement = {key: value for key, value in params.items() if key != "channels"}
+        for index in params["channels"]:
+            self.profiles.stage(index, self.profiles.pending(index).replace(measurement=measurement))
+        self.publish_profiles()
+
+    def publish_profiles(self):
+        """让编辑过的通道配置整体生效并保存"""
+        try:
+            changed = self.profiles.publish()
+        except OSError as e:
+            # 配置已经生效，只是没写进文件
+            print(f"保存通道配置失败: {e}")
+            changed = range(CHANNEL_COUNT)
+        self.apply_profiles(changed)
+
+    def apply_profiles(self, indices):
+        """
+        按当前生效的配置更新这些通道：距离轴缓存失效、校准系数重建（采集线程从下一帧开始使用），
+        已有数据的曲线按新的距离轴重画
+        """
+        active = self.profiles.active
+        for index in indices:
+            profile = active[index]
+            resolution = profile.measurement["resolution"]
+            start = profile.measurement["start"]
+            self.distance_axes.set_params(index, resolution=resolution, start_offset=start)
+            self.calibration.configure(index, profile.segments, resolution, start)
+            try:
+                self.raman.set_channel(index, resolution=resolution, start_offset=start,
+                                       reference_start=profile.measurement["reference_start"],
+                                       reference_end=profile.measurement["reference_end"],
+                                       reference_temperature=profile.measurement["reference_temperature"])
+            except ValueError as e:
+                print(f"测温通道{index + 1}的比值法参数有误，保持原参数: {e}")
+            try:
+                self.temporal_filter.set_channel(index, profile.measurement["temporal_filter"],
+                                                 profile.measurement["temporal_length"],
+                                                 profile.measurement["temporal_alpha"])
+            except ValueError as e:
+                print(f"测温通道{index + 1}的上位机平均参数有误，保持原设置: {e}")
+            try:
+                self.spatial_filter.set_channel(index, profile.measurement["spatial_filter"],
+                                                profile.measurement["spatial_window"],
+                                                profile.measurement["spatial_polyorder"])
+            except ValueError as e:
+                print(f"测温通道{index + 1}的空间滤波参数有误，保持原设置: {e}")
+            if self.channel_state.has_data(index):
+                for drawn in self._drawn_version.values():
+                    drawn[index] = -1
+        self._redraw_stale_channels()
 
     def open_dialog_fiber_coefficient_calibration(self):
         """打开光纤系数校准窗口"""
         dialog = FiberCoeffCalibrationDialog(self)
+        dialog.set_calibration({index: list(profile.segments) for index, profile in enumerate(self.profiles.active)})
         if dialog.exec_() == QDialog.Accepted:
+            # 采集线程从下一帧开始使用新的校准系数
+            for index, segments in dialog.get_calibration().items():
+                self.profiles.stage(index, self.profiles.pending(index).replace(segments=segments))
+            self.publish_profiles()
             print("校准参数已保存")
 
 
@@ -169,6 +476,13 @@ class MainWindow(QMainWindow):
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("设备连接状态: 192.168.100.123  设备连接正常")
+        # 选中通道的温度摘要固定显示在状态栏右侧，不会被连接状态消息覆盖
+        self.stats_label = QLabel()
+        self.statusBar.addPermanentWidget(self.stats_label)
+        # 运行记录写盘出错、没有在记录时的提示，同样固定显示
+        self.record_label = QLabel()
+        self.record_label.setStyleSheet("color: red;")
+        self.statusBar.addPermanentWidget(self.record_label)
 
     def _create_left_panel(self):
         """创建并返回左侧面板的QWidget"""
@@ -179,10 +493,16 @@ class MainWindow(QMainWindow):
         # 1. 通道列表(创建带标题的分组框)
         channel_group = QGroupBox("当前DTS主机:[Host1]")
         channel_layout = QVBoxLayout()
-        # 创建一个列表控件用于显示通道列表
+        # 创建一个列表控件用于显示通道列表（勾选 = 显示该通道曲线）
         self.channel_list = QListWidget()
-        for i in range(1, 9):
-            self.channel_list.addItem(f"  测量通道{i}")
+        for i in range(1, CHANNEL_COUNT + 1):
+            item = QListWidgetItem(f"  测量通道{i}")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked)
+            self.channel_list.addItem(item)
+        self.channel_list.setCurrentRow(0)     # 当前选中的通道显示在瀑布图里
+        self.channel_list.itemChanged.connect(self.on_channel_visibility_changed)
+        self.channel_list.currentRowChanged.connect(self.on_current_channel_changed)
         # 设置图标等可以后续添加
         channel_layout.addWidget(self.channel_list)
         channel_group.setLayout(channel_layout)
@@ -247,7 +567,20 @@ class MainWindow(QMainWindow):
         # self.help_button.setFixedSize(25, 25)
         self.help_button.setToolTip("图形窗口快捷键说明")
 
+        # 显示模式：叠加 / 分屏（单独放进一个按钮组，不和缩放单选按钮互斥）
+        self.rb_overlay = QRadioButton("叠加显示")
+        self.rb_tiled = QRadioButton("分屏显示")
+        self.rb_waterfall = QRadioButton("瀑布图")
+        self.rb_overlay.setChecked(True)
+        self.display_mode_group = QButtonGroup(self)
+        self.display_mode_group.addButton(self.rb_overlay, DISPLAY_OVERLAY)
+        self.display_mode_group.addButton(self.rb_tiled, DISPLAY_TILED)
+        self.display_mode_group.addButton(self.rb_waterfall, DISPLAY_WATERFALL)
+
         zoom_layout.addWidget(self.temp_start_button)
+        zoom_layout.addWidget(self.rb_overlay)
+        zoom_layout.addWidget(self.rb_tiled)
+        zoom_layout.addWidget(self.rb_waterfall)
         zoom_layout.addStretch()  # 添加伸缩项，让按钮靠左排列
         zoom_layout.addWidget(self.rb_zoom_xy)
         zoom_layout.addWidget(self.rb_zoom_x)
@@ -266,18 +599,75 @@ class MainWindow(QMainWindow):
         self.plot_widget.setTitle('温度曲线', color='k', size='12pt')
         self.plot_widget.setYRange(10, 80)  # 设置一个默认的Y轴范围
 
-        # 绘制示例曲线
-        pen = pg.mkPen(color='b', width=2)
-        self.temp_curve = self.plot_widget.plot(pen = pen)  #这里只写了pen所以报错了，因为第一个数据本该是x轴数据，所以类型错误，需要指定pen=pen
-
-        # 3. 底部的日志表格
-        self.log_table = QTableWidget()
-        self.log_table.setColumnCount(6)
-        self.log_table.setHorizontalHeaderLabels(["时间", "通道", "区域", "内容", "设定阈值", "实际温度"])
+        # 每个通道一条曲线（叠加模式）
+        # 按可见范围做 min/max 抽稀：只给曲线约 2×像素宽度 个点，缩放平移时自动重新抽稀，高温尖峰不会被抹掉
+        self.plot_widget.addLegend()
+        self.overlay_lods = []
+        for i in range(CHANNEL_COUNT):
+            pen = pg.mkPen(color=CHANNEL_COLORS[i], width=2)
+            curve = self.plot_widget.plot(pen=pen, name=f"通道{i + 1}")  # 第一个参数本该是x轴数据，所以需要指定pen=pen
+            self.overlay_lods.append(DecimatedCurve(curve, self.plot_widget.getViewBox()))
+
+        # 分屏模式：每个通道一张小图（4行2列）
+        self.tiled_widget = pg.GraphicsLayoutWidget()
+        self.tiled_widget.setBackground('w')
+        self.tiled_plots = []
+        self.tiled_lods = []
+        for i in range(CHANNEL_COUNT):
+            plot = self.tiled_widget.addPlot(row=i // 2, col=i % 2, title=f"通道{i + 1}")
+            plot.showGrid(x=True, y=True, alpha=0.5)
+            plot.setYRange(10, 80)
+            curve = plot.plot(pen=pg.mkPen(color=CHANNEL_COLORS[i], width=1))
+            self.tiled_plots.append(plot)
+            self.tiled_lods.append(DecimatedCurve(curve, plot.getViewBox()))
+
+        self.plot_stack = QStackedWidget()
+        self.plot_stack.addWidget(self.plot_widget)     # DISPLAY_OVERLAY
+        self.plot_stack.addWidget(self.tiled_widget)    # DISPLAY_TILED
+
+        # 瀑布图模式：选中通道的温度随距离和时间的变化
+        self.waterfall_widget = pg.PlotWidget()
+        self.waterfall_widget.setBackground('w')
+        self.waterfall_view = WaterfallView(self.waterfall_widget.getPlotItem())
+        self.plot_stack.addWidget(self.waterfall_widget)    # DISPLAY_WATERFALL
+
+        # 历史回放控制条（只在回放时显示）
+        self.playback = None
+        self.playback_bar = QGroupBox("历史回放")
+        playback_layout = QHBoxLayout(self.playback_bar)
+        self.btn_play = QPushButton("播放")
+        self.playback_slider = QSlider(Qt.Horizontal)
+        self.playback_slider.setRange(0, PLAYBACK_SLIDER_STEPS)
+        self.cb_playback_speed = QComboBox()
+        self.cb_playback_speed.addItems([f"{speed}×" for speed in PLAYBACK_SPEEDS])
+        self.playback_time_label = QLabel()
+        self.btn_live = QPushButton("返回实时")
+        playback_layout.addWidget(self.btn_play)
+        playback_layout.addWidget(self.playback_slider, 1)
+        playback_layout.addWidget(self.playback_time_label)
+        playback_layout.addWidget(self.cb_playback_speed)
+        playback_layout.addWidget(self.btn_live)
+        self.playback_bar.hide()
+        self.btn_play.clicked.connect(self.on_play_clicked)
+        self.playback_slider.sliderReleased.connect(self.on_playback_slider_released)
+        self.cb_playback_speed.currentIndexChanged.connect(self.on_playback_speed_changed)
+        self.btn_live.clicked.connect(self.exit_playback)
+
+        # 3. 底部的日志表格（模型/视图：记录存在环形数组里，单元格按需格式化）
+        self.log_model = AlarmLogModel(parent=self)
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
+        self.log_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # 固定行高，十万行也不用逐行测量
+        self.log_table.verticalHeader().setDefaultSectionSize(22)
         self.log_table.setEditTriggers(QAbstractItemView.NoEditTriggers)  # 禁止编辑
         self.log_table.setSelectionBehavior(QAbstractItemView.SelectRows)  # 整行选择
         self.log_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # 列宽自适应
 
+        # 滚动条停在最底部时，新记录进来后继续跟随到底部
+        self._log_follow = True
+        self.log_model.rowsAboutToBeInserted.connect(self._on_log_rows_about_to_be_inserted)
+        self.log_model.rowsInserted.connect(self._on_log_rows_inserted)
+
         # 添加示例日志数据
         self._add_sample_log_data()
 
@@ -287,10 +677,12 @@ class MainWindow(QMainWindow):
         self.rb_zoom_x.toggled.connect(self.on_zoom_mode_changed)
         self.rb_zoom_y.toggled.connect(self.on_zoom_mode_changed)
         self.help_button.clicked.connect(self.show_zoom_help_popup)
+        self.display_mode_group.buttonClicked[int].connect(self.on_display_mode_changed)
 
         # 将所有组件添加到右侧布局中
         layout.addWidget(zoom_groupbox)  # 先添加单选按钮组
-        layout.addWidget(self.plot_widget, 4)  # 图表比例为4
+        layout.addWidget(self.playback_bar)
+        layout.addWidget(self.plot_stack, 4)  # 图表比例为4
         layout.addWidget(self.log_table, 1)  # 表格比例为1
 
         return right_widget
@@ -301,7 +693,8 @@ class MainWindow(QMainWindow):
         发送接收温度数据的命令
         """
         command_string = "[E]>START#"
-        self.network_manager.socket.write(command_string.encode('utf-8'))
+        # 套接字在采集线程里，命令通过信号排队过去发送
+        self.network_manager.request_send.emit(command_string)
         print("发送请求温度命令成功")
 
     @pyqtSlot(str)
@@ -339,67 +732,189 @@ class MainWindow(QMainWindow):
 
         # 获取是哪个按钮发射了这个信号
         sender = self.sender()
-        view_box = self.plot_widget.getViewBox()
+        # 叠加图和所有分屏小图使用同一种缩放模式
+        view_boxes = [self.plot_widget.getViewBox()] + [plot.getViewBox() for plot in self.tiled_plots]
 
         if sender == self.rb_zoom_xy:
             # 模式：XY缩放
-            view_box.setMouseEnabled(x=True, y=True)
-            view_box.enableAutoRange()  # 切换到自由模式时，自动恢复一次视图
+            for view_box in view_boxes:
+                view_box.setMouseEnabled(x=True, y=True)
+                view_box.enableAutoRange()  # 切换到自由模式时，自动恢复一次视图
             print("已切换到XY缩放模式")
 
         elif sender == self.rb_zoom_x:
             # 模式：仅X轴
-            view_box.setMouseEnabled(x=True, y=False)
+            for view_box in view_boxes:
+                view_box.setMouseEnabled(x=True, y=False)
             print("已切换到仅X轴缩放模式")
 
         elif sender == self.rb_zoom_y:
             # 模式：仅Y轴
-            view_box.setMouseEnabled(x=False, y=True)
+            for view_box in view_boxes:
+                view_box.setMouseEnabled(x=False, y=True)
             print("已切换到仅Y轴缩放模式")
 
-    @pyqtSlot(dict)
-    def update_temperature_display(self, data: dict):
+    @pyqtSlot(int)
+    def on_display_mode_changed(self, mode: int):
+        """切换叠加/分屏/瀑布图显示，只重画新模式下数据有变化的可见通道"""
+        if mode == self.display_mode:
+            return
+        self.display_mode = mode
+        self.plot_stack.setCurrentIndex(mode)
+        self._redraw_stale_channels()
+
+    @pyqtSlot(QListWidgetItem)
+    def on_channel_visibility_changed(self, item: QListWidgetItem):
+        """通道列表勾选状态变化：隐藏的通道不再重绘"""
+        index = self.channel_list.row(item)
+        visible = item.checkState() == Qt.Checked
+        if visible == self._channel_visible[index]:
+            return
+        self._channel_visible[index] = visible
+        self.overlay_lods[index].curve.setVisible(visible)
+        self.tiled_plots[index].setVisible(visible)
+        if visible:
+            self._redraw_stale_channels()
+
+    @pyqtSlot(int)
+    def on_current_channel_changed(self, index: int):
+        """通道列表选中项变化：瀑布图和状态栏摘要切换到该通道"""
+        self.publish_stats()
+        if self.display_mode == DISPLAY_WATERFALL:
+            self._redraw_waterfall()
+
+    def _distance_axis(self, index: int) -> np.ndarray:
+        """第 index 个通道当前数据的距离轴（缓存的只读数组）"""
+        header = self.channel_state.headers[index]
+        data_start_point, data_end_point = (0, None) if header is None else header[1:]
+        return self.distance_axes.get(index, int(self.channel_state.num_points[index]),
+                                      data_start_point, data_end_point)
+
+    def _redraw_waterfall(self):
+        index = self.channel_list.currentRow()
+        if index < 0:
+            return
+        self.waterfall_widget.setTitle(f'测量通道{index + 1} 瀑布图', color='k', size='12pt')
+        distances = self._distance_axis(index)
+        x_start = distances[0] if len(distances) else 0.0
+        self.waterfall_view.show(self.waterfalls[index], x_start, self.distance_axes.resolution[index])
+        self._drawn_version[DISPLAY_WATERFALL][index] = self.channel_state.version[index]
+
+    def _redraw_stale_channels(self):
+        """重画当前模式下所有可见、且数据比上次绘制新的通道"""
+        drawn = self._drawn_version[self.display_mode]
+        for index in range(CHANNEL_COUNT):
+            if self._channel_visible[index] and drawn[index] != self.channel_state.version[index]:
+                self._redraw_channel(index)
+
+    def _redraw_channel(self, index: int):
+        """用通道状态数组里的最新数据刷新当前显示模式下的曲线"""
+        if self.display_mode == DISPLAY_WATERFALL:
+            # 瀑布图只显示选中的那个通道
+            if index == self.channel_list.currentRow():
+                self._redraw_waterfall()
+            return
+
+        temperatures = self.channel_state.row(index)
+        distances = self._distance_axis(index)
+
+        # 【关键】按当前视图抽稀后再 setData()，长光纤也只画屏幕放得下的点数
+        lods = self.overlay_lods if self.display_mode == DISPLAY_OVERLAY else self.tiled_lods
+        lods[index].set_data(distances, temperatures)
+        self._drawn_version[self.display_mode][index] = self.channel_state.version[index]
+
+    @pyqtSlot(TemperatureFrame)
+    def update_temperature_display(self, frame: TemperatureFrame):
         """
         核心槽函数：接收解析后的温度数据并更新图表。
-        `data` 是从 DataParser 发射过来的包含所有信息的字典。
+        `frame` 是从 DataParser 发射过来的温度帧。
         """
-        # a. 从字典中安全地取出温度数据（NumPy数组）
-        temperatures = data.get("temperatures")
-        if temperatures is None:
+        # a. 按 channel_id 把温度原地写进通道状态数组，写完帧就可以归还对象池了
+        index = self.channel_state.write(frame)
+        self.frame_pool.release(frame)
+        if index < 0:
+            print(f"收到未知通道 {frame.channel_id} 的数据，已忽略")
             return
 
-        # b. 创建X轴数据（距离）
-        num_points = len(temperatures)
-        distances = np.arange(0, num_points * 0.5, 0.5)
+        # b. 不管当前显示哪种模式，瀑布图历史都要追加一行
+        waterfall = self.waterfalls[index]
+        if waterfall is None:
+            waterfall = self.waterfalls[index] = WaterfallBuffer(WATERFALL_HISTORY_ROWS)
+        waterfall.append(self.channel_state.row(index))
+
+        # c. 统计摘要：每帧都算（一次向量化归约），界面上按固定间隔刷新
+        distances = self._distance_axis(index)
+        self.stats_calculator.compute(self.channel_state.row(index), distances[0],
+                                      self.distance_axes.resolution[index], stats=self.channel_stats[index])
+        self._stats_dirty[index] = True
+        if not self._stats_timer.isActive():
+            self._stats_timer.start()
 
-        # c. 【关键】使用 setData() 高效更新曲线
-        self.temp_curve.setData(distances, temperatures)
+        # d. 隐藏的通道只更新状态，不重绘
+        if self._channel_visible[index]:
+            self._redraw_channel(index)
 
-        # d. (可选) 更新一些摘要信息
-        # max_temp = np.max(temperatures)
-        # self.statusBar.showMessage(f"数据已更新 | 通道: {data.get('channel_id')} | 最高温度: {max_temp:.2f}°C")
+    @pyqtSlot()
+    def publish_stats(self):
+        """把有更新的通道统计摘要刷新到通道列表，选中通道的摘要显示在状态栏"""
+        for index in range(CHANNEL_COUNT):
+            if not self._stats_dirty[index]:
+                continue
+            self._stats_dirty[index] = False
+            stats = self.channel_stats[index]
+            item = self.channel_list.item(index)
+            item.setText(f"  测量通道{index + 1}  最高 {stats.max_temp:.1f}°C")
+            item.setToolTip("热点:\n" + "\n".join(f"{pos:.1f} m  {temp:.1f}°C" for pos, temp in stats.hotspots))
+
+        index = self.channel_list.currentRow()
+        if index >= 0 and not np.isnan(self.channel_stats[index].max_temp):
+            stats = self.channel_stats[index]
+            self.stats_label.setText(
+                f"通道{index + 1} | 最高: {stats.max_temp:.2f}°C @ {stats.max_position:.1f} m"
+                f" | 最低: {stats.min_temp:.2f}°C | 平均: {stats.mean_temp:.2f}°C")
 
     def _add_sample_log_data(self):
         """向表格中添加示例数据"""
-        row_data = ["08-28 16:06:34", "通道1", "区域1", "报警: 预警", "设定阈值: 100.0c", "实际温度: ?"]
-        row_position = self.log_table.rowCount()
-        self.log_table.insertRow(row_position)
-        for col, data in enumerate(row_data):
-            self.log_table.setItem(row_position, col, QTableWidgetItem(data))
-        # 插入一些空行
-        for i in range(5):
-            self.log_table.insertRow(self.log_table.rowCount())
+        self.log_model.append(ALARM_WARNING, channel=1, zone=1, threshold=100.0)
+
+    @pyqtSlot()
+    def _on_log_rows_about_to_be_inserted(self):
+        scroll_bar = self.log_table.verticalScrollBar()
+        self._log_follow = scroll_bar.value() >= scroll_bar.maximum()
+
+    @pyqtSlot()
+    def _on_log_rows_inserted(self):
+        if self._log_follow:
+            self.log_table.scrollToBottom()
+
+    # 报警数据包的内容格式还没有定下来，暂时只记录报警类型和时间
+    @pyqtSlot(dict)
+    def on_fixed_alarm(self, packet: dict):
+        self.log_model.append(ALARM_FIXED)
+        self.recorder.record_event("alarm", "定温报警")
+
+    @pyqtSlot(dict)
+    def on_diff_alarm(self, packet: dict):
+        self.log_model.append(ALARM_DIFF)
+        self.recorder.record_event("alarm", "差温报警")
+
+    @pyqtSlot(dict)
+    def on_break_alarm(self, packet: dict):
+        self.log_model.append(ALARM_BREAK)
+        self.recorder.record_event("alarm", "断纤报警")
 
     @pyqtSlot()
     def disconnect_device(self):
         """槽函数：响应“设备断开”菜单项"""
         print("正在断开连接...")
-        self.network_manager.disconnect_from_host()
+        self.network_manager.request_disconnect.emit()
 
     def closeEvent(self, event):
         """重写窗口关闭事件，确保在关闭窗口时，后台线程也能被安全地停止。"""
         print("正在关闭应用程序...")
-        self.network_manager.disconnect_from_host()
+        self.network_manager.stop_acquisition_thread()
+        self._record_timer.stop()
+        self.recorder.stop()     # 采集停止后再停记录，队列里剩下的帧都能写进文件
         event.accept()
 
 if __name__ == "__main__":
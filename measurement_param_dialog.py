@@ -11,8 +11,11 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QGroupBox, QRadioButton,
                              QComboBox, QListWidget, QListWidgetItem, QGridLayout,
-                             QSpacerItem, QSizePolicy, QWidget)
+                             QSpacerItem, QSizePolicy, QWidget, QMessageBox)
 from PyQt5.QtCore import Qt, pyqtSlot
+from distance_axis import RESOLUTION_OPTIONS
+from temporal_filter import FILTER_OPTIONS, FILTER_NONE, FILTER_EMA
+from spatial_filter import SPATIAL_OPTIONS, SPATIAL_NONE, SPATIAL_SAVGOL
 
 
 class FiberMeasurementParamsDialog(QDialog):
@@ -109,12 +112,12 @@ class FiberMeasurementParamsDialog(QDialog):
 
         gb_fiber_layout.addWidget(QLabel("A探测分辨率"))
         self.cb_resolution1 = QComboBox()
-        self.cb_resolution1.addItems(["2米 (20ns)", "1米 (10ns)", "0.5米 (5ns)"])
+        self.cb_resolution1.addItems([text for text, _ in RESOLUTION_OPTIONS])
         gb_fiber_layout.addWidget(self.cb_resolution1)
 
         gb_fiber_layout.addWidget(QLabel("B探测分辨率"))
         self.cb_resolution2 = QComboBox()
-        self.cb_resolution2.addItems(["2米 (20ns)", "1米 (10ns)", "0.5米 (5ns)"])
+        self.cb_resolution2.addItems([text for text, _ in RESOLUTION_OPTIONS])
         gb_fiber_layout.addWidget(self.cb_resolution2)
 
         # 上面添加功能，把探测分辨率改成A和B
@@ -143,7 +146,43 @@ class FiberMeasurementParamsDialog(QDialog):
         gb_current.setLayout(gb_current_layout)
         right_layout.addWidget(gb_current)
 
-        # --- 5. 底部按钮区 ---
+        # --- 5. 分组框：上位机平均（在设备平均的基础上再沿时间方向平均） ---
+        gb_filter = QGroupBox("上位机平均")
+        gb_filter_layout = QHBoxLayout()
+
+        gb_filter_layout.addWidget(QLabel("平均方式"))
+        self.cb_temporal_filter = QComboBox()
+        self.cb_temporal_filter.addItems([text for text, _ in FILTER_OPTIONS])
+        gb_filter_layout.addWidget(self.cb_temporal_filter)
+        gb_filter_layout.addWidget(QLabel("帧数"))
+        self.le_temporal_length = QLineEdit("8")
+        gb_filter_layout.addWidget(self.le_temporal_length)
+        gb_filter_layout.addWidget(QLabel("指数平均系数"))
+        self.le_temporal_alpha = QLineEdit("0.2")
+        gb_filter_layout.addWidget(self.le_temporal_alpha)
+
+        gb_filter.setLayout(gb_filter_layout)
+        right_layout.addWidget(gb_filter)
+
+        # --- 6. 分组框：空间滤波（沿光纤方向平滑，去掉单点尖峰） ---
+        gb_spatial = QGroupBox("空间滤波")
+        gb_spatial_layout = QHBoxLayout()
+
+        gb_spatial_layout.addWidget(QLabel("滤波方式"))
+        self.cb_spatial_filter = QComboBox()
+        self.cb_spatial_filter.addItems([text for text, _ in SPATIAL_OPTIONS])
+        gb_spatial_layout.addWidget(self.cb_spatial_filter)
+        gb_spatial_layout.addWidget(QLabel("窗口点数"))
+        self.le_spatial_window = QLineEdit("5")
+        gb_spatial_layout.addWidget(self.le_spatial_window)
+        gb_spatial_layout.addWidget(QLabel("多项式阶数"))
+        self.le_spatial_polyorder = QLineEdit("2")
+        gb_spatial_layout.addWidget(self.le_spatial_polyorder)
+
+        gb_spatial.setLayout(gb_spatial_layout)
+        right_layout.addWidget(gb_spatial)
+
+        # --- 7. 底部按钮区 ---
         # "更新当前参数" 按钮似乎是独立的一行
         # update_layout = QHBoxLayout()
         # update_layout.addStretch()
@@ -173,6 +212,8 @@ class FiberMeasurementParamsDialog(QDialog):
 
         # 初始化界面状态（处理灰显逻辑）
         self.on_mode_changed()
+        self.on_temporal_filter_changed()
+        self.on_spatial_filter_changed()
 
     def setup_connections(self):
         # 按钮连接
@@ -183,6 +224,8 @@ class FiberMeasurementParamsDialog(QDialog):
         # 单选框逻辑连接：切换模式时禁用/启用输入框
         self.rb_accum_time.toggled.connect(self.on_mode_changed)
         self.rb_calc_param.toggled.connect(self.on_mode_changed)
+        self.cb_temporal_filter.currentIndexChanged.connect(self.on_temporal_filter_changed)
+        self.cb_spatial_filter.currentIndexChanged.connect(self.on_spatial_filter_changed)
 
     @pyqtSlot()
     def on_mode_changed(self):
@@ -198,23 +241,106 @@ class FiberMeasurementParamsDialog(QDialog):
         self.le_avg_count.setEnabled(not is_accum_mode)
 
     @pyqtSlot()
-    def on_save(self):
-        """点击保存设置"""
-        # 1. 获取当前选中的通道
-        checked_channels = []
-        for i in range(self.channel_list.count()):
-            item = self.channel_list.item(i)
-            if item.checkState() == Qt.Checked:
-                checked_channels.append(item.text())
+    def on_temporal_filter_changed(self):
+        """帧数只对滑动平均/中值有效，系数只对指数平均有效"""
+        mode = FILTER_OPTIONS[self.cb_temporal_filter.currentIndex()][1]
+        self.le_temporal_length.setEnabled(mode not in (FILTER_NONE, FILTER_EMA))
+        self.le_temporal_alpha.setEnabled(mode == FILTER_EMA)
 
-        # 2. 获取参数值
-        length_start = self.le_len_start.text()
-        length_end = self.le_len_end.text()
-
-        print(f"保存设置: 通道={checked_channels}, 长度={length_start}-{length_end}")
+    @pyqtSlot()
+    def on_spatial_filter_changed(self):
+        """多项式阶数只对 Savitzky-Golay 有效"""
+        mode = SPATIAL_OPTIONS[self.cb_spatial_filter.currentIndex()][1]
+        self.le_spatial_window.setEnabled(mode != SPATIAL_NONE)
+        self.le_spatial_polyorder.setEnabled(mode == SPATIAL_SAVGOL)
+
+    def set_params(self, params: dict):
+        """用已有的测量参数填充界面（字段同 get_params 的返回值，缺少的字段保持默认）"""
+        if "channels" in params:
+            for i in range(self.channel_list.count()):
+                checked = i in params["channels"]
+                self.channel_list.item(i).setCheckState(Qt.Checked if checked else Qt.Unchecked)
+        for key, edit in self._number_edits():
+            if key in params:
+                edit.setText(str(params[key]))
+        if "by_time" in params:
+            (self.rb_accum_time if params["by_time"] else self.rb_calc_param).setChecked(True)
+        for i, (_, mode) in enumerate(FILTER_OPTIONS):
+            if params.get("temporal_filter") == mode:
+                self.cb_temporal_filter.setCurrentIndex(i)
+        for i, (_, mode) in enumerate(SPATIAL_OPTIONS):
+            if params.get("spatial_filter") == mode:
+                self.cb_spatial_filter.setCurrentIndex(i)
+        for key, combo in (("resolution", self.cb_resolution1), ("resolution_b", self.cb_resolution2)):
+            for i, (_, metres) in enumerate(RESOLUTION_OPTIONS):
+                if params.get(key) == metres:
+                    combo.setCurrentIndex(i)
+
+    def get_params(self) -> dict:
+        """
+        读取界面上的测量参数：
+        - channels: 勾选的通道下标列表（从0开始）
+        - start / end: 实际光纤长度的起点和终点（m）
+        - resolution / resolution_b: A/B 探测分辨率（m）
+        - by_time: 按测量时间（True）还是按运算参数（False）
+        - estimated_length / measure_time / single_time / average_count: 运算参数
+        - laser_power / pump_current_a / pump_current_b: 激光功率和 A/B 通道泵浦电流
+        - temporal_filter / temporal_length / temporal_alpha: 上位机平均方式、帧数、指数平均系数
+        - spatial_filter / spatial_window / spatial_polyorder: 空间滤波方式、窗口点数、多项式阶数
+        输入不是数字时抛出 ValueError
+        """
+        channels = [i for i in range(self.channel_list.count())
+                    if self.channel_list.item(i).checkState() == Qt.Checked]
+        params = {
+            "channels": channels,
+            "resolution": RESOLUTION_OPTIONS[self.cb_resolution1.currentIndex()][1],
+            "resolution_b": RESOLUTION_OPTIONS[self.cb_resolution2.currentIndex()][1],
+            "by_time": self.rb_accum_time.isChecked(),
+            "temporal_filter": FILTER_OPTIONS[self.cb_temporal_filter.currentIndex()][1],
+            "spatial_filter": SPATIAL_OPTIONS[self.cb_spatial_filter.currentIndex()][1],
+        }
+        for key, edit in self._number_edits():
+            params[key] = float(edit.text())
+        params["average_count"] = int(params["average_count"])
+        for key in ("temporal_length", "spatial_window", "spatial_polyorder"):
+            params[key] = int(params[key])
+        return params
+
+    def _number_edits(self):
+        """数字输入框和参数字段的对应关系"""
+        return (("start", self.le_len_start), ("end", self.le_len_end),
+                ("estimated_length", self.le_est_len), ("measure_time", self.le_accum_time),
+                ("single_time", self.le_single_time), ("average_count", self.le_avg_count),
+                ("laser_power", self.le_laser_power),
+                ("pump_current_a", self.le_current1), ("pump_current_b", self.le_current2),
+                ("temporal_length", self.le_temporal_length), ("temporal_alpha", self.le_temporal_alpha),
+                ("spatial_window", self.le_spatial_window), ("spatial_polyorder", self.le_spatial_polyorder))
 
-        # 这里你可以添加校验逻辑，或者发射自定义信号把数据传回主界面
-        self.accept()  # 关闭并返回 Accepted 状态
+    @pyqtSlot()
+    def on_save(self):
+        """点击保存设置"""
+        try:
+            params = self.get_params()
+        except ValueError:
+            QMessageBox.warning(self, "参数错误", "参数必须是数字")
+            return
+        if params["end"] <= params["start"]:
+            QMessageBox.warning(self, "参数错误", "光纤长度的终点必须大于起点")
+            return
+        if min(params["measure_time"], params["single_time"], params["average_count"]) <= 0:
+            QMessageBox.warning(self, "参数错误", "测量时间和平均次数必须大于0")
+            return
+        if params["temporal_length"] < 1 or not 0 < params["temporal_alpha"] <= 1:
+            QMessageBox.warning(self, "参数错误", "平均帧数必须大于0，指数平均系数必须在0到1之间")
+            return
+        if params["spatial_window"] < 3 or params["spatial_window"] % 2 == 0 \
+                or not 0 <= params["spatial_polyorder"] < params["spatial_window"]:
+            QMessageBox.warning(self, "参数错误", "窗口点数必须是不小于3的奇数，多项式阶数必须小于窗口点数")
+            return
+
+        print(f"保存设置: 通道={params['channels']}, 长度={params['start']}-{params['end']}, "
+              f"分辨率={params['resolution']}m")
+        self.accept()  # 关闭并返回 Accepted 状态，主界面通过 get_params() 取回参数
 
     # @pyqtSlot()
     # def on_update(self):
@@ -13,8 +13,11 @@
 #   使用 PyQt5 的 QTcpSocket 来管理异步网络连接。
 #   这个类取代了之前基于 'socket' 和 'QThread' 的 NetworkThread。
 #   它被设计为在主线程中运行，并利用 Qt 的事件循环和信号槽机制。
+#   也可以调用 start_acquisition_thread() 把套接字和 DataParser 一起搬到专门的
+#   采集线程里运行：界面重绘再慢也不会耽误读取套接字，只有解析好的帧
+#   通过排队信号回到界面线程。
 # -----------------------------------------------------------------------------
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QObject, QThread, QMetaObject, QCoreApplication, Qt, pyqtSignal, pyqtSlot
 from PyQt5.QtNetwork import QTcpSocket, QAbstractSocket
 # QTcpSocket 是一个专门为 TCP 通信设计好的、功能完整的类（Class）
 from dataParser import DataParser
@@ -28,12 +31,20 @@ class NetworkManager(QObject):
     # 信号1: 用于在UI上显示连接状态 (与 NetworkThread 保持一致)
     connection_status = pyqtSignal(str)
 
+    # 控制请求信号：在界面线程里发射，由 NetworkManager 所在的线程执行对应的槽函数。
+    # 采集线程模式下必须通过这几个信号操作，不要从界面线程直接调用槽函数。
+    request_connect = pyqtSignal(str, int)
+    request_disconnect = pyqtSignal()
+    request_send = pyqtSignal(str)
+
     def __init__(self, parser: DataParser, parent=None):
         """
         初始化网络管理器。
         - parser: 传入 DataParser 实例，用于处理收到的数据。
+        - parent: 需要使用采集线程模式时必须为 None（有父对象的 QObject 不能 moveToThread）。
         """
         super().__init__(parent)
+        self._thread = None  # 采集线程（采集线程模式下才有）
 
         self.socket = QTcpSocket(self)   # 内部的构造函数已经完成了连接MCU的底层设置
         self.parser = parser
@@ -55,6 +66,49 @@ class NetworkManager(QObject):
         # 4. 当发生错误时触发
         self.socket.errorOccurred.connect(self.on_error)
 
+        # 5. 控制请求：发射线程和本对象不在同一线程时，Qt 会自动排队到本对象所在线程执行
+        self.request_connect.connect(self.connect_to_host)
+        self.request_disconnect.connect(self.disconnect_from_host)
+        self.request_send.connect(self.send_command)
+
+    # --- 采集线程 ---
+
+    def start_acquisition_thread(self):
+        """
+        把 NetworkManager（连同它的 QTcpSocket 子对象）和 DataParser 搬到专门的采集线程。
+        之后 readyRead 和解析都在采集线程里执行，DataParser 发出的信号会自动排队送回界面线程。
+        """
+        if self._thread is not None:
+            return
+        self._thread = QThread()
+        self._thread.setObjectName("AcquisitionThread")
+        self.moveToThread(self._thread)
+        if self.parser:
+            self.parser.moveToThread(self._thread)
+        self._thread.start()
+        print("NetworkManager: 采集线程已启动")
+
+    def stop_acquisition_thread(self):
+        """在采集线程里断开连接（等待执行完毕），然后结束采集线程"""
+        if self._thread is None:
+            self.disconnect_from_host()
+            return
+        # 阻塞排队调用：等采集线程把断开流程（包括等待FIN发送）执行完再返回
+        QMetaObject.invokeMethod(self, "_shutdown_in_thread", Qt.BlockingQueuedConnection)
+        self._thread.quit()
+        self._thread.wait()
+        self._thread = None
+        print("NetworkManager: 采集线程已停止")
+
+    @pyqtSlot()
+    def _shutdown_in_thread(self):
+        """在采集线程内执行：断开连接，再把对象搬回主线程，之后在主线程析构套接字才是安全的"""
+        self.disconnect_from_host()
+        main_thread = QCoreApplication.instance().thread()
+        self.moveToThread(main_thread)
+        if self.parser:
+            self.parser.moveToThread(main_thread)
+
     # --- QTcpSocket 的槽函数 ---
 
     @pyqtSlot()
@@ -81,12 +135,10 @@ class NetworkManager(QObject):
         # .readAll() 读取缓冲区中 *所有* 可用的数据
         raw_data = self.socket.readAll()
 
-        # 将 QByteArray 转换为 Python bytes，以便 DataParser 处理
-        data_bytes = bytes(raw_data)
-
-        # 将数据片段喂给 DataParser (DataParser 的逻辑完全不变)
+        # QByteArray 支持缓冲区协议，直接交给 DataParser 追加进缓冲区，
+        # 不再先转换成 bytes（省掉一次整块复制）
         if self.parser:
-            self.parser.parse_data(data_bytes)
+            self.parser.parse_data(raw_data)
 
     @pyqtSlot(QAbstractSocket.SocketError)
     def on_error(self, socket_error):
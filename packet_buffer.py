@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: packet_buffer.py
+@Author: 杜塞米
+@CreateDate: 2026/2/2
+@LastEditTime:
+@Description: 预分配的接收缓冲区（读写游标 + memoryview），避免 bytes 反复拼接和切片
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   以前 DataParser 用 `self.buffer += raw_data` 和 `self.buffer = self.buffer[n:]`
+#   管理缓冲区，每来一个TCP分片、每取走一个包都要把整个缓冲区复制一遍。
+#   这里改成一块预分配的 bytearray + 读/写两个游标：
+#     - 追加数据只复制新来的字节；
+#     - 取走数据只移动读游标，不复制；
+#     - 只有尾部空间不够时才把“剩余的半个包”挪回开头（压缩），或者扩容。
+#   包头检查、长度读取、取包都直接在 memoryview 上完成。
+# -----------------------------------------------------------------------------
+
+
+class PacketBuffer:
+    """
+    压缩式接收缓冲区。
+    注意：peek() / 切片返回的是底层内存的视图，只在下一次 append() 之前有效，
+    需要长期保存的数据必须自行复制（例如 np.array(view)）。
+    """
+
+    DEFAULT_CAPACITY = 64 * 1024    # 默认64KB，能放下4个16023字节的温度包
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._read = 0      # 读游标：第一个未处理字节的位置
+        self._write = 0     # 写游标：下一个新字节写入的位置
+
+    def __len__(self):
+        return self._write - self._read
+
+    def __bool__(self):
+        return self._write > self._read
+
+    def __getitem__(self, index):
+        """
+        支持 buffer[i]（返回int）和 buffer[a:b]（返回memoryview），下标相对于读游标。
+        """
+        size = self._write - self._read
+        if isinstance(index, slice):
+            start, stop, step = index.indices(size)
+            return self._view[self._read + start:self._read + stop:step]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("PacketBuffer 下标越界")
+        return self._buf[self._read + index]
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def append(self, data):
+        """把新收到的数据追加到缓冲区末尾（data 可以是 bytes / bytearray / QByteArray / memoryview）"""
+        n = len(data)
+        if n == 0:
+            return
+        if self._write + n > len(self._buf):
+            self._make_room(n)
+        self._view[self._write:self._write + n] = data
+        self._write += n
+
+    def _make_room(self, n: int):
+        """尾部空间不够时：优先把未处理数据挪回开头，仍不够再扩容"""
+        size = self._write - self._read
+        if size + n <= len(self._buf):
+            # 压缩：剩余数据通常只是半个包，复制量很小
+            self._view[:size] = self._view[self._read:self._write]
+        else:
+            # 扩容：按2倍增长，保证均摊O(1)
+            new_capacity = max(len(self._buf) * 2, size + n)
+            new_buf = bytearray(new_capacity)
+            new_buf[:size] = self._view[self._read:self._write]
+            self._buf = new_buf
+            self._view = memoryview(self._buf)
+        self._read = 0
+        self._write = size
+
+    def peek(self, n: int) -> memoryview:
+        """返回开头 n 个字节的视图（不移动读游标）"""
+        return self._view[self._read:self._read + n]
+
+    def startswith(self, prefix: bytes) -> bool:
+        n = len(prefix)
+        if self._write - self._read < n:
+            return False
+        return self._view[self._read:self._read + n] == prefix
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        """在未处理数据中查找 sub，返回相对读游标的位置，找不到返回 -1"""
+        pos = self._buf.find(sub, self._read + start, self._write)
+        return pos - self._read if pos >= 0 else -1
+
+    def consume(self, n: int):
+        """丢弃开头 n 个字节（只移动读游标，不复制数据）"""
+        self._read = min(self._read + n, self._write)
+        if self._read == self._write:
+            # 缓冲区读空时直接把游标归零，下次追加就不需要压缩了
+            self._read = self._write = 0
+
+    def clear(self):
+        self._read = self._write = 0
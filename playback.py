@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: playback.py
+@Author: 杜塞米
+@CreateDate: 2026/2/19
+@LastEditTime:
+@Description: 历史数据回放：按倍速把归档里的帧送进和实时数据相同的显示流程
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   PlaybackController 持有一个自己的 FrameMailbox，界面回放时把 RenderScheduler 的
+#   帧来源切换到这个信箱，之后的绘制、统计、瀑布图和实时数据走完全相同的路径。
+#   定时器每 tick_ms 毫秒把回放时刻往前推进 (经过的时间 × 倍速)，
+#   这段时间里每个通道只解码最后一条记录放进信箱（界面本来也只画每个通道最新的一帧），
+#   所以高倍速回放的开销和 1× 一样。
+#   seek() 跳转后立即把每个通道在该时刻之前的最后一帧显示出来。
+# -----------------------------------------------------------------------------
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+from frame_mailbox import FrameMailbox
+from archive_reader import ArchiveReader
+from channel_state import CHANNEL_COUNT, CHANNEL_BASE
+
+
+class PlaybackController(QObject):
+    # 回放时刻变化（归档时间，秒）
+    position_changed = pyqtSignal(float)
+    # 播放/暂停状态变化
+    playing_changed = pyqtSignal(bool)
+
+    def __init__(self, reader, frame_pool, tick_ms: int = 40, parent=None):
+        """
+        - reader: ArchiveReader、chunk_codec.CompressedArchiveReader 或 CombinedArchiveReader（接口相同）
+        - frame_pool: 回放帧从这个对象池取，界面画完后归还
+        - tick_ms: 回放定时器的间隔
+        """
+        super().__init__(parent)
+        self.reader = reader
+        self.frame_pool = frame_pool
+        self.mailbox = FrameMailbox(FrameMailbox.POLICY_LATEST, frame_pool=frame_pool, parent=self)
+        self.speed = 1.0
+        self.position = reader.start_time
+        self._last_tick = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(tick_ms)
+        self._timer.timeout.connect(self._tick)
+
+    @property
+    def playing(self) -> bool:
+        return self._timer.isActive()
+
+    def set_speed(self, speed: float):
+        self.speed = max(0.01, float(speed))
+
+    @pyqtSlot()
+    def play(self):
+        if self.playing:
+            return
+        if self.position >= self.reader.end_time:
+            self.seek(self.reader.start_time)   # 已经放完了，从头开始
+        self._last_tick = time.monotonic()
+        self._timer.start()
+        self.playing_changed.emit(True)
+
+    @pyqtSlot()
+    def pause(self):
+        if not self.playing:
+            return
+        self._timer.stop()
+        self.playing_changed.emit(False)
+
+    @pyqtSlot(float)
+    def seek(self, position: float):
+        """跳到某个时刻，每个通道显示该时刻之前的最后一帧"""
+        self.position = min(max(position, self.reader.start_time), self.reader.end_time)
+        for channel_id in range(CHANNEL_BASE, CHANNEL_BASE + CHANNEL_COUNT):
+            found = self.reader.latest_before(self.position, channel_id)
+            if found is not None:
+                archive, record = found
+                self._emit_record(record, archive.scale)
+        self.position_changed.emit(self.position)
+
+    @pyqtSlot()
+    def _tick(self):
+        now = time.monotonic()
+        start = self.position
+        end = min(start + (now - self._last_tick) * self.speed, self.reader.end_time)
+        self._last_tick = now
+
+        # 每个通道只要 (start, end] 这段时间里的最后一条记录
+        latest = {}
+        for archive, records in self.reader.query(start, end, side="right"):
+            channel_ids = records["channel_id"]
+            for channel_id in set(channel_ids.tolist()):
+                last = len(channel_ids) - 1 - int((channel_ids[::-1] == channel_id).argmax())
+                latest[channel_id] = (records[last], archive.scale)
+        for channel_id in sorted(latest):
+            record, scale = latest[channel_id]
+            self._emit_record(record, scale)
+
+        self.position = end
+        self.position_changed.emit(end)
+        if end >= self.reader.end_time:
+            self.pause()
+
+    def _emit_record(self, record, scale: float):
+        frame = ArchiveReader.to_frame(record, self.frame_pool.acquire(), scale)
+        self.mailbox.put(frame)
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: profile_store.py
+@Author: 杜塞米
+@CreateDate: 2026/2/22
+@LastEditTime:
+@Description: 每个通道的配置（校准表 + 测量参数）的持久化，带版本号，修改后不停机切换
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   每个通道一份 ChannelProfile：校准分段表，以及光纤长度、分辨率、平均次数、泵浦电流等测量参数。
+#   所有通道保存在一个 JSON 文件里，文件带格式版本号 version（读到比自己新的格式时报错，
+#   旧格式缺少的字段用默认值补上）和保存次数 revision。配置文件允许手改，读取时逐个字段检查类型和范围，
+#   无效的通道、字段、校准表打印出来后跳过（用默认值），不会让程序启动失败。
+#
+#   ProfileStore 是双缓冲的：
+#     - active：当前生效的配置，一个不可变的元组，采集线程和界面只读；
+#     - pending：界面编辑用的副本，stage() 只改这里，不影响正在采集的数据；
+#     - publish()：把 pending 整体换成新的 active（一次引用赋值）并写盘，返回有变化的通道。
+#   读的一方每帧只取一次 active，拿到的要么全是旧配置、要么全是新配置，不需要加锁。
+#   load() 按文件的修改时间和大小缓存，文件没变时不重新解析。
+#   写文件先写临时文件再 os.replace，写到一半断电也不会留下半个配置文件。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import json
+import math
+import os
+from calibration import CalibrationSegment
+from temporal_filter import FILTER_OPTIONS
+from spatial_filter import SPATIAL_OPTIONS
+
+PROFILE_VERSION = 1
+
+# 测量参数的默认值（前面的字段和 FiberMeasurementParamsDialog.get_params 一致，不含 channels；
+# 比值法参考段的字段界面上还没有，只能在配置文件里改）
+DEFAULT_MEASUREMENT = {
+    "start": 0.0,               # 实际光纤长度起点（m）
+    "end": 4000.0,              # 实际光纤长度终点（m）
+    "resolution": 0.5,          # A 探测分辨率（m）
+    "resolution_b": 0.5,        # B 探测分辨率（m）
+    "by_time": True,            # True：按测量时间；False：按单次测量时间和平均次数
+    "estimated_length": 4150.0, # 估计光纤长度（m）
+    "measure_time": 5.0,        # 测量时间（s）
+    "single_time": 40.0,        # 单次测量时间（us）
+    "average_count": 125000,    # 平均次数
+    "laser_power": 2000.0,      # 激光功率
+    "pump_current_a": 800.0,    # A 通道激光泵浦电流
+    "pump_current_b": 800.0,    # B 通道激光泵浦电流
+    "temporal_filter": "none",  # 上位机时间平均方式（temporal_filter.FILTER_*）
+    "temporal_length": 8,       # 滑动平均 / 中值的帧数
+    "temporal_alpha": 0.2,      # 指数平均系数
+    "spatial_filter": "none",   # 沿距离方向的滤波方式（spatial_filter.SPATIAL_*）
+    "spatial_window": 5,        # 空间滤波窗口点数（奇数）
+    "spatial_polyorder": 2,     # Savitzky-Golay 多项式阶数
+    "reference_start": 0,       # 比值法参考段起点（点号）
+    "reference_end": 100,       # 比值法参考段终点（点号，不含）
+    "reference_temperature": 25.0,  # 比值法参考段温度（°C）
+}
+
+# 类型正确之后还要检查取值范围的字段
+_FIELD_CHECKS = {
+    "resolution": lambda v: v > 0,
+    "resolution_b": lambda v: v > 0,
+    "measure_time": lambda v: v > 0,
+    "single_time": lambda v: v > 0,
+    "average_count": lambda v: v >= 1,
+    "temporal_filter": lambda v: v in {mode for _, mode in FILTER_OPTIONS},
+    "temporal_length": lambda v: v >= 1,
+    "temporal_alpha": lambda v: 0 < v <= 1,
+    "spatial_filter": lambda v: v in {mode for _, mode in SPATIAL_OPTIONS},
+    "spatial_window": lambda v: v >= 3 and v % 2 == 1,
+    "spatial_polyorder": lambda v: v >= 0,
+    "reference_start": lambda v: v >= 0,
+}
+
+# 两个字段之间的约束：(前一个字段, 后一个字段)，要求前者小于后者
+_ORDERED_FIELDS = (("start", "end"), ("reference_start", "reference_end"), ("spatial_polyorder", "spatial_window"))
+
+
+def _convert_field(key: str, value):
+    """按默认值的类型检查并转换一个测量参数，类型或取值不对时抛出 ValueError"""
+    default = DEFAULT_MEASUREMENT[key]
+    if isinstance(default, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(default, int):
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool) and float(value).is_integer()
+        value = int(value) if ok else value
+    elif isinstance(default, float):
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+        value = float(value) if ok else value
+    else:
+        ok = isinstance(value, type(default))
+    if not ok or not _FIELD_CHECKS.get(key, lambda v: True)(value):
+        raise ValueError(f"{key}={value!r} 无效")
+    return value
+
+
+def _check_measurement(measurement, label: str) -> dict:
+    """检查配置文件里的测量参数，无效的字段打印出来并用默认值代替"""
+    if not isinstance(measurement, dict):
+        if measurement is not None:
+            print(f"{label}的测量参数格式不对，使用默认值")
+        return {}
+    checked = {}
+    for key, value in measurement.items():
+        if key not in DEFAULT_MEASUREMENT:
+            continue
+        try:
+            checked[key] = _convert_field(key, value)
+        except ValueError as e:
+            print(f"{label}的测量参数 {e}，使用默认值 {DEFAULT_MEASUREMENT[key]!r}")
+    merged = dict(DEFAULT_MEASUREMENT, **checked)
+    for low, high in _ORDERED_FIELDS:
+        if not merged[low] < merged[high]:
+            print(f"{label}的测量参数要求 {low} < {high}，两者都使用默认值")
+            checked.pop(low, None)
+            checked.pop(high, None)
+    return checked
+
+
+def _check_segments(rows, label: str) -> list:
+    """检查配置文件里的校准表，有任何一行不对时打印出来并放弃整张表（不校准）"""
+    if rows is None:
+        return []
+    try:
+        if not isinstance(rows, list):
+            raise ValueError("不是列表")
+        segments = []
+        for row in rows:
+            if not isinstance(row, list) or len(row) != 5 or not all(
+                    isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in row):
+                raise ValueError(f"行 {row!r} 应为5个数字")
+            segments.append(CalibrationSegment(*row))
+        ends = [segment.end for segment in segments]
+        if any(end <= 0 for end in ends) or ends != sorted(set(ends)):
+            raise ValueError("分段终点必须大于0且从小到大排列")
+    except ValueError as e:
+        print(f"{label}的校准表无效（{e}），不做校准")
+        return []
+    return segments
+
+
+class ChannelProfile:
+    """一个通道的配置，创建后不再修改（要改就建一个新的，见 replace）"""
+    __slots__ = ("segments", "measurement")
+
+    def __init__(self, segments=(), measurement: dict = None):
+        self.segments = tuple(segments)
+        merged = dict(DEFAULT_MEASUREMENT)
+        if measurement:
+            merged.update((key, value) for key, value in measurement.items() if key in DEFAULT_MEASUREMENT)
+        self.measurement = merged
+
+    def replace(self, segments=None, measurement: dict = None) -> "ChannelProfile":
+        """返回修改了部分内容的新配置；measurement 只需给出要改的字段"""
+        merged = dict(self.measurement)
+        if measurement:
+            merged.update(measurement)
+        return ChannelProfile(self.segments if segments is None else segments, merged)
+
+    def __eq__(self, other):
+        if not isinstance(other, ChannelProfile):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> dict:
+        return {
+            "segments": [[s.end, s.refractive_index, s.attenuation, s.sensitivity, s.offset] for s in self.segments],
+            "measurement": dict(self.measurement),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, label: str = "通道配置") -> "ChannelProfile":
+        """从配置文件的内容创建；无效的字段打印出来并用默认值代替，不会因为手改出错的文件而失败"""
+        return cls(_check_segments(data.get("segments"), label), _check_measurement(data.get("measurement"), label))
+
+
+class ProfileStore:
+    """
+    - path: 配置文件路径
+    - channels: 通道数
+    """
+
+    def __init__(self, path: str, channels: int = 8):
+        self.path = path
+        self.channels = channels
+        self.revision = 0
+        self._active = tuple(ChannelProfile() for _ in range(channels))
+        self._pending = list(self._active)
+        self._file_stamp = None     # 上次读取时文件的 (修改时间, 大小)
+
+    @property
+    def active(self) -> tuple:
+        """当前生效的配置（不可变元组，按通道下标）"""
+        return self._active
+
+    def pending(self, index: int) -> ChannelProfile:
+        return self._pending[index]
+
+    def stage(self, index: int, profile: ChannelProfile):
+        """修改待生效的配置，publish() 之前不影响 active"""
+        self._pending[index] = profile
+
+    def publish(self, save: bool = True) -> list:
+        """让待生效的配置整体生效，返回有变化的通道下标；save 为 True 时同时写盘"""
+        changed = [i for i, (old, new) in enumerate(zip(self._active, self._pending)) if old != new]
+        self._active = tuple(self._pending)
+        if changed and save:
+            self.save()
+        return changed
+
+    def load(self) -> tuple:
+        """
+        从文件读取配置并直接生效，返回 active。文件不存在时保持默认配置；
+        文件没有变化时直接返回缓存的结果；文件不是 JSON、整体结构不对或格式比程序新时抛出 ValueError。
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self._active
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._file_stamp:
+            return self._active
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("配置文件格式不对")
+        version = data.get("version", 0)
+        revision = data.get("revision", 0)
+        if not isinstance(version, int) or not isinstance(revision, int):
+            raise ValueError("配置文件的 version / revision 必须是整数")
+        if version > PROFILE_VERSION:
+            raise ValueError(f"配置文件版本 {version} 比程序支持的版本 {PROFILE_VERSION} 新")
+        entries = data.get("channels", [])
+        if not isinstance(entries, list):
+            raise ValueError("配置文件的 channels 必须是列表")
+
+        profiles = list(self._active)
+        for entry in entries:
+            channel = entry.get("channel") if isinstance(entry, dict) else None
+            if not isinstance(channel, int) or isinstance(channel, bool) or not 1 <= channel <= self.channels:
+                print(f"跳过配置文件里无效的通道配置: {entry!r:.80}")
+                continue
+            profiles[channel - 1] = ChannelProfile.from_dict(entry, f"测温通道{channel}")
+        self.revision = revision
+        self._active = tuple(profiles)
+        self._pending = list(profiles)
+        self._file_stamp = stamp
+        return self._active
+
+    def save(self):
+        """把 active 写入文件（先写临时文件再替换）"""
+        self.revision += 1
+        data = {
+            "version": PROFILE_VERSION,
+            "revision": self.revision,
+            "channels": [dict(profile.to_dict(), channel=index + 1) for index, profile in enumerate(self._active)],
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+        stat = os.stat(self.path)
+        self._file_stamp = (stat.st_mtime_ns, stat.st_size)
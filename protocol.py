@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: protocol.py
+@Author: 杜塞米
+@CreateDate: 2026/2/3
+@LastEditTime:
+@Description: DTS设备通信协议的声明式描述表，以及由表编译出来的解码器
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   每种数据包的格式都写在 PACKET_SPECS 表里：包头、长度规则、结尾符、
+#   头部 struct.Struct、数据部分的 numpy dtype。解析时只需按包的第1个字节
+#   查一次字典，就能拿到对应的解码器，新增包类型只需要在表里加一行。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import struct
+import numpy as np
+
+# --- 包头定义 ---
+TEMP_HEADER = b'\xAA\x7B\x07\xAF\xEC\x66\x48\xC5'               # 1、温度数据包
+DEVICE_PARAM_HEADER = b'\xA9\x7B\x07\xAF\xEC\x66\x48\xC5'       # 2、设备相关参数包
+FIXED_ALARM_HEADER = b'\xA6\x7B\x07\xAF\xEC\x66\x48\xC5'        # 3、高温定温报警包
+DIFF_ALARM_HEADER = b'\xA5\x7B\x07\xAF\xEC\x66\x48\xC5'         # 4、高温差温报警包
+BREAK_ALARM_HEADER = b'\xBC\x7B\x07\xAF\xEC\x66\x48\xC5'        # 5、断纤报警包
+
+# 五种包头的后7个字节完全相同，只有第1个字节（包类型）不同，重新同步时按后缀搜索
+SYNC_SUFFIX = b'\x7B\x07\xAF\xEC\x66\x48\xC5'
+TRAILER = 0x55              # 所有数据包的结尾符
+
+# 所有数据包共同的前缀：包头8 + 设备ID1 + 总长度2（低位在前）
+PREFIX_SIZE = 11
+LENGTH_OFFSET = 9
+LENGTH_STRUCT = struct.Struct('<H')
+
+# 温度包头部格式（共22字节），只编译一次，所有数据包共用
+# '<' 表示小端序（低位在前高位在后）
+# 'B' 表示 unsigned char (1 byte)
+# 'H' 表示 unsigned short (2 bytes)
+TEMP_HEADER_STRUCT = struct.Struct('<8s B H B B H H H H B')
+
+# 设备参数包、报警包的头部只有公共前缀，后面的字段协议文档还没给全，先按原始字节给出
+COMMON_HEADER_STRUCT = struct.Struct('<8s B H')
+
+# 温度点是小端序的 signed short，实际温度 = 解调值 / 100
+TEMP_RAW_DTYPE = np.dtype('<i2')
+TEMP_SCALE = np.float32(100.0)
+
+# 温度包头部 data_type 字段：同一种包也用来传 Stokes / Anti-Stokes 原始曲线（同样按 /100 缩放）
+DATA_TYPE_TEMPERATURE = 0
+DATA_TYPE_STOKES = 1
+DATA_TYPE_ANTI_STOKES = 2
+
+
+def decode_scaled(payload, dtype, scale, out=None):
+    """
+    把数据部分按 dtype 视图读取，除以 scale 后写进 float32 数组。
+    - payload: 数据部分的字节（bytes / memoryview），直接按视图读取，不经过 Python 元组
+    - out: 可复用的输出数组，长度不匹配时会重新分配
+    返回写好数值的 out 数组。
+    """
+    raw = np.frombuffer(payload, dtype=dtype)
+    if out is None or out.shape != raw.shape:
+        out = np.empty(raw.shape, dtype=np.float32)
+    # 一次遍历完成 类型转换 + 缩放，结果直接写进 out
+    np.divide(raw, scale, out=out)
+    return out
+
+
+def decode_temperatures(payload, out=None):
+    """把温度数据部分解码成 float32 温度数组（实际温度 = 解调值 / 100）"""
+    return decode_scaled(payload, TEMP_RAW_DTYPE, TEMP_SCALE, out)
+
+
+class PacketSpec:
+    """
+    一种数据包的格式描述，构造时就把解码需要的东西全部准备好。
+    - kind: 包类型名称（'temperature' / 'device_params' / ...）
+    - header: 8字节包头
+    - header_struct: 头部的 struct.Struct
+    - field_names: 与 header_struct 各字段一一对应的名称，None 表示跳过（包头、保留位）
+    - payload_dtype: 数据部分的 numpy dtype
+    - payload_key: 解码结果里数据部分的键名
+    - scale: 不为 None 时，数据部分会除以 scale 并转换成 float32
+    - length_bias: 包总大小 = 长度字段 + length_bias
+    - trailer: 结尾符
+    """
+    __slots__ = ('kind', 'header', 'packet_type', 'header_struct', 'payload_dtype', 'payload_key',
+                 'scale', 'length_bias', 'trailer', 'min_size', '_fields')
+
+    def __init__(self, kind, header, header_struct, field_names, payload_dtype, payload_key,
+                 scale=None, length_bias=0, trailer=TRAILER):
+        self.kind = kind
+        self.header = header
+        self.packet_type = header[0]
+        self.header_struct = header_struct
+        self.payload_dtype = np.dtype(payload_dtype)
+        self.payload_key = payload_key
+        self.scale = scale
+        self.length_bias = length_bias
+        self.trailer = trailer
+        # 头部 + 结尾符，长度字段比这还小说明数据已经错位
+        self.min_size = header_struct.size + 1
+        self._fields = tuple((name, i) for i, name in enumerate(field_names) if name is not None)
+
+    def packet_size(self, length_field: int) -> int:
+        return length_field + self.length_bias
+
+    def decode(self, packet, out=None) -> dict:
+        """
+        解码一个完整的数据包（packet 可以是缓冲区的 memoryview）。
+        返回的字典里数据部分是独立的数组，不引用 packet 的内存。
+        """
+        values = self.header_struct.unpack_from(packet)
+        parsed = {name: values[i] for name, i in self._fields}
+        payload = packet[self.header_struct.size:-1]  # -1 去掉结尾的0x55
+        if self.scale is not None:
+            parsed[self.payload_key] = decode_scaled(payload, self.payload_dtype, self.scale, out)
+        else:
+            parsed[self.payload_key] = np.frombuffer(payload, dtype=self.payload_dtype).copy()
+        return parsed
+
+    def decode_into(self, packet, frame):
+        """
+        把数据包直接解码进一个带 __slots__ 的帧对象（例如 frames.TemperatureFrame），
+        帧原有的数据数组会被复用。
+        """
+        values = self.header_struct.unpack_from(packet)
+        for name, i in self._fields:
+            setattr(frame, name, values[i])
+        payload = packet[self.header_struct.size:-1]  # -1 去掉结尾的0x55
+        if self.scale is not None:
+            data = decode_scaled(payload, self.payload_dtype, self.scale, getattr(frame, self.payload_key))
+        else:
+            data = np.frombuffer(payload, dtype=self.payload_dtype).copy()
+        setattr(frame, self.payload_key, data)
+        return frame
+
+
+_COMMON_FIELDS = (None, "device_id", "total_len")
+
+# --- 协议表 ---
+# 长度规则：所有包都是第9、10字节（低位在前）给出整个包的总字节数，
+# 温度包恒为16023字节，设备参数包恒为88字节，报警包恒为26字节
+PACKET_SPECS = {spec.packet_type: spec for spec in (
+    PacketSpec("temperature", TEMP_HEADER, TEMP_HEADER_STRUCT,
+               (None,
+                "device_id",            # 1个字节：设备ID
+                "total_len",            # 2个字节：总数据长度
+                "data_type",            # 1个字节：数据类型标志位（DATA_TYPE_*）
+                None,                   # 1个字节：保留位（跳过）
+                "channel_id",           # 2个字节：通道标志位
+                "data_start_point",     # 2个字节：数据起点位置
+                "data_end_point",       # 2个字节：数据终点位置
+                "total_channels",       # 2个字节：总通道数量
+                "current_channel"),     # 1个字节：当前通道号（？？）
+               TEMP_RAW_DTYPE, "temperatures", scale=TEMP_SCALE),
+    PacketSpec("device_params", DEVICE_PARAM_HEADER, COMMON_HEADER_STRUCT, _COMMON_FIELDS, 'u1', "payload"),
+    PacketSpec("fixed_alarm", FIXED_ALARM_HEADER, COMMON_HEADER_STRUCT, _COMMON_FIELDS, 'u1', "payload"),
+    PacketSpec("diff_alarm", DIFF_ALARM_HEADER, COMMON_HEADER_STRUCT, _COMMON_FIELDS, 'u1', "payload"),
+    PacketSpec("break_alarm", BREAK_ALARM_HEADER, COMMON_HEADER_STRUCT, _COMMON_FIELDS, 'u1', "payload"),
+)}
+
+KNOWN_PACKET_TYPES = frozenset(PACKET_SPECS)
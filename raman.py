@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: raman.py
+@Author: 杜塞米
+@CreateDate: 2026/2/23
+@LastEditTime:
+@Description: 用 Stokes / Anti-Stokes 原始曲线在上位机计算温度（比值法 + 参考段 + 衰减修正）
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   设备除了温度包，也可以用同样格式的包发 Stokes（data_type=1）和 Anti-Stokes（data_type=2）
+#   原始曲线。RamanRouter 作为采集流水线的分流环节：温度包原样放行，原始曲线按通道放进配对槽，
+#   同一通道、同样几何（点数、起始点）的两条曲线到齐后算出温度，作为一帧普通温度帧继续往下走，
+#   之后的校准、记录、显示和设备直接给出的温度完全一样。
+#
+#   比值 R(z) = I_as / I_s 满足 ln R = C − γ/T − Δα·z，用温度已知（T_ref）的参考段消去常数 C：
+#       1/T = 1/T_ref + (ln R_ref − ln R(z) − Δα·(z − z_ref)) / γ
+#   其中 ln R_ref、z_ref 是参考段上的平均值。和位置有关的 −Δα·(z − z_ref)/γ 按帧几何缓存，
+#   每帧只在 Anti-Stokes 帧自己的数组上原地做一遍：相除、取对数、乘加、取倒数，不分配内存。
+#   算出来的温度直接写进 Anti-Stokes 帧（改成温度帧），Stokes 帧还回对象池。
+#   参考段不在帧里时没法定标，这对曲线丢掉；每个通道的每份参数第一次遇到时打印出来
+#   （参考段目前只能在配置文件里改），否则通道没有任何提示就一直没有数据。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import numpy as np
+from protocol import DATA_TYPE_TEMPERATURE, DATA_TYPE_STOKES, DATA_TYPE_ANTI_STOKES
+from calibration import NOMINAL_SENSITIVITY, NOMINAL_ATTENUATION, DB_PER_KM_TO_NEPER_PER_M, KELVIN
+
+# 光强小于这个值按这个值算，避免除零和对非正数取对数
+MIN_INTENSITY = np.float32(1e-6)
+
+
+class RamanChannel:
+    """
+    一个通道的比值法参数（创建后不再修改，修改时整体替换）。
+    - reference_start / reference_end: 参考段的点号范围 [start, end)（绝对点号，和 data_start_point 同一坐标）
+    - reference_temperature: 参考段温度（°C）
+    - sensitivity: 温度敏感系数 γ（K）；attenuation: 差分衰减 Δα（dB/km）
+    - resolution / start_offset: 点间距和光纤起始长度（m）
+    """
+
+    def __init__(self, reference_start: int = 0, reference_end: int = 100, reference_temperature: float = 25.0,
+                 sensitivity: float = NOMINAL_SENSITIVITY, attenuation: float = NOMINAL_ATTENUATION,
+                 resolution: float = 0.5, start_offset: float = 0.0):
+        if reference_end <= reference_start:
+            raise ValueError("参考段终点必须大于起点")
+        if sensitivity <= 0:
+            raise ValueError("敏感系数必须大于0")
+        self.reference_start = int(reference_start)
+        self.reference_end = int(reference_end)
+        self.reference_temperature = float(reference_temperature)
+        self.sensitivity = float(sensitivity)
+        self.attenuation = float(attenuation)
+        self.resolution = float(resolution)
+        self.start_offset = float(start_offset)
+        self._compiled = {}     # (num_points, data_start_point) -> (参考段切片, 逐点衰减项) 或 None
+
+    def _geometry(self, num_points: int, data_start_point: int):
+        key = (num_points, data_start_point)
+        if key in self._compiled:
+            return self._compiled[key]
+        start = self.reference_start - data_start_point
+        end = self.reference_end - data_start_point
+        if start < 0 or end > num_points:
+            compiled = None     # 参考段不在这帧里，没法定标
+        else:
+            z = self.start_offset + (data_start_point + np.arange(num_points)) * self.resolution
+            z_ref = z[start:end].mean()
+            alpha = self.attenuation * DB_PER_KM_TO_NEPER_PER_M
+            term = (-alpha * (z - z_ref) / self.sensitivity).astype(np.float32)
+            compiled = (slice(start, end), term)
+        self._compiled[key] = compiled
+        return compiled
+
+    def compute(self, stokes: np.ndarray, anti_stokes: np.ndarray, data_start_point: int = 0) -> bool:
+        """
+        用两条曲线算温度（°C），结果原地写进 anti_stokes，stokes 的内容会被改掉。
+        参考段不在这帧里时返回 False，不做计算。
+        """
+        compiled = self._geometry(len(anti_stokes), data_start_point)
+        if compiled is None:
+            return False
+        reference, term = compiled
+        t = anti_stokes
+        np.maximum(stokes, MIN_INTENSITY, out=stokes)
+        np.maximum(t, MIN_INTENSITY, out=t)
+        np.divide(t, stokes, out=t)
+        np.log(t, out=t)                                        # ln R(z)
+        ln_ref = float(t[reference].mean())
+        # 1/T = (ln R_ref − ln R)/γ + 1/T_ref + 衰减项
+        np.multiply(t, np.float32(-1.0 / self.sensitivity), out=t)
+        np.add(t, np.float32(ln_ref / self.sensitivity + 1.0 / (self.reference_temperature + KELVIN)), out=t)
+        np.add(t, term, out=t)
+        np.reciprocal(t, out=t)
+        np.subtract(t, np.float32(KELVIN), out=t)
+        return True
+
+
+class RamanRouter:
+    """
+    采集流水线的分流环节：route(frames) 返回温度帧列表（原有的温度帧 + 配对算出的温度帧）。
+    - frame_pool: 用完的原始曲线帧还回这个对象池
+    - channels / channel_base: 通道数和第一个通道的 channel_id
+    """
+
+    def __init__(self, frame_pool, channels: int = 8, channel_base: int = 1):
+        self.frame_pool = frame_pool
+        self.channel_base = channel_base
+        self._channels = [RamanChannel() for _ in range(channels)]
+        # 每个通道等待配对的 Stokes / Anti-Stokes 帧，只在采集线程里读写
+        self._pending = [{DATA_TYPE_STOKES: None, DATA_TYPE_ANTI_STOKES: None} for _ in range(channels)]
+        self.computed = 0       # 算出的温度帧数
+        self.unreferenced = 0   # 参考段不在帧里、没法计算的配对数
+        self._warned = [None] * channels    # 已经提示过参考段不在帧里的 RamanChannel，参数修改后重新提示
+
+    def set_channel(self, index: int, **params):
+        """修改某个通道（下标从0开始）的参数，没给的参数保持不变；采集线程从下一对曲线开始使用"""
+        current = self._channels[index]
+        merged = {key: getattr(current, key) for key in ("reference_start", "reference_end", "reference_temperature",
+                                                          "sensitivity", "attenuation", "resolution", "start_offset")}
+        merged.update(params)
+        self._channels[index] = RamanChannel(**merged)
+
+    def channel(self, index: int) -> RamanChannel:
+        return self._channels[index]
+
+    def route(self, frames: list) -> list:
+        if all(frame.data_type == DATA_TYPE_TEMPERATURE for frame in frames):
+            return frames       # 常见情况：设备直接给温度，原样放行
+        result = []
+        for frame in frames:
+            if frame.data_type == DATA_TYPE_TEMPERATURE:
+                result.append(frame)
+                continue
+            index = frame.channel_id - self.channel_base
+            if frame.data_type not in (DATA_TYPE_STOKES, DATA_TYPE_ANTI_STOKES) or not 0 <= index < len(self._pending):
+                self.frame_pool.release(frame)
+                continue
+            paired = self._pair(index, frame)
+            if paired is not None:
+                result.append(paired)
+        return result
+
+    def _pair(self, index: int, frame):
+        """放进配对槽；两条曲线到齐时返回算好的温度帧"""
+        pending = self._pending[index]
+        other_type = DATA_TYPE_ANTI_STOKES if frame.data_type == DATA_TYPE_STOKES else DATA_TYPE_STOKES
+        other = pending[other_type]
+        if other is None or other.num_points != frame.num_points or other.data_start_point != frame.data_start_point:
+            # 还没到齐（或几何对不上）：替换掉同类型的旧曲线
+            self.frame_pool.release(pending[frame.data_type])
+            pending[frame.data_type] = frame
+            return None
+
+        pending[other_type] = None
+        stokes, anti_stokes = (frame, other) if frame.data_type == DATA_TYPE_STOKES else (other, frame)
+        channel = self._channels[index]
+        ok = channel.compute(stokes.temperatures, anti_stokes.temperatures, anti_stokes.data_start_point)
+        # 温度写在 Anti-Stokes 帧里，时间戳取后到的那条
+        anti_stokes.timestamp = max(stokes.timestamp, anti_stokes.timestamp)
+        self.frame_pool.release(stokes)
+        if not ok:
+            self.unreferenced += 1
+            if self._warned[index] is not channel:
+                self._warned[index] = channel
+                print(f"测温通道{index + 1}: 参考段 [{channel.reference_start}, {channel.reference_end}) "
+                      f"不在收到的曲线 [{anti_stokes.data_start_point}, "
+                      f"{anti_stokes.data_start_point + anti_stokes.num_points}) 里，无法计算温度；"
+                      f"请修改配置文件里的 reference_start / reference_end")
+            self.frame_pool.release(anti_stokes)
+            return None
+        anti_stokes.data_type = DATA_TYPE_TEMPERATURE
+        self.computed += 1
+        return anti_stokes
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: recorder.py
+@Author: 杜塞米
+@CreateDate: 2026/2/17
+@LastEditTime:
+@Description: 后台运行记录：独立写盘线程 + 有界队列，按保存间隔记录温度数据和报警/运行信息
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   运行记录设置以前只是打印一下，实际什么都没记录。FrameRecorder 负责把数据写到磁盘：
+#     - submit_batch() 在采集线程里直接调用：每个通道距上次记录不到 interval 秒的帧直接跳过，
+#       需要记录的帧复制一份（原帧还要给界面用，会被对象池复用）后 put_nowait 放进有界队列；
+#       队列满了就丢弃并计数，绝不阻塞采集线程或界面线程；
+#     - 写盘线程从队列里一次取走一批，用带 1MB 缓冲的文件对象追加写入，
+#       每隔 flush_interval 秒才真正刷一次盘；
+#     - 文件按天滚动：<目录>/temperature_YYYYMMDD.csv、<目录>/events_YYYYMMDD.csv；
+#     - 写盘出错（磁盘满、网络盘断开、目录建不了）时只丢掉这一批，关掉文件后按 1s、2s、4s……
+#       （最长 RETRY_MAX_DELAY）重试，期间 error 保存最近的错误供界面显示，写成功后清除；
+#     - stop() 只置结束标志、不阻塞；写盘线程超时没退出时保留句柄，start() 在它退出前拒绝重新启动，
+#       保证同一时间只有一个线程在写同一组文件。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import os
+import queue
+import threading
+import time
+from frames import FramePool
+
+FILE_BUFFER_SIZE = 1 << 20      # 每个文件的写缓冲大小
+RETRY_MIN_DELAY = 1.0           # 写盘出错后第一次重试前等待的秒数，之后每次翻倍
+RETRY_MAX_DELAY = 60.0
+_STOP = ("stop", None)          # 唤醒写盘线程用的结束标记（真正的结束标志是 stop_event）
+
+
+class CsvFrameWriter:
+    """
+    把温度帧和事件按天写进文本文件。
+    温度文件每行一帧：时间,通道,设备ID,起始点,结束点,温度1;温度2;...
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._files = {}        # (前缀, 日期) -> 文件对象
+
+    def _file(self, prefix: str, timestamp: float):
+        day = time.strftime("%Y%m%d", time.localtime(timestamp))
+        f = self._files.get((prefix, day))
+        if f is None:
+            # 换天了：关掉同类的旧文件
+            for key in [key for key in self._files if key[0] == prefix]:
+                self._files.pop(key).close()
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{prefix}_{day}.csv")
+            f = self._files[(prefix, day)] = open(path, "a", encoding="utf-8", buffering=FILE_BUFFER_SIZE)
+        return f
+
+    def write_frames(self, frames: list):
+        for frame in frames:
+            line = (f"{_format_time(frame.timestamp)},{frame.channel_id},{frame.device_id},"
+                    f"{frame.data_start_point},{frame.data_end_point},"
+                    + ";".join(map("{:.2f}".format, frame.temperatures.tolist())) + "\n")
+            self._file("temperature", frame.timestamp).write(line)
+
+    def write_events(self, events: list):
+        for timestamp, category, text in events:
+            self._file("events", timestamp).write(f"{_format_time(timestamp)},{category},{text}\n")
+
+    def flush(self):
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+
+def _format_time(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)) + f".{int(timestamp * 1000) % 1000:03d}"
+
+
+class FrameRecorder:
+    """
+    - directory: 数据保存目录
+    - interval: 每个通道两次记录之间的最小间隔（秒），0 表示每帧都记录
+    - save_data / save_alarm / save_run_info: 是否记录温度数据 / 报警信息 / 设备运行信息
+    - max_queue: 队列里最多等待写盘的条目数，满了就丢弃
+    - flush_interval: 最多隔多少秒把缓冲区刷到磁盘
+    - writer_factory: writer_factory(directory) 返回写文件的对象
+    """
+
+    def __init__(self, directory: str, interval: float = 50.0, save_data: bool = True,
+                 save_alarm: bool = True, save_run_info: bool = True, max_queue: int = 256,
+                 flush_interval: float = 5.0, writer_factory=CsvFrameWriter):
+        self.directory = directory
+        self.interval = float(interval)
+        self.save_data = save_data
+        self.save_alarm = save_alarm
+        self.save_run_info = save_run_info
+        self.flush_interval = flush_interval
+        self.writer_factory = writer_factory
+        self.dropped = 0            # 因队列满或写盘出错被丢弃的条目数
+        self.frames_written = 0
+        self.events_written = 0
+        self.write_errors = 0       # 写盘出错的次数
+        self.error = None           # 最近一次写盘错误（写盘恢复正常后清除），界面据此提示
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._copies = FramePool(max_free=max_queue)    # 复制帧用的对象池，和采集用的池分开
+        self._last_recorded = {}    # channel_id -> 上次记录的帧时间
+        self._thread = None
+        self._stop_event = threading.Event()    # 每个写盘线程各用一个
+
+    @property
+    def running(self) -> bool:
+        """正在记录（写盘线程在运行且没有被要求结束）"""
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def start(self) -> bool:
+        """启动写盘线程；上一个写盘线程还没退出时不启动，返回 False"""
+        if self.running:
+            return True
+        if self._thread is not None:
+            if self._thread.is_alive():
+                print("运行记录: 上一个写盘线程还没退出，暂不重新启动")
+                return False
+            self._thread = None
+        self.error = None
+        self._stop_event = threading.Event()
+        # 目录和写文件的类在启动时取定，之后修改设置不影响正在运行的线程
+        self._thread = threading.Thread(target=self._run, name="FrameRecorder", daemon=True,
+                                        args=(self.directory, self.writer_factory, self._stop_event))
+        self._thread.start()
+        print(f"运行记录已启动: {self.directory}")
+        return True
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        通知写盘线程写完队列里剩下的数据后退出，最多等 timeout 秒。
+        超时时保留线程句柄（start() 会等它退出后才重新启动），返回 False。
+        """
+        if self._thread is None:
+            return True
+        self._stop_event.set()
+        try:
+            self._queue.put_nowait(_STOP)   # 唤醒等待中的写盘线程；队列满说明它正忙，写完这批就会看到结束标志
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"运行记录: 写盘线程 {timeout}s 内没有退出，继续在后台写完剩下的数据")
+            return False
+        self._thread = None
+        print(f"运行记录已停止: 共写入 {self.frames_written} 帧，丢弃 {self.dropped} 条")
+        return True
+
+    # --- 生产者（采集线程 / 界面线程） ---
+
+    def submit_batch(self, frames: list):
+        """
+        提交一批温度帧。连接 DataParser.temperature_batch_ready 时要用 Qt.DirectConnection，
+        让它直接在采集线程里执行。
+        """
+        if not self.save_data or not self.running:
+            return
+        for frame in frames:
+            last = self._last_recorded.get(frame.channel_id)
+            if last is not None and frame.timestamp - last < self.interval:
+                continue
+            # 原帧之后会被对象池复用，这里必须复制
+            copy = self._copies.acquire_like(len(frame.temperatures))
+            copy.copy_header_from(frame)
+            copy.temperatures[:] = frame.temperatures
+            if self._put(("frame", copy)):
+                self._last_recorded[frame.channel_id] = frame.timestamp
+            else:
+                self._copies.release(copy)
+
+    def record_event(self, category: str, text: str, timestamp: float = None):
+        """记录一条报警（category="alarm"）或运行信息（category="run"）"""
+        if category == "alarm" and not self.save_alarm:
+            return
+        if category == "run" and not self.save_run_info:
+            return
+        if not self.running:
+            return
+        self._put(("event", (time.time() if timestamp is None else timestamp, category, text)))
+
+    def _put(self, item) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    # --- 写盘线程 ---
+
+    def _run(self, directory: str, writer_factory, stop_event: threading.Event):
+        writer = None
+        delay = RETRY_MIN_DELAY
+        last_flush = time.monotonic()
+        while True:
+            try:
+                items = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                items = []
+            # 一次取走队列里已有的全部条目，合并成一批写
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = stop_event.is_set()
+            frames = [data for kind, data in items if kind == "frame"]
+            events = [data for kind, data in items if kind == "event"]
+
+            try:
+                if writer is None and (frames or events):
+                    writer = writer_factory(directory)
+                if frames:
+                    writer.write_frames(frames)
+                    self.frames_written += len(frames)
+                if events:
+                    writer.write_events(events)
+                    self.events_written += len(events)
+                if writer is not None and (stopping or time.monotonic() - last_flush >= self.flush_interval):
+                    writer.flush()
+                    last_flush = time.monotonic()
+                if self.error is not None and (frames or events):
+                    print("运行记录写盘已恢复")
+                    self.error = None
+                    delay = RETRY_MIN_DELAY
+            except (OSError, ValueError) as e:
+                # 这一批丢掉，关掉文件等一会儿重新打开；重新打开时归档会截掉写了一半的记录
+                self.write_errors += 1
+                self.dropped += len(frames) + len(events)
+                if self.error is None:
+                    print(f"运行记录写盘失败: {e}，{delay:.0f}s 后重试")
+                self.error = str(e)
+                writer = self._close_writer(writer)
+                if not stopping:
+                    stop_event.wait(delay)
+                    delay = min(delay * 2, RETRY_MAX_DELAY)
+            finally:
+                self._copies.release_all(frames)
+
+            if stopping and self._queue.empty():
+                break
+        self._close_writer(writer)
+
+    @staticmethod
+    def _close_writer(writer):
+        if writer is not None:
+            try:
+                writer.close()
+            except OSError as e:
+                print(f"运行记录关闭文件失败: {e}")
+        return None
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: render_scheduler.py
+@Author: 杜塞米
+@CreateDate: 2026/2/10
+@LastEditTime:
+@Description: 限制最大帧率的绘图调度器，按通道合并待绘制的帧
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   以前每个数据包都同步调用一次 setData，突发数据包会导致多次显示器根本来不及
+#   显示的重绘。RenderScheduler 用一个 QTimer 控制绘制节奏：
+#     - 两次绘制之间至少间隔 1/max_fps 秒；
+#     - 每次绘制从 FrameMailbox 取走全部帧，同一通道只保留最新一帧；
+#     - 只有这段时间里收到新数据的通道才会回调绘制，其它曲线不动；
+#     - 没有新数据时定时器不运行，不占CPU。
+# -----------------------------------------------------------------------------
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSlot
+
+
+class RenderScheduler(QObject):
+    """
+    - mailbox: frame_mailbox.FrameMailbox，帧的来源
+    - render_callback: render_callback(frame)，每次绘制对每个有新数据的通道调用一次；
+                       帧交给回调后由回调负责归还对象池
+    - max_fps: 最大绘制帧率
+    - frame_pool: 被合并掉（没画出来）的帧归还到这个对象池
+    """
+
+    def __init__(self, mailbox, render_callback, max_fps: float = 25.0, frame_pool=None, parent=None):
+        super().__init__(parent)
+        self.mailbox = mailbox
+        self.render_callback = render_callback
+        self.frame_pool = frame_pool
+        self.coalesced = 0          # 被合并掉没有绘制的帧数
+        self.ticks = 0              # 实际执行绘制的次数
+        self._last_tick = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+        self.set_max_fps(max_fps)
+
+        self.mailbox.frames_available.connect(self.schedule)
+
+    def set_max_fps(self, max_fps: float):
+        self.max_fps = max(1.0, float(max_fps))
+        self._interval = 1.0 / self.max_fps
+
+    def set_mailbox(self, mailbox):
+        """切换帧的来源（例如在实时数据和历史回放之间切换）"""
+        self.mailbox.frames_available.disconnect(self.schedule)
+        self.mailbox = mailbox
+        self.mailbox.frames_available.connect(self.schedule)
+        self.schedule()
+
+    @pyqtSlot()
+    def schedule(self):
+        """有新帧时调用：距离上次绘制已超过最小间隔就尽快绘制，否则等到间隔满了再画"""
+        if self._timer.isActive():
+            return  # 已经排好一次绘制了，新帧会在那次一起处理
+        wait = self._last_tick + self._interval - time.monotonic()
+        self._timer.start(max(0, int(wait * 1000)))
+
+    @pyqtSlot()
+    def _tick(self):
+        self._last_tick = time.monotonic()
+        frames = self.mailbox.take_all()
+        if not frames:
+            return
+
+        # 同一通道只保留最新一帧
+        latest = {}
+        for frame in frames:
+            previous = latest.get(frame.channel_id)
+            if previous is not None:
+                self.coalesced += 1
+                if self.frame_pool is not None:
+                    self.frame_pool.release(previous)
+            latest[frame.channel_id] = frame
+
+        self.ticks += 1
+        for frame in latest.values():
+            self.render_callback(frame)
@@ -10,7 +10,7 @@
 """
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QCheckBox, QFileDialog,
-                             QWidget, QSpacerItem, QSizePolicy)
+                             QWidget, QSpacerItem, QSizePolicy, QMessageBox)
 from PyQt5.QtCore import Qt, pyqtSlot
 
 
@@ -46,6 +46,7 @@ class RunRecordSettingsDialog(QDialog):
         self.le_interval = QLineEdit("50")
         self.le_interval.setFixedWidth(100)  # 限制宽度
         h_layout_interval.addWidget(self.le_interval)
+        h_layout_interval.addWidget(QLabel("秒"))
         h_layout_interval.addStretch()  # 弹簧
         sub_layout.addLayout(h_layout_interval)
 
@@ -60,16 +61,20 @@ class RunRecordSettingsDialog(QDialog):
         h_layout_path.addWidget(self.btn_browse)
         sub_layout.addLayout(h_layout_path)
 
+        # 1.3 压缩存储
+        self.cb_compress = QCheckBox("压缩存储（差分 + zlib，占用空间更小）")
+        sub_layout.addWidget(self.cb_compress)
+
         main_layout.addWidget(self.sub_options_widget)
 
         # --- 2. 其他复选框 ---
-        # self.cb_save_alarm = QCheckBox("保存报警信息")
-        # self.cb_save_alarm.setChecked(True)
-        # main_layout.addWidget(self.cb_save_alarm)
-        #
-        # self.cb_save_run_info = QCheckBox("保存设备运行信息")
-        # self.cb_save_run_info.setChecked(True)
-        # main_layout.addWidget(self.cb_save_run_info)
+        self.cb_save_alarm = QCheckBox("保存报警信息")
+        self.cb_save_alarm.setChecked(True)
+        main_layout.addWidget(self.cb_save_alarm)
+
+        self.cb_save_run_info = QCheckBox("保存设备运行信息")
+        self.cb_save_run_info.setChecked(True)
+        main_layout.addWidget(self.cb_save_run_info)
 
         # --- 3. 底部确定按钮 ---
         main_layout.addStretch()  # 将按钮推到底部
@@ -109,15 +114,36 @@ class RunRecordSettingsDialog(QDialog):
         """根据主复选框的状态，启用/禁用子选项"""
         self.sub_options_widget.setEnabled(checked)
 
-    @pyqtSlot()
-    def on_save(self):
-        """保存配置"""
-        config = {
+    def set_config(self, config: dict):
+        """用已有的配置填充界面（字段同 get_config 的返回值）"""
+        self.cb_save_data.setChecked(config["save_data"])
+        self.le_interval.setText(f"{config['interval']:g}")
+        self.le_path.setText(config["path"])
+        self.cb_compress.setChecked(config.get("compress", False))
+        self.cb_save_alarm.setChecked(config["save_alarm"])
+        self.cb_save_run_info.setChecked(config["save_run_info"])
+
+    def get_config(self) -> dict:
+        """读取界面上的配置；保存间隔不是数字时抛出 ValueError"""
+        return {
             "save_data": self.cb_save_data.isChecked(),
-            "interval": self.le_interval.text(),
+            "interval": float(self.le_interval.text()),
             "path": self.le_path.text(),
+            "compress": self.cb_compress.isChecked(),
             "save_alarm": self.cb_save_alarm.isChecked(),
             "save_run_info": self.cb_save_run_info.isChecked()
         }
+
+    @pyqtSlot()
+    def on_save(self):
+        """保存配置"""
+        try:
+            config = self.get_config()
+        except ValueError:
+            QMessageBox.warning(self, "参数错误", "数据保存间隔必须是数字（秒）")
+            return
+        if config["interval"] < 0:
+            QMessageBox.warning(self, "参数错误", "数据保存间隔不能小于0")
+            return
         print(f"运行记录配置已保存: {config}")
-        self.accept()
\ No newline at end of file
+        self.accept()  # 主界面通过 get_config() 取回配置
\ No newline at end of file
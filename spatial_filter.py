@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: spatial_filter.py
+@Author: 杜塞米
+@CreateDate: 2026/2/25
+@LastEditTime:
+@Description: 沿光纤方向的平滑/去噪（滑动平均 / Savitzky-Golay / 滑动中值），作为采集流水线的处理环节
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   0.5m 点间距的曲线噪声大，单点尖峰容易被当成热点。SpatialFilterStage 按通道沿距离方向滤波，
+#   整条曲线一次向量化计算，结果原地写回帧的温度数组：
+#     - 滑动平均：对两端补齐后的曲线做一次 cumsum，窗口和 = 两个前缀和相减，计算量和窗口大小无关；
+#       曲线里有 inf/NaN 时（前缀和的最后一项不是有限值）改用错位视图逐个相加，坏点只影响自己的窗口；
+#     - Savitzky-Golay：窗口内按最小二乘拟合多项式取中心值，等价于和固定系数做卷积，
+#       系数用范德蒙矩阵的伪逆算一次；每帧按窗口点数做几次“错位视图 × 系数”的乘加；
+#     - 滑动中值：sliding_window_view 得到 (点数, 窗口) 的跨步视图，复制进预分配的缓冲区后
+#       np.partition 取中间值，比 np.median 少一次排序和内存分配。
+#   两端各补 (窗口−1)/2 个端点值，输出和输入等长、位置不偏移。
+#   补齐缓冲区、前缀和、中值缓冲区都按帧长度预分配后复用，每帧不分配内存。
+#   修改某个通道的设置时新建一个 ChannelSpatialFilter 整体替换，不需要加锁。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SPATIAL_NONE = "none"
+SPATIAL_MEAN = "mean"
+SPATIAL_SAVGOL = "savgol"
+SPATIAL_MEDIAN = "median"
+
+# 界面上的选项：(显示文字, 模式)
+SPATIAL_OPTIONS = (("不滤波", SPATIAL_NONE), ("滑动平均", SPATIAL_MEAN),
+                   ("Savitzky-Golay", SPATIAL_SAVGOL), ("滑动中值", SPATIAL_MEDIAN))
+
+
+def savgol_coefficients(window: int, polyorder: int) -> np.ndarray:
+    """窗口点数为 window、多项式阶数为 polyorder 的 Savitzky-Golay 平滑系数（取窗口中心点的拟合值）"""
+    half = window // 2
+    x = np.arange(-half, half + 1, dtype=np.float64)
+    vandermonde = x[:, None] ** np.arange(polyorder + 1)
+    # 最小二乘拟合的系数 = pinv(V) @ y，中心点的拟合值就是第0个系数（常数项）
+    return np.linalg.pinv(vandermonde)[0].astype(np.float32)
+
+
+class ChannelSpatialFilter:
+    """
+    一个通道的空间滤波器。
+    - mode: SPATIAL_MEAN / SPATIAL_SAVGOL / SPATIAL_MEDIAN
+    - window: 窗口点数（奇数，至少3）
+    - polyorder: Savitzky-Golay 的多项式阶数（小于窗口点数）
+    """
+
+    def __init__(self, mode: str = SPATIAL_MEAN, window: int = 5, polyorder: int = 2):
+        if mode not in (SPATIAL_MEAN, SPATIAL_SAVGOL, SPATIAL_MEDIAN):
+            raise ValueError(f"未知的空间滤波方式: {mode}")
+        if window < 3 or window % 2 == 0:
+            raise ValueError("窗口点数必须是不小于3的奇数")
+        if mode == SPATIAL_SAVGOL and not 0 <= polyorder < window:
+            raise ValueError("多项式阶数必须小于窗口点数")
+        self.mode = mode
+        self.window = int(window)
+        self.polyorder = int(polyorder)
+        self._coefficients = savgol_coefficients(self.window, self.polyorder) if mode == SPATIAL_SAVGOL else None
+        self._num_points = 0
+        self._padded = None     # 两端补齐后的曲线
+        self._prefix = None     # 滑动平均的前缀和（float64，第0个元素为0）
+        self._windows = None    # 滑动中值的 (点数, 窗口) 缓冲区；Savitzky-Golay 的乘积暂存
+
+    def _prepare(self, num_points: int):
+        self._num_points = num_points
+        self._padded = np.empty(num_points + self.window - 1, dtype=np.float32)
+        if self.mode == SPATIAL_MEAN:
+            self._prefix = np.zeros(num_points + self.window, dtype=np.float64)
+        elif self.mode == SPATIAL_MEDIAN:
+            self._windows = np.empty((num_points, self.window), dtype=np.float32)
+        else:
+            self._windows = np.empty(num_points, dtype=np.float32)
+
+    def apply(self, temperatures: np.ndarray):
+        """原地滤波一帧温度"""
+        n = len(temperatures)
+        if n < self.window:
+            return
+        if n != self._num_points:
+            self._prepare(n)
+        half = self.window // 2
+        padded = self._padded
+        padded[half:half + n] = temperatures
+        padded[:half] = temperatures[0]
+        padded[half + n:] = temperatures[-1]
+
+        t = temperatures
+        if self.mode == SPATIAL_MEAN:
+            np.cumsum(padded, out=self._prefix[1:])
+            if np.isfinite(self._prefix[-1]):
+                np.subtract(self._prefix[self.window:], self._prefix[:-self.window], out=t, casting="unsafe")
+            else:
+                # 曲线里有 inf/NaN 时前缀和从那一点往后全被污染，改为逐个错位视图相加，坏点只影响它所在的窗口
+                np.copyto(t, padded[:n])
+                for k in range(1, self.window):
+                    np.add(t, padded[k:k + n], out=t)
+            np.multiply(t, np.float32(1.0 / self.window), out=t)
+        elif self.mode == SPATIAL_SAVGOL:
+            # 卷积：第 k 个错位视图 padded[k:k+n] 乘第 k 个系数，累加到 t
+            product = self._windows
+            np.multiply(padded[:n], self._coefficients[0], out=t)
+            for k in range(1, self.window):
+                np.multiply(padded[k:k + n], self._coefficients[k], out=product)
+                np.add(t, product, out=t)
+        else:
+            windows = self._windows
+            np.copyto(windows, sliding_window_view(padded, self.window))
+            windows.partition(half, axis=1)
+            t[:] = windows[:, half]
+
+
+class SpatialFilterStage:
+    """
+    所有通道的空间滤波，作为采集流水线的一个处理环节（process(frame) 原地修改温度）。
+    - channels: 通道数；channel_base: 第一个通道的 channel_id
+    """
+
+    def __init__(self, channels: int = 8, channel_base: int = 1):
+        self.channel_base = channel_base
+        self._channels = [None] * channels      # 每个通道的 ChannelSpatialFilter，None 表示不滤波
+
+    def set_channel(self, index: int, mode: str, window: int = 5, polyorder: int = 2):
+        """设置某个通道（下标从0开始）的空间滤波方式"""
+        current = self._channels[index]
+        if mode == SPATIAL_NONE:
+            self._channels[index] = None
+        elif current is None or (current.mode, current.window, current.polyorder) != (mode, int(window), int(polyorder)):
+            self._channels[index] = ChannelSpatialFilter(mode, window, polyorder)
+
+    def process(self, frame):
+        index = frame.channel_id - self.channel_base
+        if not 0 <= index < len(self._channels):
+            return
+        channel = self._channels[index]     # 只读一次引用，之后即使被替换也用这一份
+        if channel is not None:
+            channel.apply(frame.temperatures)
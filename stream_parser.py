@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: stream_parser.py
+@Author: 杜塞米
+@CreateDate: 2026/2/5
+@LastEditTime:
+@Description: 不依赖 Qt 的DTS数据流解析核心
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   从 DataParser 里拆出来的纯 Python/numpy 解析核心：缓冲区管理、按协议表解码、
+#   重新同步都在这里完成。它不继承 QObject、不发信号，结果通过生成器或回调交出，
+#   因此可以直接用在进程池、离线回放录制数据和性能测试里。
+#   DataParser 只是它外面的一层 Qt 信号适配。
+#
+#   用法:
+#     parser = StreamParser()
+#     for kind, item in parser.feed(chunk):      # 迭代器接口（数据在调用 feed 时就已放进缓冲区）
+#         ...
+#     parser.feed_to(chunk, callback)            # 回调接口: callback(kind, item)
+#     for kind, item in parse_stream(chunks):    # 直接解析一串数据块（例如读文件）
+#         ...
+#   kind 为 protocol.PACKET_SPECS 里的包类型名称：
+#     'temperature' -> item 是 frames.TemperatureFrame
+#     其它           -> item 是解码后的 dict
+# -----------------------------------------------------------------------------
+import time
+from packet_buffer import PacketBuffer
+from frames import FramePool
+from protocol import (PACKET_SPECS, KNOWN_PACKET_TYPES, SYNC_SUFFIX, PREFIX_SIZE,
+                      LENGTH_OFFSET, LENGTH_STRUCT)
+
+
+class StreamParser:
+    """
+    DTS二进制数据流解析器（无 Qt 依赖）。
+    - frame_pool: 温度帧对象池，用完的帧可以 release 回去复用
+    - clock: 生成接收时间戳的函数，默认 time.time；离线回放时可以换成自己的时钟
+    """
+
+    def __init__(self, frame_pool: FramePool = None, clock=time.time):
+        self.buffer = PacketBuffer()  # 预分配的缓冲区，存储接收到的不完整数据（读写游标，避免反复复制）
+        self.frame_pool = frame_pool if frame_pool is not None else FramePool()
+        self.clock = clock
+        self.sequence = 0       # 温度帧序号
+        self.bytes_skipped = 0  # 重新同步时累计丢弃的字节数
+        self.resync_count = 0   # 重新同步的次数
+        self.packet_count = 0   # 成功解析的数据包数
+
+        # 包类型字节 -> (格式描述, 解码函数)，每个包只查一次字典
+        # 温度包解码进对象池里的帧，其它包解码成 dict
+        self._dispatch = {}
+        for ptype, spec in PACKET_SPECS.items():
+            decode = self._make_frame_decoder(spec) if spec.kind == "temperature" else spec.decode
+            self._dispatch[ptype] = (spec, decode)
+
+    def feed(self, raw_data):
+        """
+        追加一块原始数据，返回逐个产出缓冲区里完整数据包 (kind, item) 的迭代器。
+        raw_data 可以是 bytes / bytearray / QByteArray / memoryview，只会被复制一次。
+        数据在调用时就放进缓冲区，不迭代返回值也不会丢；没取走的包留到下一次 feed 时再产出。
+        """
+        self.buffer.append(raw_data)
+        return self._drain()
+
+    def _drain(self):
+        """逐个产出缓冲区里所有完整的数据包"""
+        buffer = self.buffer
+        # 一个数据包至少需要一个包头和长度信息
+        while len(buffer) >= PREFIX_SIZE:
+            # --- 按第1个字节查表，再确认包头后缀 ---
+            entry = self._dispatch.get(buffer[0])
+            if entry is None or buffer[1:8] != SYNC_SUFFIX:
+                # 缓冲区开头不是任何已知的数据头，说明数据同步出错，
+                # 一次性跳到下一个已知包头（或丢弃全部垃圾数据）
+                self._resync()
+                continue
+            spec, decode = entry
+
+            # --- 长度规则：第9、10字节（低位在前）是整个包的字节数 ---
+            length_field = LENGTH_STRUCT.unpack_from(buffer.peek(PREFIX_SIZE), LENGTH_OFFSET)[0]
+            expected_packet_size = spec.packet_size(length_field)
+            if expected_packet_size < spec.min_size:
+                self._resync()  # 长度字段损坏
+                continue
+            if len(buffer) < expected_packet_size:
+                break  # 数据包不完整，等待更多数据
+
+            # 缓冲区数据足够，可以解析一个完整包（packet 是缓冲区的视图，不复制）
+            packet = buffer.peek(expected_packet_size)
+            # 检查结尾符
+            if packet[-1] != spec.trailer:
+                print(f"错误: {spec.kind} 包大小匹配但结束标记错误！丢弃包头并重新同步。")
+                self._resync()
+                continue
+
+            try:
+                item = decode(packet)
+            except Exception as e:
+                print(f"解析 {spec.kind} 数据包失败: {e}")
+                item = None
+            # 先移除已处理的数据包再交出结果，调用方中途停止迭代时缓冲区状态也是对的
+            buffer.consume(expected_packet_size)
+            if item is not None:
+                self.packet_count += 1
+                yield spec.kind, item
+
+    def feed_to(self, raw_data, callback) -> int:
+        """回调接口：解析 raw_data，对每个数据包调用 callback(kind, item)，返回包数"""
+        count = 0
+        for kind, item in self.feed(raw_data):
+            callback(kind, item)
+            count += 1
+        return count
+
+    def reset(self):
+        """清空缓冲区（例如重新连接设备后）"""
+        self.buffer.clear()
+
+    def _make_frame_decoder(self, spec):
+        """生成温度数据包（温度/Stokes/AntiStokes数据包）的解码函数：直接解码进对象池里取出的帧"""
+        def decode(packet):
+            frame = spec.decode_into(packet, self.frame_pool.acquire())
+            frame.timestamp = self.clock()
+            self.sequence += 1
+            frame.sequence = self.sequence
+            return frame
+        return decode
+
+    def _resync(self):
+        """
+        重新同步：丢弃缓冲区开头的错误数据，直接跳到最近的一个已知包头。
+        五种包头共用同一个7字节后缀，所以只需要用 find 搜后缀（C实现，一遍扫描），
+        再检查后缀前面那1个字节是不是已知的包类型，整体代价 O(n)。
+        """
+        buffer = self.buffer
+        # 从下标2开始搜后缀，保证找到的包头起点 >= 1，即至少丢弃当前这个错误的包头
+        start = 2
+        while True:
+            pos = buffer.find(SYNC_SUFFIX, start)
+            if pos < 0:
+                # 没找到后缀：末尾7个字节可能是下一个包头的前半截，保留下来，其余全部丢弃
+                skip = max(len(buffer) - len(SYNC_SUFFIX), 1)
+                break
+            if buffer[pos - 1] in KNOWN_PACKET_TYPES:
+                skip = pos - 1
+                break
+            start = pos + 1  # 后缀前面不是已知类型字节，继续往后找
+
+        buffer.consume(skip)
+        self.bytes_skipped += skip
+        self.resync_count += 1
+        print(f"数据包头错误，已重新同步：丢弃 {skip} 字节"
+              f"（累计同步 {self.resync_count} 次，丢弃 {self.bytes_skipped} 字节）")
+
+
+def parse_stream(chunks, frame_pool: FramePool = None, clock=time.time):
+    """
+    解析一串数据块（例如从录制文件按块读取），逐个产出 (kind, item)。
+    chunks 可以是任意可迭代的 bytes-like 对象序列。
+    """
+    parser = StreamParser(frame_pool, clock)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: temporal_filter.py
+@Author: 杜塞米
+@CreateDate: 2026/2/24
+@LastEditTime:
+@Description: 上位机按通道做时间方向的平均（滑动平均 / 指数平均 / 中值），作为采集流水线的处理环节
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   设备可以用更短的测量周期出数，噪声在上位机按通道沿时间方向平均掉：
+#     - 滑动平均：最近 N 帧的环形缓冲区 + 累加和，每帧减去最老的一帧、加上新的一帧，
+#       计算量只和点数有关，和 N 无关；累加和用 float64，每绕环若干圈按缓冲区重新求一次和，消除累计误差；
+#       校准、拉曼计算可能产生 inf/NaN，带坏点的帧做上标记，它被挤出窗口时不做减法（inf − inf 得 NaN），
+#       而是按缓冲区重新求和，坏点只影响包含它的 N 帧；
+#     - 指数平均（EMA）：s += α·(x − s)，只保存一条曲线；坏点不进入状态，原样输出，
+#       状态里还没有有效值的点（第一帧就是坏点）从下一个有效值开始；
+#     - 中值：最近 N 帧逐点取中值，能去掉偶发的尖峰，计算量和 N 成正比。
+#   结果原地写回帧的温度数组，后面的记录、显示、统计看到的都是平均后的数据。
+#   帧几何（点数、起始点）变化时清空历史重新开始。
+#   修改某个通道的设置时新建一个 ChannelTemporalFilter 整体替换（历史也随之清空），不需要加锁。
+#   这个模块不依赖 Qt。
+# -----------------------------------------------------------------------------
+import numpy as np
+
+FILTER_NONE = "none"
+FILTER_MEAN = "mean"
+FILTER_EMA = "ema"
+FILTER_MEDIAN = "median"
+
+# 界面上的选项：(显示文字, 模式)
+FILTER_OPTIONS = (("不平均", FILTER_NONE), ("滑动平均", FILTER_MEAN),
+                  ("指数平均", FILTER_EMA), ("中值", FILTER_MEDIAN))
+
+# 滑动平均每绕环这么多圈按缓冲区重新求一次和
+RESUM_INTERVAL = 64
+
+
+class ChannelTemporalFilter:
+    """
+    一个通道的时间滤波器。
+    - mode: FILTER_MEAN / FILTER_EMA / FILTER_MEDIAN
+    - length: 滑动平均、中值的帧数 N
+    - alpha: 指数平均的系数 α（0~1，越小越平滑）
+    """
+
+    def __init__(self, mode: str = FILTER_MEAN, length: int = 8, alpha: float = 0.2):
+        if mode not in (FILTER_MEAN, FILTER_EMA, FILTER_MEDIAN):
+            raise ValueError(f"未知的平均方式: {mode}")
+        if length < 1:
+            raise ValueError("平均帧数必须大于0")
+        if not 0 < alpha <= 1:
+            raise ValueError("指数平均系数必须在0到1之间")
+        self.mode = mode
+        self.length = int(length)
+        self.alpha = float(alpha)
+        self._geometry = None   # (点数, 起始点)
+        self._ring = None       # (N, 点数) float32，滑动平均和中值用
+        self._sum = None        # 滑动平均的累加和（float64）
+        self._state = None      # 指数平均的当前值
+        self._state_finite = True   # 指数平均的当前值是否全是有限值
+        self._bad = None        # 环形缓冲区每一行是否有 inf/NaN，滑动平均用
+        self._slot = 0          # 下一帧写入环形缓冲区的行
+        self._count = 0         # 缓冲区里已有的帧数
+        self._laps = 0          # 绕环的圈数
+
+    def reset(self):
+        self._geometry = None
+
+    def _prepare(self, num_points: int, data_start_point: int):
+        self._geometry = (num_points, data_start_point)
+        self._slot = self._count = self._laps = 0
+        if self.mode == FILTER_EMA:
+            self._state = np.empty(num_points, dtype=np.float32)
+        else:
+            self._ring = np.empty((self.length, num_points), dtype=np.float32)
+            if self.mode == FILTER_MEAN:
+                self._sum = np.zeros(num_points, dtype=np.float64)
+                self._bad = np.zeros(self.length, dtype=bool)
+
+    def apply(self, temperatures: np.ndarray, data_start_point: int = 0):
+        """放入一帧，并把平均结果原地写回 temperatures"""
+        if self._geometry != (len(temperatures), data_start_point):
+            self._prepare(len(temperatures), data_start_point)
+        if self.mode == FILTER_EMA:
+            self._apply_ema(temperatures)
+        elif self.mode == FILTER_MEAN:
+            self._apply_mean(temperatures)
+        else:
+            self._apply_median(temperatures)
+
+    def _advance(self):
+        """环形缓冲区的写入位置后移一行"""
+        self._slot += 1
+        if self._slot == self.length:
+            self._slot = 0
+            self._laps += 1
+
+    def _apply_mean(self, t: np.ndarray):
+        slot = self._slot
+        row = self._ring[slot]
+        evicted_bad = False
+        if self._count == self.length:
+            evicted_bad = self._bad[slot]
+            if not evicted_bad:
+                np.subtract(self._sum, row, out=self._sum)      # 减去最老的一帧
+        else:
+            self._count += 1
+        row[:] = t
+        # 整行求和是有限值 <=> 这一行没有 inf/NaN，不用另外分配布尔数组
+        self._bad[slot] = not np.isfinite(row.sum(dtype=np.float64))
+        self._advance()
+        if evicted_bad or (self._slot == 0 and self._laps % RESUM_INTERVAL == 0):
+            self._ring[:self._count].sum(axis=0, dtype=np.float64, out=self._sum)
+        else:
+            np.add(self._sum, row, out=self._sum)
+        np.divide(self._sum, self._count, out=t, casting="unsafe")
+
+    def _apply_ema(self, t: np.ndarray):
+        s = self._state
+        if self._count == 0:
+            s[:] = t
+            self._count = 1
+            self._state_finite = bool(np.isfinite(s.sum(dtype=np.float64)))
+        elif self._state_finite and np.isfinite(t.sum(dtype=np.float64)):
+            # s += α·(x − s)，先在 t 上算差值，不另外分配数组
+            np.subtract(t, s, out=t)
+            np.multiply(t, np.float32(self.alpha), out=t)
+            np.add(s, t, out=s)
+        else:
+            self._apply_ema_masked(t)
+            return
+        t[:] = s
+
+    def _apply_ema_masked(self, t: np.ndarray):
+        """这一帧或当前状态里有 inf/NaN 时逐点处理：坏点不更新状态，原样输出"""
+        s = self._state
+        ok = np.isfinite(t)
+        np.copyto(s, t, where=ok & ~np.isfinite(s))
+        np.subtract(t, s, out=t, where=ok)
+        np.multiply(t, np.float32(self.alpha), out=t, where=ok)
+        np.add(s, t, out=s, where=ok)
+        np.copyto(t, s, where=ok)
+        self._state_finite = bool(np.isfinite(s).all())
+
+    def _apply_median(self, t: np.ndarray):
+        self._ring[self._slot] = t
+        self._count = min(self._count + 1, self.length)
+        self._advance()
+        np.median(self._ring[:self._count], axis=0, out=t)
+
+
+class TemporalFilterStage:
+    """
+    所有通道的时间滤波，作为采集流水线的一个处理环节（process(frame) 原地修改温度）。
+    - channels: 通道数；channel_base: 第一个通道的 channel_id
+    """
+
+    def __init__(self, channels: int = 8, channel_base: int = 1):
+        self.channel_base = channel_base
+        self._channels = [None] * channels      # 每个通道的 ChannelTemporalFilter，None 表示不平均
+
+    def set_channel(self, index: int, mode: str, length: int = 8, alpha: float = 0.2):
+        """设置某个通道（下标从0开始）的平均方式；设置没变时保留已有的历史"""
+        current = self._channels[index]
+        if mode == FILTER_NONE:
+            self._channels[index] = None
+        elif current is None or (current.mode, current.length, current.alpha) != (mode, int(length), float(alpha)):
+            self._channels[index] = ChannelTemporalFilter(mode, length, alpha)
+
+    def reset(self):
+        """清空所有通道的历史（例如切换数据来源时）"""
+        for channel in self._channels:
+            if channel is not None:
+                channel.reset()
+
+    def process(self, frame):
+        index = frame.channel_id - self.channel_base
+        if not 0 <= index < len(self._channels):
+            return
+        channel = self._channels[index]     # 只读一次引用，之后即使被替换也用这一份
+        if channel is not None:
+            channel.apply(frame.temperatures, frame.data_start_point)
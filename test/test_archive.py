@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_archive.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 温度归档断电后重新打开续写的测试（python -m pytest test/test_archive.py）
+@Version: 1.0
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import TemperatureFrame
+from archive import ArchiveWriter, ARCHIVE_SUFFIX, INDEX_SUFFIX, INDEX_DTYPE
+from archive_reader import ArchiveReader
+
+T0 = 1700000000.0       # 整点附近，保证所有帧落在同一个小时文件里
+
+
+def make_frame(i: int, num_points: int = 100, channel_id: int = 1) -> TemperatureFrame:
+    frame = TemperatureFrame()
+    frame.timestamp = T0 + i
+    frame.channel_id = channel_id
+    frame.temperatures = np.full(num_points, 20.0 + i, dtype=np.float32)
+    return frame
+
+
+def archive_files(directory):
+    names = sorted(os.listdir(directory))
+    data = [os.path.join(directory, n) for n in names if n.endswith(ARCHIVE_SUFFIX)]
+    index = [os.path.join(directory, n) for n in names if n.endswith(INDEX_SUFFIX)]
+    return data, index
+
+
+def test_reopen_after_index_lost_entries(tmp_path):
+    """断电时索引比数据少了几条：续写后索引和记录必须仍然一一对应"""
+    writer = ArchiveWriter(str(tmp_path))
+    writer.write_frames([make_frame(i) for i in range(10)])
+    writer.close()
+
+    (data_path,), (index_path,) = archive_files(tmp_path)
+    with open(index_path, "r+b") as f:
+        f.truncate(8 * INDEX_DTYPE.itemsize)     # 最后两条索引没写进去
+
+    writer = ArchiveWriter(str(tmp_path))
+    writer.write_frames([make_frame(i) for i in range(10, 13)])
+    writer.close()
+
+    reader = ArchiveReader(str(tmp_path))
+    archive, = reader.files
+    assert len(archive) == 11
+    np.testing.assert_array_equal(archive.index, archive.records["timestamp"])
+    np.testing.assert_array_equal(archive.index - T0, list(range(8)) + [10, 11, 12])
+    _, records = reader.query(T0 + 10, T0 + 13)[0]
+    np.testing.assert_allclose(records["temps"][:, 0] / 100.0, [30.0, 31.0, 32.0])
+
+
+def test_reopen_after_partial_record(tmp_path):
+    """断电时数据文件留下半条记录：续写前截掉"""
+    writer = ArchiveWriter(str(tmp_path))
+    writer.write_frames([make_frame(i) for i in range(5)])
+    writer.close()
+
+    (data_path,), _ = archive_files(tmp_path)
+    with open(data_path, "ab") as f:
+        f.write(b"\x00" * 37)
+
+    writer = ArchiveWriter(str(tmp_path))
+    writer.write_frames([make_frame(5)])
+    writer.close()
+
+    archive, = ArchiveReader(str(tmp_path)).files
+    np.testing.assert_array_equal(archive.records["timestamp"] - T0, range(6))
+    np.testing.assert_array_equal(archive.index, archive.records["timestamp"])
+
+
+def test_interleaved_point_counts_keep_files_open(tmp_path, monkeypatch):
+    """不同点数的通道交替到来：每种点数只打开一次文件"""
+    opened = []
+    original_open = ArchiveWriter._open
+    monkeypatch.setattr(ArchiveWriter, "_open", lambda self, name, n: opened.append(n) or original_open(self, name, n))
+
+    writer = ArchiveWriter(str(tmp_path))
+    for i in range(200):
+        writer.write_frames([make_frame(i // 2, 8000 if i % 2 else 4000, channel_id=1 + i % 2)])
+    writer.close()
+
+    assert sorted(opened) == [4000, 8000]
+    reader = ArchiveReader(str(tmp_path))
+    assert sorted(f.num_points for f in reader.files) == [4000, 8000]
+    assert len(reader) == 200
+    for archive in reader.files:
+        np.testing.assert_array_equal(archive.index, archive.records["timestamp"])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_archive_reader.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 同一目录里普通归档和压缩归档合并回放的测试（python -m pytest test/test_archive_reader.py）
+@Version: 1.0
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import TemperatureFrame
+from archive import ArchiveWriter
+from archive_reader import ArchiveReader, CombinedArchiveReader
+from chunk_codec import CompressedArchiveWriter, CompressedArchiveReader
+
+T0 = 1700000000.0
+
+
+def make_frame(i: int, channel_id: int) -> TemperatureFrame:
+    frame = TemperatureFrame()
+    frame.timestamp = T0 + i
+    frame.channel_id = channel_id
+    frame.temperatures = np.full(50, 20.0 + i, dtype=np.float32)
+    return frame
+
+
+def record(directory, writer_class, seconds):
+    writer = writer_class(str(directory))
+    writer.write_frames([make_frame(i, channel_id) for i in seconds for channel_id in (1, 2)])
+    writer.close()
+
+
+def combined(directory) -> CombinedArchiveReader:
+    return CombinedArchiveReader([ArchiveReader(str(directory)), CompressedArchiveReader(str(directory))])
+
+
+def test_compression_switched_on_midway(tmp_path):
+    """先录普通归档、中途打开压缩：两段都能回放，按时间接起来"""
+    record(tmp_path, ArchiveWriter, range(0, 10))
+    record(tmp_path, CompressedArchiveWriter, range(10, 20))
+    reader = combined(tmp_path)
+
+    assert len(reader) == 40
+    assert (reader.start_time, reader.end_time) == (T0, T0 + 19)
+    assert len(reader.files) == 2
+
+    hits = reader.query(T0 + 5, T0 + 15, side="right")
+    timestamps = np.concatenate([records["timestamp"] for _, records in hits])
+    np.testing.assert_array_equal(np.unique(timestamps) - T0, range(6, 16))
+    last = [float(records["timestamp"][-1]) for _, records in hits]
+    assert last == sorted(last)
+
+    for t, expected in ((T0 + 4.5, 4), (T0 + 12, 12), (T0 + 100, 19)):
+        archive, found = reader.latest_before(t, 2)
+        assert found["channel_id"] == 2 and found["timestamp"] == T0 + expected
+        assert found["temps"][0] / archive.scale == 20.0 + expected
+    assert reader.latest_before(T0 - 1, 1) is None
+
+
+def test_compression_switched_off_midway(tmp_path):
+    record(tmp_path, CompressedArchiveWriter, range(0, 10))
+    record(tmp_path, ArchiveWriter, range(10, 20))
+    reader = combined(tmp_path)
+    assert len(reader) == 40
+    _, found = reader.latest_before(T0 + 9.5, 1)
+    assert found["timestamp"] == T0 + 9
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_calibration.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 分段校准的测试，和逐点标量公式对照（python -m pytest test/test_calibration.py）
+@Version: 1.0
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import TemperatureFrame
+from calibration import (CalibrationSegment, ChannelCalibration, CalibrationEngine, NOMINAL_SENSITIVITY,
+                         NOMINAL_ATTENUATION, NOMINAL_REFRACTIVE_INDEX, KELVIN, DB_PER_KM_TO_NEPER_PER_M)
+
+RESOLUTION = 0.5
+
+
+def scalar_reference(t0: float, nominal_distance: float, segments) -> float:
+    """逐段走到标称距离所在的段，按 1/T = (γ0/γ)/T0 − (L(z) − Δα0·z)/γ 算一个点（°C）"""
+    nominal_start = start = loss = 0.0
+    for s in segments:
+        alpha = s.attenuation * DB_PER_KM_TO_NEPER_PER_M
+        nominal_length = (s.end - start) * s.refractive_index / NOMINAL_REFRACTIVE_INDEX
+        if 0 <= nominal_distance <= nominal_start + nominal_length:
+            z = start + (nominal_distance - nominal_start) * NOMINAL_REFRACTIVE_INDEX / s.refractive_index
+            l_z = loss + alpha * (z - start)
+            inverse = (NOMINAL_SENSITIVITY / s.sensitivity) / (t0 + KELVIN) \
+                - (l_z - NOMINAL_ATTENUATION * DB_PER_KM_TO_NEPER_PER_M * z) / s.sensitivity
+            return 1.0 / inverse - KELVIN + s.offset
+        nominal_start += nominal_length
+        loss += alpha * (s.end - start)
+        start = s.end
+    return t0
+
+
+def trace(num_points: int = 4000) -> np.ndarray:
+    return (25.0 + 30.0 * np.sin(np.arange(num_points) / 200.0)).astype(np.float32)
+
+
+def calibrated(segments, temperatures, data_start_point: int = 0, start_offset: float = 0.0) -> np.ndarray:
+    t = temperatures.copy()
+    ChannelCalibration(segments, RESOLUTION, start_offset).apply(t, data_start_point)
+    return t
+
+
+def test_empty_and_nominal_are_identity():
+    t = trace()
+    np.testing.assert_allclose(calibrated([], t), t, atol=1e-4)
+    nominal = [CalibrationSegment(800.0), CalibrationSegment(1500.0), CalibrationSegment(2500.0)]
+    np.testing.assert_allclose(calibrated(nominal, t), t, atol=2e-3)
+
+
+def test_single_segment_matches_scalar_formula():
+    t = trace()
+    segments = [CalibrationSegment(1500.0, attenuation=0.25, sensitivity=650.0, offset=0.5)]
+    out = calibrated(segments, t)
+    expected = [scalar_reference(float(t0), i * RESOLUTION, segments) for i, t0 in enumerate(t)]
+    np.testing.assert_allclose(out, expected, atol=2e-3)
+    # 超出最后一段终点的点不修正
+    np.testing.assert_allclose(out[3001:], t[3001:], atol=1e-4)
+    assert abs(out[2999] - t[2999]) > 0.1
+
+
+def test_refractive_index_moves_segment_boundaries():
+    """折射率不是标称值时，分段终点（实际长度）换算成标称距离后才落到对应的点上"""
+    t = np.full(5000, 25.0, dtype=np.float32)
+    segments = [CalibrationSegment(1000.0, refractive_index=1.47, offset=1.0),
+                CalibrationSegment(2000.0, refractive_index=1.46, offset=2.0)]
+    out = calibrated(segments, t)
+    # 第一段的标称终点 1000×1.47/1.464 = 1004.10m，第二段再加 1000×1.46/1.464 = 997.27m
+    first_end = 1000.0 * 1.47 / NOMINAL_REFRACTIVE_INDEX
+    second_end = first_end + 1000.0 * 1.46 / NOMINAL_REFRACTIVE_INDEX
+    distance = np.arange(len(t)) * RESOLUTION
+    np.testing.assert_allclose(out[distance <= first_end], 26.0, atol=1e-3)
+    np.testing.assert_allclose(out[(distance > first_end) & (distance <= second_end)], 27.0, atol=1e-3)
+    np.testing.assert_allclose(out[distance > second_end], 25.0, atol=1e-4)
+
+    # 再加上衰减和敏感系数，逐点和标量公式对照（z 的换算错了衰减项就对不上）
+    segments = [CalibrationSegment(1000.0, 1.47, 0.35, 640.0, 1.0), CalibrationSegment(2000.0, 1.46, 0.02, 625.0)]
+    t = trace(5000)
+    out = calibrated(segments, t)
+    expected = [scalar_reference(float(t0), d, segments) for t0, d in zip(t, distance)]
+    np.testing.assert_allclose(out, expected, atol=2e-3)
+
+
+def test_data_start_point_uses_frame_geometry():
+    """帧从 data_start_point 开始时，结果和整条曲线校准后取同一段一样"""
+    segments = [CalibrationSegment(700.0, 1.47, 0.3, 645.0, 0.2), CalibrationSegment(1600.0, 1.455, 0.1, 630.0, -0.4)]
+    full = trace(4000)
+    expected = calibrated(segments, full, start_offset=12.0)
+
+    engine = CalibrationEngine(channels=2)
+    engine.configure(1, segments, RESOLUTION, 12.0)
+    for data_start_point, num_points in ((0, 4000), (1000, 2000), (1390, 500)):
+        frame = TemperatureFrame()
+        frame.channel_id = 2
+        frame.data_start_point = data_start_point
+        frame.temperatures = full[data_start_point:data_start_point + num_points].copy()
+        engine.process(frame)
+        np.testing.assert_allclose(frame.temperatures, expected[data_start_point:data_start_point + num_points],
+                                   atol=1e-4)
+    assert engine.segments(0) == []
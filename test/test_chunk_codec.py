@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_chunk_codec.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 压缩归档断电恢复、损坏块跳过的测试（python -m pytest test/test_chunk_codec.py）
+@Version: 1.0
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import TemperatureFrame
+from chunk_codec import CompressedArchiveWriter, CompressedArchiveReader, COMPRESSED_SUFFIX
+
+T0 = 1700000000.0       # 整点附近，保证所有帧落在同一个小时文件里
+
+
+def make_frame(i: int, num_points: int = 100, channel_id: int = 1) -> TemperatureFrame:
+    frame = TemperatureFrame()
+    frame.timestamp = T0 + i
+    frame.channel_id = channel_id
+    frame.temperatures = (20.0 + i + np.arange(num_points) * 0.01).astype(np.float32)
+    return frame
+
+
+def write(directory, frames, **kwargs):
+    writer = CompressedArchiveWriter(str(directory), chunk_frames=4, **kwargs)
+    writer.write_frames(frames)
+    writer.close()
+    return writer
+
+
+def data_path(directory):
+    name, = [n for n in os.listdir(directory) if n.endswith(COMPRESSED_SUFFIX)]
+    return os.path.join(directory, name)
+
+
+def test_reopen_after_truncated_chunk(tmp_path):
+    """断电时最后一块只写了一半但索引已经写入：续写前丢掉这一块，读取不报错"""
+    write(tmp_path, [make_frame(i) for i in range(8)])
+    path = data_path(tmp_path)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 10)
+
+    write(tmp_path, [make_frame(i) for i in range(8, 12)])
+
+    reader = CompressedArchiveReader(str(tmp_path))
+    records = np.concatenate([r for _, r in reader.query(T0, T0 + 100)])
+    np.testing.assert_array_equal(records["timestamp"] - T0, [0, 1, 2, 3, 8, 9, 10, 11])
+    _, last = reader.latest_before(T0 + 100, 1)
+    assert last["timestamp"] == T0 + 11
+
+
+def test_corrupt_chunk_is_skipped(tmp_path):
+    """中间某块损坏：查询跳过这一块，其它块照常返回"""
+    write(tmp_path, [make_frame(i) for i in range(12)])
+    reader = CompressedArchiveReader(str(tmp_path))
+    archive, = reader.files
+    second = archive.chunks[1]
+    with open(archive.path, "r+b") as f:
+        f.seek(int(second["offset"]) + 2)
+        f.write(b"\xff" * 8)
+
+    reader = CompressedArchiveReader(str(tmp_path))
+    records = np.concatenate([r for _, r in reader.query(T0, T0 + 100)])
+    np.testing.assert_array_equal(records["timestamp"] - T0, [0, 1, 2, 3, 8, 9, 10, 11])
+    _, last = reader.latest_before(T0 + 6, 1)
+    assert last["timestamp"] == T0 + 3
+
+
+def test_interleaved_point_counts_keep_chunks_full(tmp_path):
+    """不同点数的通道交替到来：不反复开关文件，块也照样攒满"""
+    writer = CompressedArchiveWriter(str(tmp_path), chunk_frames=32)
+    for i in range(200):
+        writer.write_frames([make_frame(i // 2, 8000 if i % 2 else 4000, channel_id=1 + i % 2)])
+    writer.close()
+
+    reader = CompressedArchiveReader(str(tmp_path))
+    assert sorted(f.num_points for f in reader.files) == [4000, 8000]
+    assert len(reader) == 200
+    for archive in reader.files:
+        assert list(archive.chunks["n_frames"]) == [32, 32, 32, 4]
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_frame_mailbox.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 帧信箱丢帧策略的测试（python -m pytest test/test_frame_mailbox.py）
+@Version: 1.0
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import TemperatureFrame
+from frame_mailbox import FrameMailbox
+
+
+class RecordingPool:
+    def __init__(self):
+        self.released = []
+
+    def release(self, frame):
+        self.released.append(frame)
+
+    def release_all(self, frames):
+        self.released.extend(frames)
+
+
+def make_frame(channel_id: int, sequence: int) -> TemperatureFrame:
+    frame = TemperatureFrame()
+    frame.channel_id = channel_id
+    frame.sequence = sequence
+    return frame
+
+
+def make_mailbox(policy, depth=1, block_timeout=1.0):
+    pool = RecordingPool()
+    mailbox = FrameMailbox(policy, depth, frame_pool=pool, block_timeout=block_timeout)
+    notifications = []
+    mailbox.frames_available.connect(lambda: notifications.append(len(mailbox)))
+    return mailbox, pool, notifications
+
+
+def test_latest_keeps_newest_per_channel():
+    mailbox, pool, notifications = make_mailbox(FrameMailbox.POLICY_LATEST, depth=5)
+    frames = [make_frame(1, 1), make_frame(2, 2), make_frame(1, 3), make_frame(1, 4)]
+    mailbox.put_batch(frames)
+    assert len(mailbox) == 2
+    assert mailbox.take_all() == [frames[3], frames[1]]
+    assert pool.released == [frames[0], frames[2]]
+    assert mailbox.dropped == {1: 2} and mailbox.total_dropped == 2
+    # 取走之前只通知一次，取走之后再放入会重新通知
+    assert notifications == [1]
+    mailbox.put(make_frame(2, 5))
+    assert notifications == [1, 1]
+
+
+def test_last_n_keeps_recent_frames_in_order():
+    mailbox, pool, _ = make_mailbox(FrameMailbox.POLICY_LAST_N, depth=3)
+    frames = [make_frame(1, i) for i in range(5)]
+    mailbox.put_batch(frames)
+    assert mailbox.take_all() == frames[2:]
+    assert pool.released == frames[:2]
+    assert len(mailbox) == 0
+
+
+def test_block_waits_for_consumer():
+    mailbox, pool, _ = make_mailbox(FrameMailbox.POLICY_BLOCK, depth=1, block_timeout=5.0)
+    first, second = make_frame(1, 1), make_frame(1, 2)
+    mailbox.put(first)
+    producer = threading.Thread(target=mailbox.put, args=(second,))
+    producer.start()
+    time.sleep(0.1)
+    assert producer.is_alive()          # 信箱满了，采集线程在等
+    assert mailbox.take_all() == [first]
+    producer.join(1.0)
+    assert not producer.is_alive()
+    assert mailbox.take_all() == [second]
+    assert mailbox.total_dropped == 0 and pool.released == []
+
+
+def test_block_timeout_drops_oldest():
+    mailbox, pool, _ = make_mailbox(FrameMailbox.POLICY_BLOCK, depth=1, block_timeout=0.05)
+    first, second = make_frame(1, 1), make_frame(1, 2)
+    mailbox.put(first)
+    begin = time.monotonic()
+    mailbox.put(second)
+    assert 0.04 <= time.monotonic() - begin < 1.0
+    assert mailbox.take_all() == [second]
+    assert pool.released == [first] and mailbox.dropped == {1: 1}
+
+
+def test_clear_releases_without_counting_drops():
+    mailbox, pool, _ = make_mailbox(FrameMailbox.POLICY_LAST_N, depth=4)
+    frames = [make_frame(1, 1), make_frame(2, 2)]
+    mailbox.put_batch(frames)
+    mailbox.clear()
+    assert len(mailbox) == 0 and mailbox.total_dropped == 0
+    assert pool.released == frames
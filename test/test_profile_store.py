@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_profile_store.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 通道配置文件读写、手改出错时回退默认值的测试（python -m pytest test/test_profile_store.py）
+@Version: 1.0
+"""
+import json
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calibration import CalibrationSegment
+from profile_store import ProfileStore, DEFAULT_MEASUREMENT
+
+
+def write_profiles(path, channels, **extra):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict({"version": 1, "revision": 3, "channels": channels}, **extra), f)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    store = ProfileStore(path)
+    store.stage(2, store.pending(2).replace(segments=[CalibrationSegment(1000, offset=1.5)],
+                                            measurement={"resolution": 1.0, "temporal_filter": "ema"}))
+    assert store.publish() == [2]
+
+    loaded = ProfileStore(path)
+    loaded.load()
+    assert loaded.revision == 1
+    assert loaded.active[2] == store.active[2]
+    assert loaded.active[0].measurement == DEFAULT_MEASUREMENT
+
+
+def test_bad_entries_fall_back_to_defaults(tmp_path):
+    path = str(tmp_path / "profiles.json")
+    write_profiles(path, [
+        {"segments": [], "measurement": {"resolution": 2.0}},                   # 没有 channel
+        {"channel": "2", "measurement": {"resolution": 2.0}},                   # channel 不是整数
+        {"channel": 3, "segments": [[1000, 1.46, 0.08]]},                       # 校准表的行太短
+        {"channel": 4, "segments": [[2000, 1.464, 0.08, 633, 0], [1000, 1.464, 0.08, 633, 0]]},  # 终点不递增
+        {"channel": 5, "measurement": {"resolution": "abc", "end": 3000.0, "average_count": 1.5,
+                                       "temporal_filter": "fancy", "by_time": 1}},
+        {"channel": 6, "measurement": {"reference_start": 200, "reference_end": 100, "laser_power": float("nan")}},
+        {"channel": 7, "segments": [[1000, 1.47, 0.1, 640, 0.5]], "measurement": {"spatial_window": 7}},
+        "not a dict",
+    ])
+    store = ProfileStore(path)
+    active = store.load()
+
+    assert active[0] == active[1] == active[2] == active[3]
+    assert active[2].segments == () and active[3].segments == ()
+    m5 = active[4].measurement
+    assert m5["end"] == 3000.0
+    for key in ("resolution", "average_count", "temporal_filter", "by_time"):
+        assert m5[key] == DEFAULT_MEASUREMENT[key]
+    m6 = active[5].measurement
+    assert (m6["reference_start"], m6["reference_end"]) == (0, 100)
+    assert m6["laser_power"] == DEFAULT_MEASUREMENT["laser_power"]
+    assert active[6].segments[0].sensitivity == 640 and active[6].measurement["spatial_window"] == 7
+
+
+@pytest.mark.parametrize("content", ["[1, 2]", "{not json", '{"version": "x"}', '{"channels": {}}', '{"version": 99}'])
+def test_broken_file_raises_value_error(tmp_path, content):
+    path = tmp_path / "profiles.json"
+    path.write_text(content, encoding="utf-8")
+    store = ProfileStore(str(path))
+    with pytest.raises(ValueError):
+        store.load()
+    assert store.active[0].measurement == DEFAULT_MEASUREMENT
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_raman.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 比值法温度计算和 Stokes / Anti-Stokes 配对的测试（python -m pytest test/test_raman.py）
+@Version: 1.0
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import TemperatureFrame
+from protocol import DATA_TYPE_TEMPERATURE, DATA_TYPE_STOKES, DATA_TYPE_ANTI_STOKES
+from calibration import DB_PER_KM_TO_NEPER_PER_M, KELVIN
+from raman import RamanChannel, RamanRouter
+
+GAMMA = 640.0           # 温度敏感系数（K）
+ATTENUATION = 0.3       # 差分衰减（dB/km）
+RESOLUTION = 0.5
+START_OFFSET = 10.0
+
+
+def synthetic_traces(temperatures: np.ndarray, data_start_point: int = 0):
+    """按 ln R = C − γ/T − Δα·z 由已知温度（°C）生成 Stokes / Anti-Stokes 曲线"""
+    z = START_OFFSET + (data_start_point + np.arange(len(temperatures))) * RESOLUTION
+    ln_r = 0.7 - GAMMA / (temperatures + KELVIN) - ATTENUATION * DB_PER_KM_TO_NEPER_PER_M * z
+    stokes = 2000.0 * np.exp(-2e-5 * z)
+    return stokes.astype(np.float32), (stokes * np.exp(ln_r)).astype(np.float32)
+
+
+def known_profile(num_points: int, reference: slice, reference_temperature: float) -> np.ndarray:
+    temperatures = 20.0 + 15.0 * np.sin(np.arange(num_points) / 300.0)
+    temperatures[800:820] = 85.0        # 热点
+    temperatures[reference] = reference_temperature
+    return temperatures
+
+
+def make_channel(reference_start: int, reference_end: int) -> RamanChannel:
+    return RamanChannel(reference_start, reference_end, reference_temperature=30.0, sensitivity=GAMMA,
+                        attenuation=ATTENUATION, resolution=RESOLUTION, start_offset=START_OFFSET)
+
+
+def test_compute_round_trip():
+    temperatures = known_profile(4000, slice(0, 100), 30.0)
+    stokes, anti_stokes = synthetic_traces(temperatures)
+    assert make_channel(0, 100).compute(stokes, anti_stokes)
+    np.testing.assert_allclose(anti_stokes, temperatures, atol=0.02)
+
+
+def test_compute_with_data_start_point():
+    """参考段用绝对点号，帧从 data_start_point 开始时按偏移后的位置取参考段、算衰减"""
+    data_start_point = 1000
+    temperatures = known_profile(3000, slice(200, 300), 30.0)
+    stokes, anti_stokes = synthetic_traces(temperatures, data_start_point)
+    assert make_channel(1200, 1300).compute(stokes, anti_stokes, data_start_point)
+    np.testing.assert_allclose(anti_stokes, temperatures, atol=0.02)
+
+
+def test_compute_reference_outside_frame():
+    stokes, anti_stokes = synthetic_traces(np.full(500, 30.0), 1000)
+    assert not make_channel(0, 100).compute(stokes, anti_stokes, 1000)
+
+
+class RecordingPool:
+    def __init__(self):
+        self.released = []
+
+    def release(self, frame):
+        if frame is not None:
+            self.released.append(frame)
+
+
+def make_frame(data_type: int, values: np.ndarray, channel_id: int = 1, timestamp: float = 0.0,
+               data_start_point: int = 0) -> TemperatureFrame:
+    frame = TemperatureFrame()
+    frame.data_type = data_type
+    frame.channel_id = channel_id
+    frame.timestamp = timestamp
+    frame.data_start_point = data_start_point
+    frame.temperatures = values.copy()
+    return frame
+
+
+def make_router(pool) -> RamanRouter:
+    router = RamanRouter(pool, channels=2)
+    for index in range(2):
+        router.set_channel(index, reference_start=0, reference_end=100, reference_temperature=30.0,
+                           sensitivity=GAMMA, attenuation=ATTENUATION, resolution=RESOLUTION,
+                           start_offset=START_OFFSET)
+    return router
+
+
+def test_route_pairs_and_releases_stokes():
+    pool = RecordingPool()
+    router = make_router(pool)
+    temperatures = known_profile(1000, slice(0, 100), 30.0)
+    stokes, anti_stokes = synthetic_traces(temperatures)
+    passthrough = make_frame(DATA_TYPE_TEMPERATURE, np.zeros(10, dtype=np.float32), channel_id=2)
+    s1 = make_frame(DATA_TYPE_STOKES, stokes, timestamp=1.0)
+    s2 = make_frame(DATA_TYPE_STOKES, stokes, timestamp=2.0)       # 替换掉还没配对的 s1
+    a2 = make_frame(DATA_TYPE_ANTI_STOKES, anti_stokes, timestamp=3.0)
+
+    assert router.route([passthrough]) == [passthrough]
+    assert router.route([s1, passthrough]) == [passthrough]
+    assert router.route([s2]) == []
+    assert pool.released == [s1]
+
+    result = router.route([a2])
+    assert result == [a2] and a2.data_type == DATA_TYPE_TEMPERATURE and a2.timestamp == 3.0
+    np.testing.assert_allclose(a2.temperatures, temperatures, atol=0.02)
+    assert pool.released == [s1, s2]
+    assert router.computed == 1
+
+
+def test_route_keeps_channels_and_geometry_apart():
+    pool = RecordingPool()
+    router = make_router(pool)
+    stokes, anti_stokes = synthetic_traces(np.full(1000, 30.0))
+    s1 = make_frame(DATA_TYPE_STOKES, stokes, channel_id=1)
+    a_other = make_frame(DATA_TYPE_ANTI_STOKES, anti_stokes, channel_id=2)
+    a_short = make_frame(DATA_TYPE_ANTI_STOKES, anti_stokes[:500], channel_id=1)
+    assert router.route([s1, a_other, a_short]) == []
+    assert pool.released == [] and router.computed == 0
+
+
+def test_reference_outside_frame_is_reported_once(capsys):
+    pool = RecordingPool()
+    router = make_router(pool)
+    stokes, anti_stokes = synthetic_traces(np.full(500, 30.0), 1000)
+    for _ in range(3):
+        frames = [make_frame(DATA_TYPE_STOKES, stokes, data_start_point=1000),
+                  make_frame(DATA_TYPE_ANTI_STOKES, anti_stokes, data_start_point=1000)]
+        assert router.route(frames) == []
+        assert pool.released[-2:] == frames
+    assert router.unreferenced == 3
+    assert capsys.readouterr().out.count("参考段") == 1
+
+    router.set_channel(0, reference_start=1000, reference_end=1100)
+    frames = [make_frame(DATA_TYPE_STOKES, stokes, data_start_point=1000),
+              make_frame(DATA_TYPE_ANTI_STOKES, anti_stokes, data_start_point=1000)]
+    assert router.route(frames) == [frames[1]]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_recorder.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 运行记录写盘出错重试、停止/重新启动的测试（python -m pytest test/test_recorder.py）
+@Version: 1.0
+"""
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import recorder
+from frames import TemperatureFrame
+from recorder import FrameRecorder
+
+
+def make_frame(i: int) -> TemperatureFrame:
+    frame = TemperatureFrame()
+    frame.timestamp = 1700000000.0 + i
+    frame.channel_id = 1
+    frame.temperatures = np.full(10, 20.0 + i, dtype=np.float32)
+    return frame
+
+
+class ListWriter:
+    """记在内存里的写文件对象；fail 次数用完之前每次写都抛出 OSError，gate 没放行时写入会卡住"""
+
+    def __init__(self, fail: int = 0, gate: threading.Event = None):
+        self.fail = fail
+        self.gate = gate
+        self.timestamps = []
+        self.opened = 0
+
+    def __call__(self, directory):
+        self.opened += 1
+        return self
+
+    def write_frames(self, frames):
+        if self.gate is not None:
+            self.gate.wait()
+        if self.fail > 0:
+            self.fail -= 1
+            raise OSError("No space left on device")
+        self.timestamps.extend(frame.timestamp for frame in frames)
+
+    def write_events(self, events):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_write_error_is_retried(monkeypatch):
+    """写盘出错时丢掉这一批、报告错误，之后重新打开接着记录"""
+    monkeypatch.setattr(recorder, "RETRY_MIN_DELAY", 0.01)
+    writer = ListWriter(fail=2)
+    rec = FrameRecorder("unused", interval=0, flush_interval=0.05, writer_factory=writer)
+    rec.start()
+    for i in range(2):
+        rec.submit_batch([make_frame(i)])
+        wait_until(lambda: rec.write_errors == i + 1)
+        assert rec.running and "No space" in rec.error
+
+    rec.submit_batch([make_frame(2)])
+    wait_until(lambda: rec.frames_written == 1)
+    assert rec.error is None
+    assert rec.stop()
+    assert writer.timestamps == [1700000002.0]
+    assert writer.opened == 3 and rec.dropped == 2
+
+
+def test_failing_writer_factory_does_not_kill_thread(monkeypatch):
+    monkeypatch.setattr(recorder, "RETRY_MIN_DELAY", 0.01)
+
+    def factory(directory):
+        raise PermissionError("cannot create directory")
+
+    rec = FrameRecorder("unused", interval=0, flush_interval=0.05, writer_factory=factory)
+    rec.start()
+    rec.submit_batch([make_frame(0)])
+    wait_until(lambda: rec.error is not None)
+    assert rec.running
+    assert rec.stop()
+
+
+def test_restart_waits_for_old_writer():
+    """写盘线程没在超时内退出时，stop 不阻塞、不丢句柄，start 在它退出前不启动第二个线程"""
+    gate = threading.Event()
+    writer = ListWriter(gate=gate)
+    rec = FrameRecorder("unused", interval=0, max_queue=1, flush_interval=0.05, writer_factory=writer)
+    rec.start()
+    rec.submit_batch([make_frame(0)])
+    wait_until(lambda: rec._queue.empty())     # 写盘线程已经取走，卡在写文件里
+    rec.submit_batch([make_frame(1)])          # 队列满
+
+    begin = time.monotonic()
+    assert not rec.stop(timeout=0.1)
+    assert time.monotonic() - begin < 1.0
+    old_thread = rec._thread
+    assert not rec.running and old_thread.is_alive()
+    assert not rec.start()
+    assert rec._thread is old_thread
+
+    gate.set()
+    wait_until(lambda: not rec._thread.is_alive())
+    assert writer.timestamps == [1700000000.0, 1700000001.0]
+    assert rec.start()
+    assert rec.stop()
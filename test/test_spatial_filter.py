@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_spatial_filter.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 空间滤波的测试（python -m pytest test/test_spatial_filter.py）
+@Version: 1.0
+"""
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spatial_filter import ChannelSpatialFilter
+
+
+def reference(x: np.ndarray, window: int, reduce) -> np.ndarray:
+    padded = np.pad(x.astype(np.float64), window // 2, mode="edge")
+    return reduce(np.lib.stride_tricks.sliding_window_view(padded, window), axis=1)
+
+
+@pytest.mark.parametrize("mode, reduce", [("mean", np.mean), ("median", np.median)])
+def test_matches_reference(mode, reduce):
+    x = np.random.default_rng(0).normal(25, 0.5, 1000).astype(np.float32)
+    y = x.copy()
+    ChannelSpatialFilter(mode, 7).apply(y)
+    np.testing.assert_allclose(y, reference(x, 7, reduce), atol=1e-4)
+
+
+def test_savgol_preserves_quadratic():
+    z = np.arange(200, dtype=np.float32)
+    x = (0.01 * (z - 100) ** 2 + 3).astype(np.float32)
+    y = x.copy()
+    ChannelSpatialFilter("savgol", 7, 2).apply(y)
+    np.testing.assert_allclose(y[3:-3], x[3:-3], atol=1e-3)
+
+
+def test_mean_non_finite_stays_in_its_window():
+    """一个 NaN/inf 只影响包含它的窗口，不会通过前缀和污染后面整条曲线"""
+    x = np.random.default_rng(1).normal(25, 0.5, 100).astype(np.float32)
+    x[10] = np.nan
+    x[50] = np.inf
+    y = x.copy()
+    ChannelSpatialFilter("mean", 5).apply(y)
+    np.testing.assert_array_equal(np.flatnonzero(~np.isfinite(y)), [8, 9, 10, 11, 12, 48, 49, 50, 51, 52])
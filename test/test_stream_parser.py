@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_stream_parser.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 数据流解析、出错后重新同步的测试（python -m pytest test/test_stream_parser.py）
+@Version: 1.0
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protocol import TEMP_HEADER, FIXED_ALARM_HEADER, TEMP_HEADER_STRUCT, SYNC_SUFFIX, TRAILER
+from stream_parser import StreamParser
+
+
+def temp_packet(channel: int, num_points: int = 16, value: int = 2512) -> bytes:
+    size = TEMP_HEADER_STRUCT.size + 2 * num_points + 1
+    header = TEMP_HEADER_STRUCT.pack(TEMP_HEADER, 1, size, 0, 0, channel, 0, num_points - 1, 8, channel)
+    return header + np.full(num_points, value, dtype="<i2").tobytes() + bytes([TRAILER])
+
+
+def alarm_packet() -> bytes:
+    return FIXED_ALARM_HEADER + bytes([1]) + (26).to_bytes(2, "little") + bytes(14) + bytes([TRAILER])
+
+
+def parse(parser: StreamParser, *chunks) -> list:
+    result = []
+    for chunk in chunks:
+        result.extend((kind, item.channel_id if kind == "temperature" else None)
+                      for kind, item in parser.feed(chunk))
+    return result
+
+
+def test_clean_stream_split_anywhere():
+    data = temp_packet(1) + alarm_packet() + temp_packet(2)
+    for step in (1, 7, 11, 30, len(data)):
+        parser = StreamParser()
+        chunks = [data[i:i + step] for i in range(0, len(data), step)]
+        assert parse(parser, *chunks) == [("temperature", 1), ("fixed_alarm", None), ("temperature", 2)]
+        assert parser.resync_count == 0 and len(parser.buffer) == 0
+
+
+def test_garbage_is_skipped_in_one_scan():
+    parser = StreamParser()
+    garbage = bytes(range(7, 250)) * 40
+    assert parse(parser, garbage + temp_packet(3)) == [("temperature", 3)]
+    assert parser.bytes_skipped == len(garbage)
+    assert parser.resync_count == 1
+
+
+def test_suffix_after_unknown_type_byte_is_not_a_header():
+    parser = StreamParser()
+    fake = b"\x01" + SYNC_SUFFIX + b"\x00" * 5
+    assert parse(parser, fake + temp_packet(4)) == [("temperature", 4)]
+    assert parser.bytes_skipped == len(fake)
+
+
+def test_header_split_across_chunks_survives_resync():
+    """垃圾数据末尾只收到半个包头：保留下来，下一块数据到了以后能拼成完整的包"""
+    parser = StreamParser()
+    packet = temp_packet(5)
+    garbage = b"\x11" * 100
+    assert parse(parser, garbage + packet[:5]) == []
+    assert parse(parser, packet[5:]) == [("temperature", 5)]
+    assert parser.bytes_skipped == len(garbage)
+
+
+def test_bad_length_and_trailer_resync_to_next_packet():
+    bad_length = bytearray(temp_packet(6))
+    bad_length[9:11] = (3).to_bytes(2, "little")          # 比头部还短
+    bad_trailer = bytearray(temp_packet(7))
+    bad_trailer[-1] = 0x00
+    parser = StreamParser()
+    assert parse(parser, bytes(bad_length) + bytes(bad_trailer) + temp_packet(8)) == [("temperature", 8)]
+    assert parser.resync_count == 2
+    assert parser.bytes_skipped == len(bad_length) + len(bad_trailer)
+
+
+def test_feed_appends_without_iterating():
+    """feed 的返回值没有被迭代时数据也不能丢"""
+    parser = StreamParser()
+    packet = temp_packet(9)
+    parser.feed(packet[:20])
+    parser.feed(packet[20:])
+    assert parse(parser, temp_packet(10)) == [("temperature", 9), ("temperature", 10)]
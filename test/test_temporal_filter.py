@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: test_temporal_filter.py
+@Author: 杜塞米
+@CreateDate: 2026/2/26
+@LastEditTime:
+@Description: 时间滤波的测试（python -m pytest test/test_temporal_filter.py）
+@Version: 1.0
+"""
+import os
+import sys
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from temporal_filter import ChannelTemporalFilter, RESUM_INTERVAL
+
+
+def run(channel: ChannelTemporalFilter, frames: np.ndarray) -> np.ndarray:
+    """逐帧滤波，返回每一帧的输出；出现 RuntimeWarning 时测试失败"""
+    out = frames.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        for row in out:
+            channel.apply(row)
+    return out
+
+
+def test_mean_matches_reference():
+    frames = np.random.default_rng(0).normal(25, 0.5, (3 * RESUM_INTERVAL * 8, 50)).astype(np.float32)
+    out = run(ChannelTemporalFilter("mean", 8), frames)
+    for i in (0, 3, 7, 8, 100, len(frames) - 1):
+        np.testing.assert_allclose(out[i], frames[max(0, i - 7):i + 1].mean(axis=0), atol=1e-4)
+
+
+def test_mean_non_finite_leaves_window():
+    """一帧里的 inf/NaN 只影响包含它的 N 帧，挤出窗口后结果恢复，也不产生警告"""
+    frames = np.random.default_rng(1).normal(25, 0.5, (200, 50)).astype(np.float32)
+    frames[5, 10] = np.inf
+    frames[40, 20] = np.nan
+    out = run(ChannelTemporalFilter("mean", 8), frames)
+
+    np.testing.assert_array_equal(np.flatnonzero(~np.isfinite(out[:, 10])), range(5, 13))
+    np.testing.assert_array_equal(np.flatnonzero(~np.isfinite(out[:, 20])), range(40, 48))
+    assert np.isfinite(np.delete(out, [10, 20], axis=1)).all()
+    np.testing.assert_allclose(out[-1], frames[-8:].mean(axis=0), atol=1e-4)
+
+
+def test_ema_non_finite_does_not_stick():
+    """坏点原样输出但不进入状态；第一帧就是坏点的位置从下一个有效值开始"""
+    frames = np.full((20, 4), 25.0, dtype=np.float32)
+    frames[0, 0] = np.nan
+    frames[5, 1] = np.inf
+    out = run(ChannelTemporalFilter("ema", alpha=0.5), frames)
+
+    expected = np.full_like(frames, 25.0)
+    expected[0, 0] = np.nan
+    expected[5, 1] = np.inf
+    np.testing.assert_allclose(out, expected)
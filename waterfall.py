@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+@Project: pyqt-project
+@File: waterfall.py
+@Author: 杜塞米
+@CreateDate: 2026/2/13
+@LastEditTime:
+@Description: 距离-时间瀑布图（热力图）：固定大小的环形缓冲区 + 滚动偏移显示
+@Version: 1.0
+"""
+# -----------------------------------------------------------------------------
+# 描述:
+#   WaterfallBuffer 保存一个通道最近 history_rows 帧的温度，每帧写入一行：
+#     - 点数多于 columns 时按区间取最大值合并（高温点不会被平均掉），
+#       8000 点的光纤默认合并成 1024 列，1小时@1Hz 的历史约 7MB；
+#     - 温度按固定的显示范围量化成 uint8，颜色由 ImageItem 的查找表一次性向量化映射；
+#     - 缓冲区是两倍高度的环形数组，每行同时写在 pos 和 pos+rows 两处，
+#       所以“最旧到最新”的 rows 行永远是一段连续的切片，刷新显示只需换一个视图，
+#       不需要 np.roll 或重新拼接整幅图像。
+#   WaterfallView 把缓冲区接到 pyqtgraph 的 ImageItem 上，X轴为距离(m)，
+#   Y轴为“几帧之前”（0 为最新一帧，在最上面）。
+# -----------------------------------------------------------------------------
+import numpy as np
+import pyqtgraph as pg
+from PyQt5.QtCore import QRectF
+
+
+class WaterfallBuffer:
+    """
+    - history_rows: 保留的历史帧数
+    - columns: 每行最多的列数（点数更多时按最大值合并）
+    - levels: (最低温度, 最高温度)，量化成 0~255 的显示范围
+    """
+
+    def __init__(self, history_rows: int = 3600, columns: int = 1024, levels=(10.0, 80.0)):
+        self.history_rows = history_rows
+        self.max_columns = columns
+        self.levels = levels
+        self.rows = 0               # 已写入的行数（最多 history_rows）
+        self.num_points = 0         # 当前每帧的原始点数，变化时清空历史
+        self._pos = 0               # 下一行写入的位置
+        self._image = None          # (2*history_rows, columns) uint8
+        self._edges = None          # 合并列时每个区间的起始下标（np.maximum.reduceat 用）
+        self._binned = None         # 合并后一行的温度（复用）
+        self._scaled = None         # 量化中间结果（复用）
+
+    @property
+    def columns(self) -> int:
+        return 0 if self._image is None else self._image.shape[1]
+
+    def _allocate(self, num_points: int):
+        columns = min(num_points, self.max_columns)
+        self._image = np.zeros((2 * self.history_rows, columns), dtype=np.uint8)
+        if columns < num_points:
+            self._edges = (np.arange(columns, dtype=np.int64) * num_points) // columns
+            self._binned = np.empty(columns, dtype=np.float32)
+        else:
+            self._edges = None
+            self._binned = None
+        self._scaled = np.empty(columns, dtype=np.float32)
+        self.num_points = num_points
+        self.rows = 0
+        self._pos = 0
+
+    def clear(self):
+        self.rows = 0
+        self._pos = 0
+        if self._image is not None:
+            self._image.fill(0)
+
+    def set_levels(self, low: float, high: float):
+        """修改显示范围。已经量化好的历史行不会重算，只影响之后的新行"""
+        self.levels = (low, high)
+
+    def append(self, temperatures: np.ndarray):
+        """写入一帧温度（一行）"""
+        n = len(temperatures)
+        if n == 0:
+            return
+        if n != self.num_points:
+            self._allocate(n)
+
+        values = temperatures
+        if self._edges is not None:
+            np.maximum.reduceat(temperatures, self._edges, out=self._binned)
+            values = self._binned
+
+        # 量化：(T - low) * 255 / (high - low)，截断到 0~255；NaN（无数据）显示为最低温度的颜色
+        low, high = self.levels
+        scaled = self._scaled
+        np.subtract(values, low, out=scaled)
+        np.multiply(scaled, 255.0 / (high - low), out=scaled)
+        np.nan_to_num(scaled, copy=False, nan=0.0)
+        np.clip(scaled, 0, 255, out=scaled)
+
+        row = self._pos
+        np.copyto(self._image[row], scaled, casting='unsafe')
+        self._image[row + self.history_rows] = self._image[row]
+        self._pos = (row + 1) % self.history_rows
+        self.rows = min(self.rows + 1, self.history_rows)
+
+    def image(self) -> np.ndarray:
+        """最近 rows 行，从最旧到最新排列的连续视图（不复制）"""
+        if self._image is None or self.rows == 0:
+            return None
+        end = self._pos + self.history_rows
+        return self._image[end - self.rows:end]
+
+
+class WaterfallView:
+    """
+    在一个 PlotItem 里显示 WaterfallBuffer。
+    - plot_item: 用来放图像的 PlotItem
+    - colormap: pyqtgraph 自带的颜色表名称
+    """
+
+    def __init__(self, plot_item, colormap: str = 'viridis'):
+        self.plot_item = plot_item
+        self.image_item = pg.ImageItem(axisOrder='row-major')
+        self.image_item.setLookupTable(pg.colormap.get(colormap).getLookupTable(nPts=256))
+        self.image_item.setAutoDownsample(True)   # 图像比屏幕像素大时先降采样再上色
+        plot_item.addItem(self.image_item)
+        plot_item.setLabel('left', '时间 (帧前)')
+        plot_item.setLabel('bottom', '距离 (m)')
+        self.buffer = None
+
+    def show(self, buffer: WaterfallBuffer, x_start: float = 0.0, x_step: float = 0.5):
+        """
+        显示缓冲区当前的内容。
+        - x_start / x_step: 第一个原始点的距离和原始点间距（m），用来换算图像的X范围
+        """
+        self.buffer = buffer
+        image = None if buffer is None else buffer.image()
+        if image is None:
+            self.image_item.clear()
+            return
+        self.image_item.setImage(image, autoLevels=False, levels=(0, 255))
+        rows = len(image)
+        # 最旧的一行在下（y = -rows），最新的一行在上（y = 0）
+        self.image_item.setRect(QRectF(x_start, -rows, buffer.num_points * x_step, rows))